@@ -5,12 +5,13 @@ from flask_cors import CORS
 import json
 import os
 from sqlalchemy.exc import DataError
-from waitress import serve
 
 from logger import create_log
+from managers import DBManager
 from .blueprints import (
     search, work, works, info, edition, editions, utils, link, links, opds, collection, collections, citation, fulfill
 )
+from .server import APIServer
 from .utils import APIUtils
 
 logger = create_log(__name__)
@@ -26,6 +27,7 @@ class FlaskAPI:
         self.app.config['REDIS_CLIENT'] = redisClient
 
         self.app.config['READER_VERSION'] = os.environ['READER_VERSION']
+        self.app.config['SEARCH_SOURCE_HYDRATION'] = os.environ.get('API_SEARCH_SOURCE_HYDRATION', 'false').lower() == 'true'
 
         self.app.register_blueprint(info)
         self.app.register_blueprint(search)
@@ -59,7 +61,11 @@ class FlaskAPI:
         else:
             logger.debug('Starting production server on port 80')
 
-            serve(self.app, host='0.0.0.0', port=80)
+            APIServer(self.app, postFork=self.postFork).run()
+
+    def postFork(self):
+        # Workers open their own database connections rather than inheriting the parent's pool
+        self.app.config['DB_CLIENT'] = DBManager().generate_engine()
 
     def createErrorResponses(self):
         @self.app.errorhandler(404)
@@ -13,6 +13,7 @@ from ..utils import APIUtils
 from ..validation_utils import is_valid_uuid
 from ..opds2 import Feed, Publication
 from logger import create_log
+from managers import ResponseCache
 from model import Work, Edition
 from model.postgres.collection import COLLECTION_EDITIONS
 from ..decorators import deprecated
@@ -103,6 +104,8 @@ def collectionCreate(user=None):
 
     dbClient.session.commit()
 
+    invalidateCachedWorks(dbClient.fetchCollectionWorkIDs(newCollection.uuid))
+
     logger.info('Created collection {}'.format(newCollection))
 
     opdsFeed = constructOPDSFeed(newCollection, dbClient)
@@ -179,6 +182,8 @@ def collectionReplace(uuid, user=None):
     collection.creator = collectionData['creator']
     collection.description = collectionData['description']
 
+    staleWorkIDs = dbClient.fetchCollectionWorkIDs(collection.uuid)
+
     removeAllEditionsFromCollection(dbClient, collection)
 
     if editionIDs:
@@ -189,6 +194,8 @@ def collectionReplace(uuid, user=None):
 
     dbClient.session.commit()
 
+    invalidateCachedWorks(staleWorkIDs | dbClient.fetchCollectionWorkIDs(collection.uuid))
+
     logger.info('Replaced collection {}'.format(collection.uuid))
 
     opdsFeed = constructOPDSFeed(collection, dbClient)
@@ -226,6 +233,8 @@ def collectionUpdate(uuid, user=None):
         errMsg = {'message': 'Unable to locate collection {}'.format(uuid)}
         return APIUtils.formatResponseObject(404, 'fetchSingleCollection', errMsg)
 
+    staleWorkIDs = dbClient.fetchCollectionWorkIDs(collection.uuid)
+
     if title:
         collection.title = title
     if creator:
@@ -261,6 +270,8 @@ def collectionUpdate(uuid, user=None):
 
     dbClient.session.commit()
 
+    invalidateCachedWorks(staleWorkIDs | dbClient.fetchCollectionWorkIDs(collection.uuid))
+
     opdsFeed = constructOPDSFeed(collection, dbClient)
 
     return APIUtils.formatOPDS2Object(200, opdsFeed)
@@ -310,6 +321,8 @@ def collectionDelete(uuid, user=None):
     dbClient = DBClient(current_app.config['DB_CLIENT'])
     dbClient.createSession()
 
+    staleWorkIDs = dbClient.fetchCollectionWorkIDs(uuid)
+
     deleteCount = dbClient.deleteCollection(uuid)
 
     if deleteCount is None or deleteCount < 1:
@@ -318,6 +331,8 @@ def collectionDelete(uuid, user=None):
 
     dbClient.session.commit()
 
+    invalidateCachedWorks(staleWorkIDs)
+
     logger.info('Successfully Deleted Collection')
 
     return (jsonify({'message': 'Deleted {}'.format(uuid)}), 200)
@@ -359,10 +374,14 @@ def collectionDeleteWorkEdition(uuid, user=None):
     else:
         workUUIDsList = None
 
+    staleWorkIDs = dbClient.fetchCollectionWorkIDs(collection.uuid)
+
     removeWorkEditionsFromCollection(dbClient, editionIDsList, workUUIDsList)
 
     dbClient.session.commit()
 
+    invalidateCachedWorks(staleWorkIDs)
+
     opdsFeed = constructOPDSFeed(collection, dbClient)
 
     return APIUtils.formatOPDS2Object(200, opdsFeed)
@@ -523,6 +542,12 @@ def _buildPublications(editions):
 
     return opdsPubs
 
+def invalidateCachedWorks(workIDs):
+
+    '''Clearing cached work and edition responses, which list the collections each edition belongs to'''
+
+    ResponseCache(current_app.config['REDIS_CLIENT']).invalidate_works(workIDs)
+
 def removeWorkEditionsFromCollection(dbClient, editionIDs=None, workUUIDs=None):
 
     '''Deleting the rows of collection_editions that were in the original collection'''
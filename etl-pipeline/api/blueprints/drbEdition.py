@@ -3,6 +3,7 @@ from ..db import DBClient
 from ..utils import APIUtils
 from ..validation_utils import is_valid_numeric_id
 from logger import create_log
+from managers import ResponseCache
 from ..decorators import deprecated
 
 logger = create_log(__name__)
@@ -29,20 +30,30 @@ def get_edition(edition_id):
             reader_version = search_params.get('readerVersion', [None])[0] or current_app.config['READER_VERSION']
             filtered_formats = APIUtils.formatFilters(terms)
 
-            edition = db_client.fetchSingleEdition(edition_id)
+            def build_edition_output():
+                edition = db_client.fetchSingleEdition(edition_id)
 
-            if not edition:
-                return APIUtils.formatResponseObject(404, response_type, { 'message': f'No edition found with id {edition_id}' })
+                if not edition:
+                    return None, []
 
-            records = db_client.fetchRecordsByUUID(edition.dcdw_uuids)
+                records = db_client.fetchRecordsByUUID(edition.dcdw_uuids)
 
-            return APIUtils.formatResponseObject(
-                200,
-                response_type, 
-                APIUtils.formatEditionOutput(
+                return APIUtils.formatEditionOutput(
                     edition, request=request, records=records, dbClient=db_client, showAll=show_all, formats=filtered_formats, reader=reader_version
-                )
+                ), [edition.work_id]
+
+            response_cache = ResponseCache(current_app.config['REDIS_CLIENT'], serializer=current_app.json.dumps)
+            edition_output = response_cache.get_or_build(
+                'editions',
+                edition_id,
+                { 'showAll': show_all, 'formats': filtered_formats, 'readerVersion': reader_version, 'host': request.host },
+                build_edition_output
             )
+
+            if not edition_output:
+                return APIUtils.formatResponseObject(404, response_type, { 'message': f'No edition found with id {edition_id}' })
+
+            return APIUtils.formatResponseObject(200, response_type, edition_output)
     except Exception: 
         logger.exception(f'Unable to get edition with id {edition_id}')
         return APIUtils.formatResponseObject(500, response_type, { 'message': f'Unable to get edition with id {edition_id}' })
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, current_app
-from ..elastic import ElasticClient, ElasticClientError
+from ..elastic import ElasticClient, ElasticClientError, ElasticCursorError
 from ..db import DBClient
+from ..sourceRecords import SourceWork
 from ..utils import APIUtils
 from logger import create_log
 
@@ -27,12 +28,16 @@ def query():
 
         search_page = int(search_params.get('page', [1])[0]) - 1
         search_size = int(search_params.get('size', [10])[0])
+        search_cursor = search_params.get('cursor', [None])[0]
         reader_version = search_params.get('readerVersion', [None])[0] or current_app.config['READER_VERSION']
 
         logger.info('Executing ES Query {} with filters {}'.format(search_params, terms['filter']))
 
         try:
-            search_result = es_client.searchQuery(terms, page=search_page, perPage=search_size)
+            search_result = es_client.searchQuery(terms, page=search_page, perPage=search_size, cursor=search_cursor)
+        except ElasticCursorError as e:
+            logger.warning('Invalid search cursor: {}'.format(e))
+            return APIUtils.formatResponseObject(400, response_type, { 'message': 'Search cursor is invalid or has expired' })
         except ElasticClientError as e:
             logger.exception('Unable to execute search')
             return APIUtils.formatResponseObject(500, response_type, { 'message': 'Unable to execute search' })
@@ -56,18 +61,35 @@ def query():
 
         filtered_formats = APIUtils.formatFilters(terms)
 
-        works = db_client.fetchSearchedWorks(results)
+        if current_app.config.get('SEARCH_SOURCE_HYDRATION', False):
+            works = [SourceWork.fromHit(res) for res in search_result.hits if SourceWork.hasDisplay(res)]
+
+            # Works indexed before display copies were stored are loaded from the database
+            hydrated_uuids = set(str(work.uuid) for work in works)
+            unhydrated_results = [r for r in results if r[0] not in hydrated_uuids]
+
+            if unhydrated_results:
+                works.extend(db_client.fetchSearchedWorks(unhydrated_results))
+        else:
+            works = db_client.fetchSearchedWorks(results)
 
         # Depending on the version of elastic search, hits will either be an integer or a dictionary
         total_hits = search_result.hits.total  if isinstance(search_result.hits.total, int) else search_result.hits.total.value
         
         facets = APIUtils.formatAggregationResult(search_result.aggregations.to_dict())
+
+        if search_cursor:
+            search_page = es_client.cursorPage
+
         paging = APIUtils.formatPagingOptions(
             search_page + 1, 
             search_size, 
             total_hits
         )
 
+        if search_cursor and paging:
+            paging['nextCursor'] = es_client.nextCursor
+
         data_block = {
             'totalWorks': total_hits,
             'works': APIUtils.formatWorkOutput(
@@ -8,6 +8,7 @@ from ..db import DBClient
 from ..elastic import ElasticClient
 from ..utils import APIUtils
 from logger import create_log
+from managers import DBManager, ResponseCache
 
 logger = create_log(__name__)
 
@@ -57,6 +58,30 @@ def get_counts():
         return APIUtils.formatResponseObject(500, response_type, 'Unable to get total counts')
 
 
+@utils.route('/cache', methods=['GET'])
+def get_cache_metrics():
+    response_type = 'responseCacheMetrics'
+
+    try:
+        response_cache = ResponseCache(current_app.config['REDIS_CLIENT'])
+
+        return APIUtils.formatResponseObject(200, response_type, response_cache.get_metrics(['works', 'editions']))
+    except Exception:
+        logger.exception('Unable to get response cache metrics')
+        return APIUtils.formatResponseObject(500, response_type, 'Unable to get response cache metrics')
+
+
+@utils.route('/pool', methods=['GET'])
+def get_pool_metrics():
+    response_type = 'connectionPoolMetrics'
+
+    try:
+        return APIUtils.formatResponseObject(200, response_type, DBManager.get_pool_metrics())
+    except Exception:
+        logger.exception('Unable to get connection pool metrics')
+        return APIUtils.formatResponseObject(500, response_type, 'Unable to get connection pool metrics')
+
+
 @utils.route('/proxy', methods=['GET', 'POST', 'PUT', 'HEAD', 'OPTIONS'])
 @cross_origin(origins=os.environ.get('API_PROXY_CORS_ALLOWED', '*'))
 def proxy_response():
@@ -3,6 +3,7 @@ from ..db import DBClient
 from ..utils import APIUtils
 from ..validation_utils import is_valid_uuid
 from logger import create_log
+from managers import ResponseCache
 from ..decorators import deprecated
 
 logger = create_log(__name__)
@@ -28,18 +29,28 @@ def get_work(uuid):
             reader_version = search_params.get('readerVersion', [None])[0] or current_app.config['READER_VERSION']
             filtered_formats = APIUtils.formatFilters(terms)
 
-            work = db_client.fetchSingleWork(uuid)
+            def build_work_output():
+                work = db_client.fetchSingleWork(uuid)
 
-            if not work:
-                return APIUtils.formatResponseObject(404, response_type, { 'message': f'No work found with id {uuid}' })
+                if not work:
+                    return None, []
 
-            return APIUtils.formatResponseObject(
-                200, 
-                response_type,
-                APIUtils.formatWorkOutput(work, None, showAll=show_all,
+                return APIUtils.formatWorkOutput(work, None, showAll=show_all,
                     request=request, dbClient=db_client, formats=filtered_formats, reader=reader_version
-                )
+                ), [work.id]
+
+            response_cache = ResponseCache(current_app.config['REDIS_CLIENT'], serializer=current_app.json.dumps)
+            work_output = response_cache.get_or_build(
+                'works',
+                uuid,
+                { 'showAll': show_all, 'formats': filtered_formats, 'readerVersion': reader_version, 'host': request.host },
+                build_work_output
             )
+
+            if not work_output:
+                return APIUtils.formatResponseObject(404, response_type, { 'message': f'No work found with id {uuid}' })
+
+            return APIUtils.formatResponseObject(200, response_type, work_output)
     except Exception:
         logger.exception(f'Unable to get work with id {uuid}')
         return APIUtils.formatResponseObject(500, response_type, { 'message': f'Unable to get work with id {uuid}' })
@@ -9,11 +9,17 @@ from .utils import APIUtils
 
 
 class DBClient():
+    # Session factories are built once per engine rather than on every request
+    sessionFactories = {}
+
     def __init__(self, engine):
         self.engine = engine
 
     def createSession(self):
-        self.session = sessionmaker(bind=self.engine)()
+        if self.engine not in DBClient.sessionFactories:
+            DBClient.sessionFactories[self.engine] = sessionmaker(bind=self.engine)
+
+        self.session = DBClient.sessionFactories[self.engine]()
 
     def closeSession(self):
         self.session.close()
@@ -309,6 +315,14 @@ class DBClient():
         self.session.add(automaticCollection)
         return newCollection
 
+    def fetchCollectionWorkIDs(self, uuid):
+        return set(
+            workID for workID, in self.session.query(Edition.work_id)
+                .join(Edition.collections)
+                .filter(Collection.uuid == uuid)
+                .all()
+        )
+
     def deleteCollection(self, uuid):
         return self.session.query(Collection)\
             .filter(Collection.uuid == uuid).delete()
@@ -1,6 +1,9 @@
+import base64
 from copy import deepcopy
-from elasticsearch_dsl import Search, Q, A
+from elasticsearch.exceptions import NotFoundError
+from elasticsearch_dsl import Search, Q, A, connections
 from hashlib import sha1
+import json
 import os
 import re
 
@@ -21,15 +24,21 @@ class ElasticClient():
         'writer of supplementary textual content'
     ]
 
+    CURSOR_START = '*'
+
     def __init__(self, redisClient):
         self.environment = os.environ['ENVIRONMENT']
         self.esIndex = os.environ['ELASTICSEARCH_INDEX']
+        self.pitKeepAlive = os.environ.get('ELASTICSEARCH_PIT_KEEP_ALIVE', '5m')
 
         self.redis = redisClient
 
         self.dateSort = None
         self.sortReversed = False
 
+        self.cursorPage = None
+        self.nextCursor = None
+
         self.languageFilters = []
         self.govDocFilter = None
         self.govDocAgg = None
@@ -43,9 +52,12 @@ class ElasticClient():
         searchES = s.params(track_total_hits=True)
         return searchES
 
-    def searchQuery(self, params, page=0, perPage=10):
+    def searchQuery(self, params, page=0, perPage=10, cursor=None):
         self.generateSearchQuery(params)
 
+        if cursor:
+            return self.executeCursorQuery(params, cursor, perPage)
+
         return self.executeSearchQuery(params, page, perPage)
 
     def generateSearchQuery(self, params):
@@ -152,6 +164,76 @@ class ElasticClient():
 
             iteration += 1
 
+    def executeCursorQuery(self, params, cursor, perPage):
+        queryHash = self.generateQueryHash(params, 0)
+
+        if cursor == self.CURSOR_START:
+            pitID, searchAfter, self.cursorPage = self.openPointInTime(), None, 0
+        else:
+            cursorData = self.decodeCursor(cursor)
+
+            if cursorData['query'] != queryHash:
+                raise ElasticCursorError('Search cursor does not match query')
+
+            pitID, searchAfter, self.cursorPage =\
+                cursorData['pit'], cursorData['searchAfter'], cursorData['page']
+
+        # Point in time searches run against the PIT rather than the index
+        cursorQuery = self.query.index()\
+            .extra(pit={'id': pitID, 'keep_alive': self.pitKeepAlive})
+
+        if searchAfter:
+            cursorQuery = cursorQuery.extra(search_after=searchAfter)
+
+        try:
+            res = cursorQuery[0:perPage].execute()
+        except NotFoundError:
+            raise ElasticCursorError('Search cursor has expired')
+
+        pitID = getattr(res, 'pit_id', None) or pitID
+        totalHits = res.hits.total if isinstance(res.hits.total, int)\
+            else res.hits.total.value
+
+        if len(res.hits) == perPage\
+                and (self.cursorPage + 1) * perPage < totalHits:
+            self.nextCursor = self.encodeCursor({
+                'query': queryHash,
+                'page': self.cursorPage + 1,
+                'pit': pitID,
+                'searchAfter': list(res.hits[-1].meta.sort)
+            })
+        else:
+            self.closePointInTime(pitID)
+
+        return res
+
+    def openPointInTime(self):
+        return connections.get_connection().open_point_in_time(
+            index=self.esIndex, keep_alive=self.pitKeepAlive
+        )['id']
+
+    def closePointInTime(self, pitID):
+        try:
+            connections.get_connection().close_point_in_time(body={'id': pitID})
+        except Exception:
+            logger.warning('Unable to close point in time, will expire after {}'.format(self.pitKeepAlive))
+
+    @staticmethod
+    def encodeCursor(cursorData):
+        return base64.urlsafe_b64encode(json.dumps(cursorData).encode()).decode()
+
+    @staticmethod
+    def decodeCursor(cursor):
+        try:
+            cursorData = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+
+            if not all(key in cursorData for key in ['query', 'page', 'pit', 'searchAfter']):
+                raise ValueError('Missing cursor fields')
+        except (ValueError, TypeError):
+            raise ElasticCursorError('Search cursor is invalid')
+
+        return cursorData
+
     def setPageResultCache(self, cacheKey, sort):
         self.redis.set(
             '{}/queryPaging/{}'.format(self.environment, cacheKey),
@@ -577,3 +659,7 @@ class ElasticClient():
 
 class ElasticClientError(Exception):
     pass
+
+
+class ElasticCursorError(ElasticClientError):
+    pass
@@ -0,0 +1,51 @@
+from gunicorn.app.base import BaseApplication
+from multiprocessing import cpu_count
+import os
+
+from logger import create_log
+
+logger = create_log(__name__)
+
+
+class APIServer(BaseApplication):
+    """Serves the Flask app with pre-forked gunicorn workers. The app is
+    loaded once in the parent process and inherited by each worker, and
+    workers are gracefully replaced after serving API_MAX_REQUESTS requests."""
+
+    def __init__(self, app, postFork=None, host='0.0.0.0', port=80):
+        self.application = app
+        self.options = APIServer.getServerOptions(host, port)
+
+        if postFork:
+            self.options['post_fork'] = lambda server, worker: postFork()
+
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
+
+    @staticmethod
+    def getServerOptions(host, port):
+        return {
+            'bind': '{}:{}'.format(host, port),
+            'workers': int(os.environ.get('API_WORKERS', APIServer.getAvailableCPUs())),
+            'threads': int(os.environ.get('API_THREADS', 4)),
+            'worker_class': 'gthread',
+            'preload_app': True,
+            'max_requests': int(os.environ.get('API_MAX_REQUESTS', 1000)),
+            'max_requests_jitter': int(os.environ.get('API_MAX_REQUESTS_JITTER', 100)),
+            'timeout': int(os.environ.get('API_WORKER_TIMEOUT', 60)),
+            'graceful_timeout': int(os.environ.get('API_GRACEFUL_TIMEOUT', 30))
+        }
+
+    @staticmethod
+    def getAvailableCPUs():
+        # cpu_count reports every core on the host, not the cores this process may be scheduled on
+        if hasattr(os, 'sched_getaffinity'):
+            return len(os.sched_getaffinity(0))
+
+        return cpu_count()
@@ -0,0 +1,87 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+
+class SourceRecord:
+    """Record rendered from the display copy stored in an Elasticsearch
+    document. It exposes the same attributes as the postgres model it was
+    indexed from so that it can be formatted by APIUtils."""
+    ATTRIBUTES = []
+
+    def __init__(self, display, **attributes):
+        self.fields = {
+            key: value for key, value in display.items()
+            if key not in self.ATTRIBUTES
+        }
+
+        for attr in self.ATTRIBUTES:
+            setattr(self, attr, display.get(attr, None))
+
+        for attr, value in attributes.items():
+            setattr(self, attr, value)
+
+    def __iter__(self):
+        for key, value in self.fields.items():
+            yield (key, value)
+
+    @staticmethod
+    def parseDate(value):
+        return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+class SourceWork(SourceRecord):
+    def __init__(self, display, **attributes):
+        super().__init__(display, **attributes)
+
+        self.date_created = self.parseDate(self.date_created)
+        self.date_modified = self.parseDate(self.date_modified)
+
+    @classmethod
+    def fromHit(cls, hit):
+        source = hit.to_dict()
+
+        work = cls(
+            source['display'],
+            uuid=source['uuid'],
+            date_created=source.get('date_created', None),
+            date_modified=source.get('date_modified', None)
+        )
+
+        work.editions = [
+            SourceEdition(edition['display'], work=work)
+            for edition in source.get('editions', [])
+        ]
+
+        return work
+
+    @staticmethod
+    def hasDisplay(hit):
+        source = hit.to_dict()
+
+        return 'display' in source and all(
+            'display' in edition for edition in source.get('editions', [])
+        )
+
+
+class SourceEdition(SourceRecord):
+    ATTRIBUTES = ['id', 'links', 'items']
+
+    def __init__(self, display, **attributes):
+        super().__init__(display, **attributes)
+
+        self.publication_date = self.parseDate(self.fields.get('publication_date', None))
+        self.links = [SimpleNamespace(**link) for link in self.links or []]
+        self.items = [SourceItem(item) for item in self.items or []]
+
+
+class SourceItem(SourceRecord):
+    ATTRIBUTES = ['id', 'physical_location', 'links', 'rights']
+
+    def __init__(self, display, **attributes):
+        super().__init__(display, **attributes)
+
+        if 'modified' in self.fields:
+            self.fields['modified'] = self.parseDate(self.fields['modified'])
+
+        self.links = [SimpleNamespace(**link) for link in self.links or []]
+        self.rights = [SimpleNamespace(**rights) for rights in self.rights or []]
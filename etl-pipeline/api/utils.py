@@ -4,9 +4,10 @@ from hashlib import scrypt
 from flask import jsonify
 from itertools import repeat
 from math import ceil
-from model import Collection, Edition
+from model import Collection
 import re
 from model.postgres.collection import COLLECTION_EDITIONS
+from sqlalchemy import distinct, func, select
 from logger import create_log
 from botocore.exceptions import ClientError
 from urllib.parse import urlparse
@@ -152,6 +153,10 @@ class APIUtils():
             outWorks = []
             workDict = {str(work.uuid): work for work in works}
 
+            editionCollections = cls.loadEditionCollections(
+                [edition.id for work in works for edition in work.editions], dbClient
+            )
+
             for workUUID, editionIds, highlights in identifiers:
                 work = workDict.get(workUUID, None)
 
@@ -165,7 +170,8 @@ class APIUtils():
                     dbClient,
                     formats=formats,
                     reader=reader,
-                    request=request
+                    request=request,
+                    editionCollections=editionCollections
                 )
 
                 cls.addWorkMeta(outWork, highlights=highlights)
@@ -197,10 +203,21 @@ class APIUtils():
             return formattedWork
 
     @classmethod
-    def formatWork(cls, work, editionIds, showAll, dbClient=None, formats=None, reader=None, request=None):
+    def formatWork(
+        cls, work, editionIds, showAll, dbClient=None, formats=None, reader=None, request=None, editionCollections=None
+    ):
+        if editionCollections is None:
+            editionCollections = cls.loadEditionCollections(
+                [edition.id for edition in work.editions], dbClient
+            )
+
         workDict = dict(work)
         workDict['edition_count'] = len(work.editions)
-        workDict['inCollections'] = cls.checkEditionInCollection(work, None, dbClient=dbClient)
+        workDict['inCollections'] = [
+            collection
+            for edition in work.editions
+            for collection in editionCollections.get(edition.id, [])
+        ]
         workDict['date_created'] = work.date_created.strftime('%Y-%m-%dT%H:%M:%S')
         workDict['date_modified'] = work.date_modified.strftime('%Y-%m-%dT%H:%M:%S')
 
@@ -211,7 +228,7 @@ class APIUtils():
             if editionIds and edition.id not in editionIds:
                 continue
 
-            editInCollection = cls.checkEditionInCollection(None, edition, dbClient)
+            editInCollection = editionCollections.get(edition.id, [])
 
             editionDict = cls.formatEdition(
                 edition, editionInCollection=editInCollection, formats=formats, reader=reader
@@ -246,7 +263,7 @@ class APIUtils():
     ):
         editionWorkTitle = edition.work.title
         editionWorkAuthors = edition.work.authors
-        editionInCollection = cls.checkEditionInCollection(None, edition, dbClient)
+        editionInCollection = cls.loadEditionCollections([edition.id], dbClient).get(edition.id, [])
 
         formattedEdition = cls.formatEdition(
             edition, editionWorkTitle, editionWorkAuthors, editionInCollection, records, formats, showAll=showAll, reader=reader
@@ -263,39 +280,48 @@ class APIUtils():
 
 
     @classmethod
-    def checkEditionInCollection(cls, work, edition, dbClient):
-
-        collectionMetadata = []
-
-        if work != None:
-            for edit in dbClient.session.query(Edition) \
-                .filter(Edition.work_id == work.id):
-                    for collection in dbClient.session.query(Collection) \
-                        .join(COLLECTION_EDITIONS) \
-                        .filter(COLLECTION_EDITIONS.c.edition_id == edit.id):
-                            metadataOBJ = {
-                                'uuid': collection.uuid,
-                                'title': collection.title,
-                                'creator': collection.creator,
-                                'description': collection.description,
-                                'numberOfItems': len(collection.editions)
-                                }
-                            collectionMetadata.append(metadataOBJ)
+    def loadEditionCollections(cls, editionIds, dbClient):
+        """Returns the collections each edition belongs to, keyed by edition id,
+        with a single query for all of the editions in a response"""
+        editionCollections = {}
+        editionIds = set(editionIds)
+
+        if not editionIds or dbClient is None:
+            return editionCollections
+
+        memberships = COLLECTION_EDITIONS.alias('memberships')
+
+        collectionSizes = select(
+            COLLECTION_EDITIONS.c.collection_id,
+            func.count(distinct(COLLECTION_EDITIONS.c.edition_id)).label('numberOfItems')
+        ) \
+            .where(COLLECTION_EDITIONS.c.collection_id.in_(
+                select(memberships.c.collection_id).where(memberships.c.edition_id.in_(editionIds))
+            )) \
+            .group_by(COLLECTION_EDITIONS.c.collection_id) \
+            .subquery()
+
+        for editionId, uuid, title, creator, description, numberOfItems in dbClient.session.query(
+            memberships.c.edition_id,
+            Collection.uuid,
+            Collection.title,
+            Collection.creator,
+            Collection.description,
+            collectionSizes.c.numberOfItems
+        ) \
+            .join(Collection, Collection.id == memberships.c.collection_id) \
+            .join(collectionSizes, collectionSizes.c.collection_id == Collection.id) \
+            .filter(memberships.c.edition_id.in_(editionIds)) \
+            .order_by(memberships.c.edition_id, Collection.id):
+                editionCollections.setdefault(editionId, []).append({
+                    'uuid': uuid,
+                    'title': title,
+                    'creator': creator,
+                    'description': description,
+                    'numberOfItems': numberOfItems
+                })
 
-        else:
-            for collection in dbClient.session.query(Collection) \
-                .join(COLLECTION_EDITIONS) \
-                .filter(COLLECTION_EDITIONS.c.edition_id == edition.id):
-                    metadataOBJ = {
-                        'uuid': collection.uuid,
-                        'title': collection.title,
-                        'creator': collection.creator,
-                        'description': collection.description,
-                        'numberOfItems': len(collection.editions)
-                        }
-                    collectionMetadata.append(metadataOBJ)
-
-        return collectionMetadata
+        return editionCollections
 
     @classmethod
     def formatEdition(
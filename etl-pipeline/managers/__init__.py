@@ -1,6 +1,8 @@
 from .cover_manager import CoverManager
 from .db import DBManager
 from .doabParser import DOABLinkManager
+from .edition_grouper import EditionGrouper
+from .identifier_graph import IdentifierGraphManager
 from .kMeans import KMeansManager
 from .oclc_auth import OCLCAuthManager
 from .oclc_catalog import OCLCCatalogManager
@@ -11,5 +13,7 @@ from .redis import RedisManager
 from .sfrRecord import SFRRecordManager
 from .elasticsearch import ElasticsearchManager
 from .sfrElasticRecord import SFRElasticRecordManager
+from .elastic_index_buffer import ElasticsearchIndexBuffer
 from .s3 import S3Manager
+from .response_cache import ResponseCache
 from .muse import MUSEError, MUSEManager
\ No newline at end of file
@@ -1,7 +1,10 @@
 import os
-from sqlalchemy import create_engine, inspect
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import OperationalError, TimeoutError
+from sqlalchemy.pool import QueuePool
+from threading import Lock
+from time import perf_counter
 
 from model import Base
 from logger import create_log
@@ -9,7 +12,55 @@ from logger import create_log
 logger = create_log(__name__)
 
 
+class MeteredQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.metrics_lock = Lock()
+        self.checkout_count = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+
+    def _do_get(self):
+        start_time = perf_counter()
+
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            with self.metrics_lock:
+                self.checkout_timeouts += 1
+
+            raise
+        finally:
+            checkout_wait = perf_counter() - start_time
+
+            with self.metrics_lock:
+                self.checkout_count += 1
+                self.checkout_wait_total += checkout_wait
+                self.checkout_wait_max = max(self.checkout_wait_max, checkout_wait)
+
+    def get_metrics(self) -> dict:
+        with self.metrics_lock:
+            return {
+                'size': self.size(),
+                'checkedOut': self.checkedout(),
+                'checkedIn': self.checkedin(),
+                'overflow': max(self.overflow(), 0),
+                'checkouts': self.checkout_count,
+                'checkoutTimeouts': self.checkout_timeouts,
+                'averageCheckoutWaitMs': round(self.checkout_wait_total / self.checkout_count * 1000, 2) if self.checkout_count else None,
+                'maxCheckoutWaitMs': round(self.checkout_wait_max * 1000, 2)
+            }
+
+
 class DBManager:
+    # Engines are shared by every DBManager in a process so that their connection pools are reused
+    engines = {}
+    engines_lock = Lock()
+
     def __init__(self, user=None, pswd=None, host=None, port=None, db=None):
         super(DBManager, self).__init__()
         self.user = user or DBManager.decrypt_env_var('POSTGRES_USER')
@@ -29,21 +80,51 @@ class DBManager:
         self.close_connection()
 
     def generate_engine(self):
+        engine_url = 'postgresql://{}:{}@{}:{}/{}'.format(
+            self.user,
+            self.pswd,
+            self.host,
+            self.port,
+            self.db
+        )
+
         try:
-            self.engine = create_engine(
-                'postgresql://{}:{}@{}:{}/{}'.format(
-                    self.user,
-                    self.pswd,
-                    self.host,
-                    self.port,
-                    self.db
-                )
-            )
+            with DBManager.engines_lock:
+                process_id = os.getpid()
+
+                # Connections inherited from a parent process must not be used or closed by a forked child
+                for engine_key in [key for key in DBManager.engines.keys() if key[0] != process_id]:
+                    DBManager.engines.pop(engine_key).dispose(close=False)
+
+                if (process_id, engine_url) not in DBManager.engines:
+                    DBManager.engines[(process_id, engine_url)] = create_engine(
+                        engine_url, poolclass=MeteredQueuePool, **DBManager.get_pool_options()
+                    )
+
+                self.engine = DBManager.engines[(process_id, engine_url)]
 
             return self.engine
         except Exception as e:
             raise e
 
+    @staticmethod
+    def get_pool_options() -> dict:
+        return {
+            'pool_size': int(os.environ.get('POSTGRES_POOL_SIZE', 5)),
+            'max_overflow': int(os.environ.get('POSTGRES_MAX_OVERFLOW', 10)),
+            'pool_timeout': int(os.environ.get('POSTGRES_POOL_TIMEOUT', 30)),
+            'pool_recycle': int(os.environ.get('POSTGRES_POOL_RECYCLE', 1800)),
+            'pool_pre_ping': os.environ.get('POSTGRES_POOL_PRE_PING', 'true').lower() == 'true'
+        }
+
+    @staticmethod
+    def get_pool_metrics() -> dict:
+        return {
+            engine.url.render_as_string(hide_password=True): engine.pool.get_metrics()
+            for (process_id, _), engine in list(DBManager.engines.items())
+            if process_id == os.getpid() and isinstance(engine.pool, MeteredQueuePool)
+        }
+
     def initialize_database(self):
         if not inspect(self.engine).has_table('works'):
             Base.metadata.create_all(self.engine)
@@ -75,7 +156,9 @@ class DBManager:
 
     def close_connection(self):
         self.session.close()
-        self.engine.dispose()
+
+        if isinstance(getattr(self.engine, 'pool', None), MeteredQueuePool):
+            logger.info(f'Database connection pool metrics: {self.engine.pool.get_metrics()}')
 
     def bulk_save_objects(self, objects, only_changed=True, retry=False):
         try:
@@ -118,6 +201,18 @@ class DBManager:
             for row in query_chunk:
                 yield row[0] if single_entity else row[0:-2]
 
+    def try_advisory_xact_locks(self, namespace: int, keys: list[int]) -> bool:
+        if not keys:
+            return True
+
+        return self.session.execute(
+            text(
+                'SELECT bool_and(pg_try_advisory_xact_lock(:namespace, lock_key)) '
+                'FROM unnest(CAST(:keys AS integer[])) AS lock_key'
+            ),
+            { 'namespace': namespace, 'keys': sorted(set(keys)) }
+        ).scalar()
+
     def delete_records_by_query(self, query):
         try:
             query.delete()
@@ -0,0 +1,61 @@
+from collections import defaultdict
+import os
+from typing import Optional
+
+from logger import create_log
+from .kMeans import KMeansManager, YearObject
+
+logger = create_log(__name__)
+
+
+class EditionGrouper:
+    """Rule based edition grouping for small clusters of records.
+
+    Records are keyed on their normalized publication date, place, publisher
+    and edition statement. When every publication year maps to a single key
+    the result is the same as the k-means grouping, so pandas and sklearn can
+    be skipped. Otherwise the cluster is ambiguous and no editions are returned.
+    """
+
+    DEFAULT_MAX_SIZE = 25
+
+    def __init__(self, instances, max_size: Optional[int] = None):
+        self.instances = instances
+        self.max_size = max_size or int(
+            os.environ.get('EDITION_GROUPER_MAX_SIZE', self.DEFAULT_MAX_SIZE)
+        )
+
+    def group_editions(self) -> Optional[list[tuple[str, list]]]:
+        if len(self.instances) > self.max_size:
+            return None
+
+        year_groups = defaultdict(list)
+
+        for instance in self.instances:
+            spatial_data, date_data, publisher_data = KMeansManager.getInstanceData(instance)
+
+            if not (bool(spatial_data) or date_data != {} or publisher_data):
+                continue
+
+            edition_key = (
+                tuple(sorted(date_data.items())),
+                KMeansManager.pubProcessor(spatial_data or ''),
+                KMeansManager.pubProcessor(publisher_data),
+                KMeansManager.pubProcessor(KMeansManager.getEditionStatement(instance.has_version))
+            )
+
+            edition_year = YearObject.convertYearDictToStr(date_data)
+            year_groups[edition_year].append((edition_key, instance.uuid))
+
+        editions = []
+
+        for edition_year, year_instances in year_groups.items():
+            if len({edition_key for edition_key, _ in year_instances}) > 1:
+                logger.debug('Ambiguous edition keys found, falling back to k-means')
+                return None
+
+            editions.append((edition_year, [uuid for _, uuid in year_instances]))
+
+        editions.sort(key=lambda edition: edition[0])
+
+        return editions
@@ -0,0 +1,201 @@
+import os
+import threading
+from time import monotonic, perf_counter
+from typing import Callable, Iterable, Optional
+
+from logger import create_log
+from model import ESWork
+from .elasticsearch import ElasticsearchManager
+from .sfrElasticRecord import SFRElasticRecordManager
+
+logger = create_log(__name__)
+
+
+class ElasticsearchIndexBuffer:
+    """Coalesces work index and delete operations from many pipeline messages
+    into shared bulk requests. Pending operations are keyed by work uuid, so
+    only the latest operation for a work within the window is sent, and the
+    buffer is flushed once it holds max_size operations or its oldest
+    operation is max_age seconds old. Works that could not be indexed are
+    handed to requeue_works after each flush."""
+
+    def __init__(
+        self,
+        elastic_search_manager: ElasticsearchManager,
+        max_size: Optional[int]=None,
+        max_age: Optional[float]=None,
+        requeue_works: Optional[Callable[[list[str]], None]]=None
+    ):
+        self.elastic_search_manager = elastic_search_manager
+        self.requeue_works = requeue_works
+
+        self.max_size = max_size or int(os.environ.get('ELASTICSEARCH_INDEX_BUFFER_SIZE', 500))
+        self.max_age = max_age or float(os.environ.get('ELASTICSEARCH_INDEX_BUFFER_SECONDS', 5))
+
+        self.works_to_index = {}
+        self.works_to_delete = set()
+        self.oldest_operation = None
+
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.flush_thread = None
+
+        self.flush_count = 0
+        self.indexed_count = 0
+        self.deleted_count = 0
+        self.failed_count = 0
+        self.coalesced_count = 0
+        self.unchanged_count = 0
+        self.last_flush_latency = None
+
+    def start(self):
+        if self.flush_thread is not None:
+            return
+
+        self.stop_event.clear()
+        self.flush_thread = threading.Thread(target=self._flush_expired_operations, daemon=True)
+        self.flush_thread.start()
+
+    def close(self):
+        if self.flush_thread is not None:
+            self.stop_event.set()
+            self.flush_thread.join()
+            self.flush_thread = None
+
+        self.flush()
+
+    def index_work(self, work_document: ESWork):
+        with self.lock:
+            if work_document.uuid in self.works_to_index or work_document.uuid in self.works_to_delete:
+                self.coalesced_count += 1
+
+            self.works_to_delete.discard(work_document.uuid)
+            self.works_to_index[work_document.uuid] = work_document
+
+            buffer_full = self._add_operation()
+
+        if buffer_full:
+            self.flush()
+
+    def delete_works(self, uuids: Iterable[str]):
+        with self.lock:
+            for uuid in uuids:
+                if uuid in self.works_to_index or uuid in self.works_to_delete:
+                    self.coalesced_count += 1
+
+                self.works_to_index.pop(uuid, None)
+                self.works_to_delete.add(uuid)
+
+            buffer_full = self._add_operation()
+
+        if buffer_full:
+            self.flush()
+
+    def flush(self):
+        # Flushes are serialized so that an older batch for a work can never land after a newer one
+        with self.flush_lock:
+            with self.lock:
+                work_documents = list(self.works_to_index.values())
+                uuids_to_delete = list(self.works_to_delete)
+
+                self.works_to_index = {}
+                self.works_to_delete = set()
+                self.oldest_operation = None
+
+            if not work_documents and not uuids_to_delete:
+                return
+
+            self._send_operations(work_documents, uuids_to_delete)
+
+    def get_metrics(self) -> dict:
+        with self.lock:
+            return {
+                'pending': len(self.works_to_index) + len(self.works_to_delete),
+                'flushes': self.flush_count,
+                'indexed': self.indexed_count,
+                'deleted': self.deleted_count,
+                'failed': self.failed_count,
+                'coalesced': self.coalesced_count,
+                'unchanged': self.unchanged_count,
+                'last_flush_latency': self.last_flush_latency
+            }
+
+    def _add_operation(self) -> bool:
+        if self.oldest_operation is None:
+            self.oldest_operation = monotonic()
+
+        return len(self.works_to_index) + len(self.works_to_delete) >= self.max_size
+
+    def _flush_expired_operations(self):
+        while not self.stop_event.wait(timeout=min(self.max_age, 1)):
+            with self.lock:
+                expired = self.oldest_operation is not None and monotonic() - self.oldest_operation >= self.max_age
+
+            if expired:
+                try:
+                    self.flush()
+                except Exception:
+                    logger.exception('Failed to flush Elasticsearch index buffer')
+
+    def _send_operations(self, work_documents: list[ESWork], uuids_to_delete: list[str]):
+        start_time = perf_counter()
+
+        changed_documents = self.elastic_search_manager.get_changed_works(work_documents)
+        unchanged_count = len(work_documents) - len(changed_documents)
+        work_documents = changed_documents
+
+        languages_detected = SFRElasticRecordManager.detectLanguages(work_documents)
+
+        try:
+            errors = self.elastic_search_manager.bulk_work_operations(
+                work_documents,
+                uuids_to_delete,
+                pipeline=None if languages_detected else 'language_detector'
+            )
+            dead_letter_works = self.elastic_search_manager.drain_dead_letter_works()
+        except Exception as e:
+            logger.exception('Failed to send Elasticsearch bulk request')
+
+            errors = [
+                *({'index': {'_id': work.uuid, 'error': str(e)}} for work in work_documents),
+                *({'delete': {'_id': uuid, 'error': str(e)}} for uuid in uuids_to_delete)
+            ]
+            dead_letter_works = [str(work.uuid) for work in work_documents]
+
+        failures = {
+            op_type: sum(1 for error in errors if op_type in error)
+            for op_type in ('index', 'delete')
+        }
+
+        flush_latency = perf_counter() - start_time
+
+        with self.lock:
+            self.flush_count += 1
+            self.indexed_count += len(work_documents) - failures['index']
+            self.deleted_count += len(uuids_to_delete) - failures['delete']
+            self.failed_count += failures['index'] + failures['delete']
+            self.unchanged_count += unchanged_count
+            self.last_flush_latency = flush_latency
+
+        logger.info(
+            f'Flushed {len(work_documents)} index and {len(uuids_to_delete)} delete operations '
+            f'to Elasticsearch in {flush_latency:.3f}s with '
+            f'{failures["index"] + failures["delete"]} failures and {unchanged_count} unchanged works skipped'
+        )
+
+        if dead_letter_works:
+            self._requeue_dead_letter_works(dead_letter_works)
+
+    def _requeue_dead_letter_works(self, dead_letter_works: list[str]):
+        logger.error(
+            f'Unable to index {len(dead_letter_works)} works in Elasticsearch: {", ".join(dead_letter_works)}'
+        )
+
+        if self.requeue_works is None:
+            return
+
+        try:
+            self.requeue_works(dead_letter_works)
+        except Exception:
+            logger.exception(f'Failed to re-queue {len(dead_letter_works)} works')
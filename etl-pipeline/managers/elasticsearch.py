@@ -1,10 +1,11 @@
+from itertools import chain
 import os
+import time
 
 from elasticsearch.client.ingest import IngestClient
 from elasticsearch import Elasticsearch
-from elasticsearch.helpers import bulk
+from elasticsearch.helpers import parallel_bulk, scan
 from elasticsearch_dsl import connections, Index
-from elastic_transport import ConnectionTimeout
 
 from model import ESWork
 from logger import create_log
@@ -14,11 +15,28 @@ logger = create_log(__name__)
 
 class ElasticsearchManager:
     OP_TYPE = "index"
+    # Connection errors and timeouts are reported with a status of N/A or TIMEOUT
+    RETRY_STATUSES = {"N/A", "TIMEOUT", 429, 502, 503, 504}
 
     def __init__(self, index=None):
         self.index = index or os.environ.get("ELASTICSEARCH_INDEX", None)
         self.client = None
 
+        self.bulk_thread_count = int(os.environ.get("ELASTICSEARCH_BULK_THREADS", 4))
+        self.bulk_chunk_size = int(os.environ.get("ELASTICSEARCH_BULK_CHUNK_SIZE", 500))
+        self.bulk_max_chunk_bytes = int(
+            os.environ.get("ELASTICSEARCH_BULK_MAX_CHUNK_BYTES", 10 * 1024 * 1024)
+        )
+        self.bulk_max_retries = int(os.environ.get("ELASTICSEARCH_BULK_MAX_RETRIES", 3))
+        self.bulk_retry_backoff = float(
+            os.environ.get("ELASTICSEARCH_BULK_RETRY_BACKOFF", 1)
+        )
+
+        self.dead_letter_max_size = int(
+            os.environ.get("ELASTICSEARCH_DEAD_LETTER_MAX_SIZE", 10000)
+        )
+        self.dead_letter_works = []
+
     def create_elastic_connection(
         self, scheme=None, host=None, port=None, user=None, pswd=None
     ):
@@ -186,6 +204,67 @@ class ElasticsearchManager:
         if es_index.exists() is False:
             ESWork.init(index=self.index)
 
+    def create_versioned_index(self, index_name):
+        """Creates an empty copy of the work index for a full reindex, with
+        replicas and refreshes disabled until the bulk load is complete"""
+        ESWork.init(index=index_name)
+
+        self.client.indices.put_settings(
+            index=index_name,
+            body={"index": {"number_of_replicas": 0, "refresh_interval": "-1"}},
+        )
+
+    def finalize_versioned_index(self, index_name, number_of_replicas):
+        self.client.indices.put_settings(
+            index=index_name,
+            body={
+                "index": {
+                    "number_of_replicas": number_of_replicas,
+                    "refresh_interval": None,
+                }
+            },
+        )
+
+        self.client.indices.refresh(index=index_name)
+
+    def get_number_of_replicas(self):
+        if not self.client.indices.exists(index=self.index):
+            return None
+
+        index_settings = self.client.indices.get_settings(
+            index=self.index, name="index.number_of_replicas"
+        )
+
+        return max(
+            int(settings["settings"]["index"]["number_of_replicas"])
+            for settings in index_settings.values()
+        )
+
+    def get_alias_indices(self):
+        if not self.client.indices.exists_alias(name=self.index):
+            return []
+
+        return list(self.client.indices.get_alias(name=self.index).keys())
+
+    def swap_alias(self, index_name):
+        """Atomically points the index alias at index_name. A concrete index
+        that still holds the alias name is removed in the same request"""
+        alias_indices = self.get_alias_indices()
+
+        actions = [
+            {"remove": {"index": alias_index, "alias": self.index}}
+            for alias_index in alias_indices
+        ]
+
+        if not alias_indices and self.client.indices.exists(index=self.index):
+            actions.append({"remove_index": {"index": self.index}})
+
+        actions.append({"add": {"index": index_name, "alias": self.index}})
+
+        self.client.indices.update_aliases(body={"actions": actions})
+
+        return alias_indices
+
     @staticmethod
     def construct_language_pipeline(client, id, description, prefix="", field=""):
         pipeline_body = {
@@ -260,52 +339,151 @@ class ElasticsearchManager:
 
         client.put_pipeline(id=id, body=pipeline_body)
 
-    def save_work_records(self, works, attempt=1):
+    def save_work_records(self, works, pipeline="language_detector"):
+        """Bulk indexes the works, returning the uuids of any works that could
+        not be indexed"""
+        errors = self._send_bulk_actions(list(self._upsert_generator(works, pipeline)))
+
+        return [str(result["_id"]) for error in errors for result in error.values()]
+
+    def get_changed_works(self, works):
+        """Returns the works whose content hash differs from the hash stored
+        with their indexed document. All works are returned if the indexed
+        hashes cannot be fetched"""
+        if not works:
+            return []
+
         try:
-            save_res = bulk(
-                self.es, self._upsert_generator(works), raise_on_error=False
+            indexed_documents = self.es.mget(
+                index=self.index,
+                body={"ids": [str(work.uuid) for work in works]},
+                _source_includes=["content_hash"],
             )
+        except Exception:
+            logger.exception("Unable to fetch indexed content hashes")
+            return list(works)
+
+        indexed_hashes = {
+            document["_id"]: document.get("_source", {}).get("content_hash")
+            for document in indexed_documents["docs"]
+            if document.get("found")
+        }
+
+        return [
+            work
+            for work in works
+            if work.content_hash is None
+            or indexed_hashes.get(str(work.uuid)) != work.content_hash
+        ]
+
+    def bulk_work_operations(self, works, uuids_to_delete, pipeline="language_detector"):
+        """Sends index and delete operations in the same bulk requests, returning
+        the per document error items for any operation that still failed"""
+        actions = chain(
+            self._delete_generator(uuids_to_delete),
+            self._upsert_generator(works, pipeline),
+        )
+
+        return self._send_bulk_actions(list(actions))
+
+    def _send_bulk_actions(self, actions):
+        """Sends the actions with parallel bulk requests. Actions that fail with
+        a transient error are retried with exponential backoff, and works that
+        still could not be indexed are added to dead_letter_works until they
+        are drained to be re-queued"""
+        errors = []
+
+        if not actions:
+            return errors
+
+        for attempt in range(self.bulk_max_retries + 1):
+            if attempt > 0:
+                backoff = self.bulk_retry_backoff * 2 ** (attempt - 1)
+
+                logger.info(
+                    "Retrying {} failed bulk actions in {}s".format(len(actions), backoff)
+                )
+                time.sleep(backoff)
+
+            actions_by_id = {
+                (action["_op_type"], str(action["_id"])): action for action in actions
+            }
 
-            logger.debug(save_res)
+            actions, errors = [], []
 
-            if save_res[1]:
-                for err in save_res[1]:
-                    logger.error(
-                        "Type: {}, Reason: {}".format(
-                            err[self.OP_TYPE]["error"]["type"],
-                            err[self.OP_TYPE]["error"]["reason"],
-                        )
+            for ok, item in parallel_bulk(
+                self.es,
+                actions_by_id.values(),
+                thread_count=self.bulk_thread_count,
+                chunk_size=self.bulk_chunk_size,
+                max_chunk_bytes=self.bulk_max_chunk_bytes,
+                raise_on_error=False,
+                raise_on_exception=False,
+            ):
+                op_type, result = next(iter(item.items()))
+
+                # Stale works may never have been indexed, so a missing document is not a failed delete
+                if ok or (op_type == "delete" and result.get("status") == 404):
+                    continue
+
+                if result.get("status") in self.RETRY_STATUSES:
+                    actions.append(actions_by_id[(op_type, str(result["_id"]))])
+
+                errors.append(item)
+
+            if not actions:
+                break
+
+        for error in errors:
+            for op_type, result in error.items():
+                if op_type == self.OP_TYPE:
+                    self._add_dead_letter_work(str(result["_id"]))
+
+                logger.error(
+                    "Failed to {} {} - Status: {}, Error: {}".format(
+                        op_type, result.get("_id"), result.get("status"), result.get("error")
                     )
-        except ConnectionTimeout as e:
-            logger.error("ElasticSearch connection timeout")
-            logger.debug(e)
+                )
+
+        return errors
 
-            if attempt < 3:
-                logger.info("Retrying batches")
+    def drain_dead_letter_works(self):
+        """Returns the uuids of the works that could not be indexed since the
+        last drain and clears them"""
+        dead_letter_works, self.dead_letter_works = self.dead_letter_works, []
 
-                attempt += 1
-                first_work_half, second_work_half = self._split_work_batch(works)
+        return dead_letter_works
 
-                self.save_work_records(first_work_half, attempt=attempt)
-                self.save_work_records(second_work_half, attempt=attempt)
-            else:
-                logger.warning("Exceeded retry limit for batch {}".format(works))
+    def _add_dead_letter_work(self, uuid):
+        if len(self.dead_letter_works) >= self.dead_letter_max_size:
+            logger.error("Dead letter works are full, dropping {}".format(uuid))
+            return
 
-    def _upsert_generator(self, works):
+        self.dead_letter_works.append(uuid)
+
+    def _upsert_generator(self, works, pipeline="language_detector"):
         for work in works:
             logger.debug("Saving {}".format(work))
 
-            yield {
+            upsert_action = {
                 "_op_type": self.OP_TYPE,
                 "_index": self.index,
                 "_id": work.uuid,
-                "pipeline": "language_detector",
                 "_source": work.to_dict(),
             }
 
+            if pipeline:
+                upsert_action["pipeline"] = pipeline
+
+            yield upsert_action
+
+    def scan_work_uuids(self):
+        """Yields the uuid of every work document in the index"""
+        for hit in scan(self.es, index=self.index, query={"_source": False}):
+            yield hit["_id"]
+
     def delete_work_records(self, uuids):
-        delete_res = bulk(self.es, self._delete_generator(uuids), raise_on_error=False)
-        logger.debug(delete_res)
+        return self._send_bulk_actions(list(self._delete_generator(uuids)))
 
     def _delete_generator(self, uuids):
         for uuid in uuids:
@@ -313,9 +491,3 @@ class ElasticsearchManager:
 
             yield {"_op_type": "delete", "_index": self.index, "_id": uuid}
 
-    @staticmethod
-    def _split_work_batch(works):
-        work_count = len(works)
-        pivot_point = int(work_count / 2)
-
-        return works[:pivot_point], works[pivot_point:]
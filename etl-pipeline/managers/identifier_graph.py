@@ -0,0 +1,117 @@
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from logger import create_log
+
+logger = create_log(__name__)
+
+
+TITLE_TOKENS = r"""
+    ARRAY(
+        SELECT DISTINCT token
+        FROM regexp_split_to_table(lower({title}), '\W+') AS token
+        WHERE token NOT IN ('', 'a', 'an', 'the', 'of')
+    )
+"""
+
+MATCHED_TITLE_TOKENS = TITLE_TOKENS.format(title='records.title')
+
+# Single token titles must be contained in the other title, otherwise
+# multi token titles must share at least two tokens
+TITLES_OVERLAP = """
+    CASE
+        WHEN cardinality(seeds.title_tokens) = 1
+            THEN seeds.title_tokens <@ matched_title.tokens
+        WHEN cardinality(matched_title.tokens) = 1
+            THEN seeds.title_tokens @> matched_title.tokens
+        WHEN cardinality(seeds.title_tokens) > 1 AND cardinality(matched_title.tokens) > 1
+            THEN cardinality(ARRAY(
+                SELECT unnest(seeds.title_tokens)
+                INTERSECT
+                SELECT unnest(matched_title.tokens)
+            )) >= 2
+        ELSE TRUE
+    END
+"""
+
+MATCHING_RECORDS_QUERY = f"""
+    WITH seeds AS (
+        SELECT records.id AS seed_id, {TITLE_TOKENS.format(title='records.title')} AS title_tokens
+        FROM records
+        WHERE records.id = ANY(:seed_ids) AND records.title IS NOT NULL
+    ),
+    frontier AS (
+        SELECT *
+        FROM unnest(CAST(:frontier_seed_ids AS integer[]), CAST(:frontier_record_ids AS integer[]))
+            AS frontier(seed_id, record_id)
+    )
+    SELECT DISTINCT frontier.seed_id, matched.record_id
+    FROM frontier
+    JOIN seeds ON seeds.seed_id = frontier.seed_id
+    JOIN record_identifiers walked_identifiers ON walked_identifiers.record_id = frontier.record_id
+    JOIN record_identifiers matched ON matched.identifier = walked_identifiers.identifier
+    JOIN records ON records.id = matched.record_id
+    CROSS JOIN LATERAL (SELECT {MATCHED_TITLE_TOKENS} AS tokens) matched_title
+    WHERE records.title IS NOT NULL
+        AND (NOT :match_titles OR {TITLES_OVERLAP})
+"""
+
+
+class IdentifierGraphManager:
+    """Answers transitive identifier matches from the record_identifiers
+    adjacency index with a breadth first walk that issues one query per hop.
+    Only records a seed has not reached yet are expanded at the next hop, and
+    a seed stops expanding once it has matched limit records."""
+
+    def __init__(self, session: Session, max_distance: int):
+        self.session = session
+        self.max_distance = max_distance
+
+    def get_matched_record_ids(self, record_id: int, limit: Optional[int] = None) -> list[int]:
+        return list(self.get_matched_record_ids_by_seed([record_id], limit=limit)[record_id])
+
+    def get_matched_record_ids_by_seed(
+        self, record_ids: list[int], limit: Optional[int] = None
+    ) -> dict[int, set[int]]:
+        matches_by_seed = { record_id: set() for record_id in record_ids }
+        expanded_by_seed = { record_id: { record_id } for record_id in record_ids }
+
+        frontier = [(record_id, record_id) for record_id in matches_by_seed]
+
+        for depth in range(self.max_distance):
+            if not frontier:
+                break
+
+            matches = self.session.execute(
+                text(MATCHING_RECORDS_QUERY),
+                {
+                    'seed_ids': list(matches_by_seed),
+                    'frontier_seed_ids': [seed_id for seed_id, _ in frontier],
+                    'frontier_record_ids': [frontier_record_id for _, frontier_record_id in frontier],
+                    'match_titles': depth > 0
+                }
+            ).all()
+
+            frontier = []
+
+            for seed_id, matched_record_id in matches:
+                seed_matches = matches_by_seed[seed_id]
+
+                if limit is not None and len(seed_matches) >= limit and matched_record_id not in seed_matches:
+                    continue
+
+                seed_matches.add(matched_record_id)
+
+                if matched_record_id not in expanded_by_seed[seed_id]:
+                    expanded_by_seed[seed_id].add(matched_record_id)
+                    frontier.append((seed_id, matched_record_id))
+
+            if limit is not None:
+                frontier = [
+                    (seed_id, frontier_record_id)
+                    for seed_id, frontier_record_id in frontier
+                    if len(matches_by_seed[seed_id]) < limit
+                ]
+
+        return matches_by_seed
@@ -29,9 +29,15 @@ class FeatureSelector(BaseEstimator, TransformerMixin):
 
 
 class KMeansManager:
-    def __init__(self, instances):
+    SILHOUETTE_SAMPLE_SIZE = 1000
+
+    def __init__(self, instances, randomState=None):
         self.instances = instances
+        self.randomState = randomState
         self.df = None
+        self.featureMatrix = None
+        self.clusterLabels = {}
+        self.clusterScores = {}
         self.clusters = defaultdict(list)
     
     def createPipeline(self, transformers):
@@ -80,9 +86,11 @@ class KMeansManager:
             ('union', FeatureUnion(
                 transformer_list=[pipelineComponents[t] for t in transformers],
                 transformer_weights={t: pipelineWeights[t] for t in transformers}
-            )),
-            ('kmeans', KMeans(n_clusters=self.currentK, max_iter=100, n_init=3))
+            ))
         ])
+
+    def createKMeans(self, k):
+        return KMeans(n_clusters=k, max_iter=100, n_init=3, random_state=self.randomState)
     
     @classmethod
     def pubProcessor(cls, raw):
@@ -229,6 +237,12 @@ class KMeansManager:
     def getK(self, start, stop):
         warnings.filterwarnings('error', category=ConvergenceWarning)
 
+        # Silhouette scores are undefined for fewer than three rows so the
+        # search below always settles on a single cluster for these
+        if len(self.df.index) <= 2:
+            self.k = 1
+            return
+
         startScore = 0
         stopScore = 0
 
@@ -268,18 +282,41 @@ class KMeansManager:
 
     def cluster(self, k, score=False):
         self.currentK = k
-        logger.debug('Generating cluster for k={}'.format(k))
-        columnsWithData = self.getDataColumns()
-        pipeline = self.createPipeline(columnsWithData)
-
-        labels = pipeline.fit_predict(self.df)
 
         if score is True:
-            pipeline.set_params(kmeans=None)
-            X = pipeline.fit_transform(self.df)
-            return silhouette_score(X, labels)
-        else:
-            return labels
+            if k not in self.clusterScores:
+                self.clusterScores[k] = self.scoreClusters(k)
+
+            return self.clusterScores[k]
+
+        return self.getClusterLabels(k)
+
+    def getFeatureMatrix(self):
+        if self.featureMatrix is None:
+            columnsWithData = self.getDataColumns()
+            pipeline = self.createPipeline(columnsWithData)
+
+            self.featureMatrix = pipeline.fit_transform(self.df)
+
+        return self.featureMatrix
+
+    def getClusterLabels(self, k):
+        if k not in self.clusterLabels:
+            logger.debug('Generating cluster for k={}'.format(k))
+            self.clusterLabels[k] = self.createKMeans(k).fit_predict(self.getFeatureMatrix())
+
+        return self.clusterLabels[k]
+
+    def scoreClusters(self, k):
+        labels = self.getClusterLabels(k)
+        featureMatrix = self.getFeatureMatrix()
+
+        sampleSize = self.SILHOUETTE_SAMPLE_SIZE\
+            if featureMatrix.shape[0] > self.SILHOUETTE_SAMPLE_SIZE else None
+
+        return silhouette_score(
+            featureMatrix, labels, sample_size=sampleSize, random_state=self.randomState
+        )
 
     def getDataColumns(self):
         dataColumns = []
@@ -2,6 +2,7 @@ from datetime import datetime, timezone
 import os
 import requests
 from requests.exceptions import Timeout, ConnectionError
+import threading
 from typing import Optional
 
 from logger import create_log
@@ -15,6 +16,7 @@ class OCLCAuthManager:
     _search_token_expires_at = None
     _metadata_token = None
     _metadata_token_expires_at = None
+    _token_lock = threading.Lock()
     OCLC_SEARCH_AUTH_URL = 'https://oauth.oclc.org/token?scope=wcapi&grant_type=client_credentials'
     OCLC_METADATA_AUTH_URL = 'https://oauth.oclc.org/token?scope=WorldCatMetadataAPI:view_marc_bib&grant_type=client_credentials'
 
@@ -26,30 +28,32 @@ class OCLCAuthManager:
         OCLC_CLIENT_ID = os.environ.get('OCLC_CLIENT_ID', None)
         OCLC_CLIENT_SECRET = os.environ.get('OCLC_CLIENT_SECRET', None)
 
-        cls._search_token, cls._search_token_expires_at = cls._get_token(
-            token=cls._search_token,
-            expires_at=cls._search_token_expires_at,
-            auth_url=cls.OCLC_SEARCH_AUTH_URL,
-            key_id=OCLC_CLIENT_ID,
-            key_secret=OCLC_CLIENT_SECRET
-        )
+        with cls._token_lock:
+            cls._search_token, cls._search_token_expires_at = cls._get_token(
+                token=cls._search_token,
+                expires_at=cls._search_token_expires_at,
+                auth_url=cls.OCLC_SEARCH_AUTH_URL,
+                key_id=OCLC_CLIENT_ID,
+                key_secret=OCLC_CLIENT_SECRET
+            )
 
-        return cls._search_token
+            return cls._search_token
 
     @classmethod
     def get_metadata_token(cls):
         OCLC_METADATA_ID = os.environ.get('OCLC_METADATA_ID', None)
         OCLC_METADATA_SECRET = os.environ.get('OCLC_METADATA_SECRET', None)
 
-        cls._metadata_token, cls._metadata_token_expires_at = cls._get_token(
-            token=cls._metadata_token,
-            expires_at=cls._metadata_token_expires_at,
-            auth_url=cls.OCLC_METADATA_AUTH_URL,
-            key_id=OCLC_METADATA_ID,
-            key_secret=OCLC_METADATA_SECRET
-        )
+        with cls._token_lock:
+            cls._metadata_token, cls._metadata_token_expires_at = cls._get_token(
+                token=cls._metadata_token,
+                expires_at=cls._metadata_token_expires_at,
+                auth_url=cls.OCLC_METADATA_AUTH_URL,
+                key_id=OCLC_METADATA_ID,
+                key_secret=OCLC_METADATA_SECRET
+            )
 
-        return cls._metadata_token
+            return cls._metadata_token
     
     @classmethod
     def _get_token(
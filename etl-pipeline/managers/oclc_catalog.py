@@ -1,6 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor
 import os
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import Timeout, ConnectionError
+import threading
+import time
 from typing import Optional
 
 from logger import create_log
@@ -17,9 +21,25 @@ class OCLCCatalogManager:
     LIMIT = 50
     MAX_NUMBER_OF_RECORDS = 100
     BEST_MATCH = 'bestMatch'
+    RATE_LIMIT_RETRIES = 3
+    RATE_LIMIT_BACKOFF_SECONDS = 5
 
-    def __init__(self):
+    # Backoff is shared by every manager in the process so that concurrent
+    # requests stop together once OCLC starts rate limiting
+    _backoff_lock = threading.Lock()
+    _backoff_until = 0
+
+    def __init__(self, max_concurrency: Optional[int]=None):
         self.rate_limited = False
+        self.max_concurrency = max_concurrency or int(os.environ.get('OCLC_MAX_CONCURRENCY', 5))
+
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=self.max_concurrency))
+
+        self.executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='oclc')
+
+    def query_catalogs(self, oclc_numbers: list) -> dict:
+        return dict(zip(oclc_numbers, self.executor.map(self.query_catalog, oclc_numbers)))
 
     def query_catalog(self, oclc_no):
         catalog_query = self.METADATA_BIB_URL.format(oclc_no)
@@ -29,7 +49,7 @@ class OCLCCatalogManager:
                 token = OCLCAuthManager.get_metadata_token()
                 headers = { 'Authorization': f'Bearer {token}' }
 
-                catalog_response = requests.get(catalog_query, headers=headers, timeout=5)
+                catalog_response = self._get(catalog_query, headers=headers, timeout=5)
 
                 if catalog_response.status_code != 200:
                     logger.warning(f'OCLC catalog request failed with status {catalog_response.status_code}')
@@ -63,10 +83,12 @@ class OCLCCatalogManager:
 
                 return self._get_oclc_number_from_bibs(oclc_number=oclc_number, oclc_bibs=related_oclc_bibs)
             
-            offset = self.LIMIT
-            while offset <= min(number_of_related_bibs, self.MAX_NUMBER_OF_RECORDS):
-                other_editions_response = self._get_other_editions(oclc_number=oclc_number, offset=offset)
+            offsets = self._get_page_offsets(number_of_related_bibs)
+            other_editions_pages = self.executor.map(
+                lambda offset: self._get_other_editions(oclc_number=oclc_number, offset=offset), offsets
+            )
 
+            for other_editions_response in other_editions_pages:
                 if not other_editions_response:
                     continue
 
@@ -78,7 +100,6 @@ class OCLCCatalogManager:
                 related_oclc_numbers.extend(
                     self._get_oclc_number_from_bibs(oclc_number=oclc_number, oclc_bibs=related_oclc_bibs)
                 )
-                offset += self.LIMIT
 
             return related_oclc_numbers
         except Exception as e:
@@ -92,7 +113,7 @@ class OCLCCatalogManager:
             token = OCLCAuthManager.get_search_token()
             headers = { 'Authorization': f'Bearer {token}' }
 
-            other_editions_response = requests.get(
+            other_editions_response = self._get(
                 other_editions_url,
                 headers=headers,
                 params={
@@ -119,6 +140,42 @@ class OCLCCatalogManager:
             logger.error(f'Failed to query other editions endpoint {other_editions_url} due to {e}')
             return None
 
+    def _get_page_offsets(self, number_of_records: int) -> list[int]:
+        return list(range(self.LIMIT, min(number_of_records, self.MAX_NUMBER_OF_RECORDS) + 1, self.LIMIT))
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        for attempt in range(0, self.RATE_LIMIT_RETRIES):
+            self._wait_for_backoff()
+
+            response = self.session.get(url, **kwargs)
+
+            if response.status_code != 429:
+                return response
+
+            self.rate_limited = True
+            self._back_off(response, attempt)
+
+        return response
+
+    def _wait_for_backoff(self):
+        wait_time = OCLCCatalogManager._backoff_until - time.monotonic()
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    def _back_off(self, response: requests.Response, attempt: int):
+        try:
+            backoff_seconds = float(response.headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            backoff_seconds = self.RATE_LIMIT_BACKOFF_SECONDS * 2 ** attempt
+
+        logger.warning(f'OCLC rate limit reached, backing off all requests for {backoff_seconds}s')
+
+        with OCLCCatalogManager._backoff_lock:
+            OCLCCatalogManager._backoff_until = max(
+                OCLCCatalogManager._backoff_until, time.monotonic() + backoff_seconds
+            )
+
     def _get_oclc_number_from_bibs(self, oclc_number: int, oclc_bibs) -> int:
         return [int(edition['oclcNumber']) for edition in oclc_bibs if int(edition['oclcNumber']) != oclc_number]
 
@@ -136,15 +193,14 @@ class OCLCCatalogManager:
             if number_of_bibs <= self.LIMIT:
                 return bibs_response.get('bibRecords', [])            
             
-            offset = self.LIMIT
-            while offset <= min(number_of_bibs, self.MAX_NUMBER_OF_RECORDS):
-                bibs_response = self._search_bibs(query=query, offset=offset)
+            offsets = self._get_page_offsets(number_of_bibs)
+            bibs_pages = self.executor.map(lambda offset: self._search_bibs(query=query, offset=offset), offsets)
 
+            for bibs_response in bibs_pages:
                 if not bibs_response:
                     continue
 
                 bibs.extend(bibs_response.get('bibRecords', []))
-                offset += self.LIMIT
 
             return bibs
         except Exception as e:
@@ -157,7 +213,7 @@ class OCLCCatalogManager:
             bibs_endpoint = self.OCLC_SEARCH_URL + 'bibs'
             headers = { "Authorization": f"Bearer {token}" }
 
-            bibs_response = requests.get(
+            bibs_response = self._get(
                 bibs_endpoint,
                 headers=headers,
                 params={
@@ -78,6 +78,21 @@ class RabbitMQManager:
                 routing_key=routing_key
             )
     
+    def set_prefetch_count(self, prefetch_count: int):
+        self.channel.basic_qos(prefetch_count=prefetch_count)
+
+    def consume_messages(self, queue_name: str, inactivity_timeout: float=None):
+        return self.channel.consume(queue_name, inactivity_timeout=inactivity_timeout)
+
+    def cancel_consumer(self):
+        return self.channel.cancel()
+
+    def add_threadsafe_callback(self, callback):
+        self.connection.add_callback_threadsafe(callback)
+
+    def process_data_events(self, time_limit: float=0):
+        self.connection.process_data_events(time_limit=time_limit)
+    
     def send_message_to_queue(self, queue_name: str, routing_key: str, message: Union[str, dict]):
         if isinstance(message, dict):
             message = json.dumps(message)
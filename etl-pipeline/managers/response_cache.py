@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+from time import perf_counter
+from typing import Callable, Iterable, Optional
+
+from redis import Redis
+
+from logger import create_log
+
+logger = create_log(__name__)
+
+
+class ResponseCache:
+    """Caches formatted API responses in Redis. Each entry is tagged with the ids
+    of the works it was built from so that reclustering those works clears it."""
+
+    def __init__(self, client: Redis, serializer: Callable[[object], str]=json.dumps):
+        self.client = client
+        self.serializer = serializer
+        self.environment = os.environ.get('ENVIRONMENT', 'test')
+
+        self.enabled = os.environ.get('API_RESPONSE_CACHE_ENABLED', 'true').lower() != 'false'
+        self.ttl = int(os.environ.get('API_RESPONSE_CACHE_TTL', 60 * 60))
+
+    def get_or_build(
+        self,
+        namespace: str,
+        identifier: str,
+        params: dict,
+        build_response: Callable[[], tuple[Optional[object], Iterable[int]]]
+    ) -> Optional[object]:
+        """Returns the cached response for the identifier and params, or calls
+        build_response for the response and the ids of the works it contains"""
+        start_time = perf_counter()
+
+        cached_response = self.get(namespace, identifier, params)
+
+        if cached_response is not None:
+            self.record_request(namespace, hit=True, latency=perf_counter() - start_time)
+            return cached_response
+
+        response, work_ids = build_response()
+
+        if response is not None:
+            self.set(namespace, identifier, params, response, work_ids)
+
+        self.record_request(namespace, hit=False, latency=perf_counter() - start_time)
+
+        return response
+
+    def get(self, namespace: str, identifier: str, params: dict) -> Optional[object]:
+        if not self.enabled:
+            return None
+
+        try:
+            cached_response = self.client.get(self._get_response_key(namespace, identifier, params))
+
+            return json.loads(cached_response) if cached_response is not None else None
+        except Exception:
+            logger.warning(f'Unable to read cached {namespace} response for {identifier}')
+            return None
+
+    def set(self, namespace: str, identifier: str, params: dict, response, work_ids: Iterable[int]):
+        if not self.enabled:
+            return
+
+        response_key = self._get_response_key(namespace, identifier, params)
+
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(response_key, self.serializer(response), ex=self.ttl)
+
+            for work_id in set(work_ids):
+                work_key = self._get_work_key(work_id)
+
+                pipe.sadd(work_key, response_key)
+                pipe.expire(work_key, self.ttl)
+
+            pipe.execute()
+        except Exception:
+            logger.warning(f'Unable to cache {namespace} response for {identifier}')
+
+    def invalidate_works(self, work_ids: Iterable[int]):
+        work_keys = [self._get_work_key(work_id) for work_id in set(work_ids) if work_id is not None]
+
+        if not work_keys:
+            return
+
+        try:
+            pipe = self.client.pipeline()
+
+            for work_key in work_keys:
+                pipe.smembers(work_key)
+
+            response_keys = set().union(*pipe.execute())
+
+            self.client.delete(*response_keys, *work_keys)
+
+            logger.debug(f'Invalidated {len(response_keys)} cached responses for {len(work_keys)} works')
+        except Exception:
+            logger.exception(f'Unable to invalidate cached responses for {len(work_keys)} works')
+
+    def record_request(self, namespace: str, hit: bool, latency: float):
+        metric_prefix = 'hit' if hit else 'miss'
+
+        try:
+            pipe = self.client.pipeline()
+            pipe.hincrby(self._get_metrics_key(namespace), f'{metric_prefix}_count', 1)
+            pipe.hincrbyfloat(self._get_metrics_key(namespace), f'{metric_prefix}_latency_ms', latency * 1000)
+            pipe.execute()
+        except Exception:
+            logger.warning(f'Unable to record {namespace} response cache metrics')
+
+    def get_metrics(self, namespaces: Iterable[str]) -> dict:
+        cache_metrics = {}
+
+        for namespace in namespaces:
+            namespace_metrics = {
+                field.decode('utf-8'): float(value)
+                for field, value in self.client.hgetall(self._get_metrics_key(namespace)).items()
+            }
+
+            hit_count = int(namespace_metrics.get('hit_count', 0))
+            miss_count = int(namespace_metrics.get('miss_count', 0))
+            request_count = hit_count + miss_count
+
+            cache_metrics[namespace] = {
+                'hits': hit_count,
+                'misses': miss_count,
+                'hitRatio': round(hit_count / request_count, 4) if request_count else None,
+                'averageHitLatencyMs': round(namespace_metrics.get('hit_latency_ms', 0) / hit_count, 2) if hit_count else None,
+                'averageMissLatencyMs': round(namespace_metrics.get('miss_latency_ms', 0) / miss_count, 2) if miss_count else None
+            }
+
+        return cache_metrics
+
+    def _get_response_key(self, namespace: str, identifier: str, params: dict) -> str:
+        params_hash = hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+        return f'{self.environment}/response-cache/{namespace}/{identifier}/{params_hash}'
+
+    def _get_work_key(self, work_id: int) -> str:
+        return f'{self.environment}/response-cache/works-index/{work_id}'
+
+    def _get_metrics_key(self, namespace: str) -> str:
+        return f'{self.environment}/response-cache/metrics/{namespace}'
@@ -1,10 +1,15 @@
 import base64
 import boto3
-from botocore.exceptions import ClientError
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError
+from concurrent.futures import ThreadPoolExecutor
 import hashlib
 from io import BytesIO
+import json
 import mimetypes
 import os
+from tempfile import SpooledTemporaryFile
+from typing import Iterable, Optional
 from zipfile import ZipFile
 from managers import WebpubManifest
 from digital_assets import get_stored_file_url
@@ -16,14 +21,18 @@ logger = create_log(__name__)
 
 
 class S3Manager:
+    MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
 
     def __init__(self):
+        self.epub_upload_workers = int(os.environ.get('S3_EPUB_UPLOAD_WORKERS', 8))
+
         self.client = boto3.client(
             's3',
             aws_access_key_id=os.environ.get('AWS_ACCESS', None),
             aws_secret_access_key=os.environ.get('AWS_SECRET', None),
             region_name=os.environ.get('AWS_REGION', None),
-            endpoint_url=os.environ.get('S3_ENDPOINT_URL', None)
+            endpoint_url=os.environ.get('S3_ENDPOINT_URL', None),
+            config=Config(max_pool_connections=max(10, self.epub_upload_workers))
         )
 
     def store_pdf_manifest(self, record: Record, bucket_name, flags=FileFlags(reader=True), path: str=None):
@@ -68,15 +77,8 @@ class S3Manager:
     def put_object(self, object, key: str, bucket: str, bucket_permissions: str='public-read'):
         object_md5 = S3Manager.get_md5_hash(object)
         object_extension = key[-4:].lower()
-        get_object_response = None
-
-        try:
-            if object_extension == 'epub':
-                get_object_response = self.get_object(key, bucket, md5_hash=object_md5)
-        except S3Error:
-            logger.info(f'{key} does not yet exist')
 
-        if get_object_response and (get_object_response['ResponseMetadata']['HTTPStatusCode'] == 304 or get_object_response['Metadata'].get('md5checksum', None) == object_md5):
+        if object_extension == 'epub' and self._is_unmodified(key, bucket, object_md5):
             logger.info(f'Skipping save of unmodified file: {key}')
             return None
 
@@ -98,12 +100,257 @@ class S3Manager:
         except ClientError as e:
             raise S3Error(f'Unable to store file {key} in s3: {e}')
 
+    def put_object_stream(self, chunks: Iterable[bytes], key: str, bucket: str, bucket_permissions: str='public-read') -> Optional[str]:
+        """Stores a stream of byte chunks without holding the whole object in
+        memory, returning the MD5 checksum of the stored object. EPUBs are
+        spooled to a temporary file so that their components can be unzipped."""
+        if key[-4:].lower() != 'epub':
+            return self._upload_stream(chunks, key, bucket, bucket_permissions)
+
+        with SpooledTemporaryFile(max_size=self.MULTIPART_CHUNK_SIZE) as epub_file:
+            epub_md5 = hashlib.md5()
+
+            for chunk in chunks:
+                epub_md5.update(chunk)
+                epub_file.write(chunk)
+
+            object_md5 = base64.b64encode(epub_md5.digest()).decode('utf-8')
+
+            if self._is_unmodified(key, bucket, object_md5):
+                logger.info(f'Skipping save of unmodified file: {key}')
+                return None
+
+            epub_file.seek(0)
+            self.store_epub(epub_file, key, bucket)
+
+            epub_file.seek(0)
+            return self._upload_stream(
+                iter(lambda: epub_file.read(self.MULTIPART_CHUNK_SIZE), b''),
+                key,
+                bucket,
+                bucket_permissions,
+                object_md5=object_md5
+            )
+
+    def _upload_stream(
+        self,
+        chunks: Iterable[bytes],
+        key: str,
+        bucket: str,
+        bucket_permissions: str,
+        object_md5: Optional[str]=None
+    ) -> str:
+        object_type = mimetypes.guess_type(key)[0] or 'binary/octet-stream'
+        metadata = { 'md5Checksum': object_md5 } if object_md5 else {}
+        stream_md5 = hashlib.md5()
+        part_buffer = bytearray()
+        upload_id = None
+        uploaded_parts = []
+
+        try:
+            for chunk in chunks:
+                stream_md5.update(chunk)
+                part_buffer.extend(chunk)
+
+                if len(part_buffer) < self.MULTIPART_CHUNK_SIZE:
+                    continue
+
+                if upload_id is None:
+                    upload_id = self.client.create_multipart_upload(
+                        ACL=bucket_permissions,
+                        Bucket=bucket,
+                        Key=key,
+                        ContentType=object_type,
+                        Metadata=metadata
+                    )['UploadId']
+
+                uploaded_parts.append(self._upload_part(bytes(part_buffer), len(uploaded_parts) + 1, key, bucket, upload_id))
+                part_buffer.clear()
+
+            stream_checksum = base64.b64encode(stream_md5.digest()).decode('utf-8')
+
+            # Objects smaller than a single part are stored with one request
+            if upload_id is None:
+                self.client.put_object(
+                    ACL=bucket_permissions,
+                    Body=bytes(part_buffer),
+                    Bucket=bucket,
+                    Key=key,
+                    ContentMD5=stream_checksum,
+                    ContentType=object_type,
+                    Metadata={ 'md5Checksum': stream_checksum }
+                )
+
+                return stream_checksum
+
+            if part_buffer:
+                uploaded_parts.append(self._upload_part(bytes(part_buffer), len(uploaded_parts) + 1, key, bucket, upload_id))
+
+            self.client.complete_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={ 'Parts': uploaded_parts }
+            )
+
+            return stream_checksum
+        except Exception as e:
+            if upload_id is not None:
+                self.client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+
+            raise S3Error(f'Unable to stream file {key} to s3: {e}')
+
+    def _upload_part(self, part: bytes, part_number: int, key: str, bucket: str, upload_id: str) -> dict:
+        part_response = self.client.upload_part(
+            Body=part,
+            Bucket=bucket,
+            Key=key,
+            PartNumber=part_number,
+            UploadId=upload_id,
+            ContentMD5=S3Manager.get_md5_hash(part)
+        )
+
+        return { 'ETag': part_response['ETag'], 'PartNumber': part_number }
+
+    def _is_unmodified(self, key: str, bucket: str, object_md5: str) -> bool:
+        try:
+            get_object_response = self.get_object(key, bucket, md5_hash=object_md5)
+        except S3Error:
+            logger.info(f'{key} does not yet exist')
+            return False
+
+        return bool(get_object_response) and (
+            get_object_response['ResponseMetadata']['HTTPStatusCode'] == 304
+            or get_object_response['Metadata'].get('md5checksum', None) == object_md5
+        )
+
     def store_epub(self, object, key: str, bucket: str):
+        """Stores the unzipped components of an EPUB alongside it, along with
+        a webpub manifest generated from its package document. Component
+        checksums are recorded in a manifest next to the EPUB so that only
+        components that changed since the last upload are stored again."""
         key_prefix = '.'.join(key.split('.')[:-1])
+        manifest_key = f'{key_prefix}.components.json'
+
+        stored_hashes = self._get_component_manifest(manifest_key, bucket)
+        component_hashes = {}
+
+        epub_file = BytesIO(object) if isinstance(object, (bytes, bytearray)) else object
+
+        with ZipFile(epub_file, 'r') as epub_zip, ThreadPoolExecutor(max_workers=self.epub_upload_workers) as executor:
+            component_uploads = {}
+            stored_count = 0
+            failed_components = []
 
-        with ZipFile(BytesIO(object), 'r') as epub_zip:
             for component in epub_zip.namelist():
-                self.put_object(object=epub_zip.open(component).read(), key=f'{key_prefix}/{component}', bucket=bucket)
+                component_contents = epub_zip.open(component).read()
+                component_md5 = S3Manager.get_md5_hash(component_contents)
+
+                if stored_hashes.get(component) == component_md5:
+                    component_hashes[component] = component_md5
+                    continue
+
+                component_uploads[component] = (
+                    component_md5,
+                    executor.submit(
+                        self._put_epub_component,
+                        component_contents,
+                        component_md5,
+                        f'{key_prefix}/{component}',
+                        bucket
+                    )
+                )
+
+                # Components are uploaded in windows so only one window of contents is held in memory
+                if len(component_uploads) >= self.epub_upload_workers:
+                    stored_count += self._collect_component_uploads(
+                        component_uploads, component_hashes, failed_components, key_prefix
+                    )
+
+            stored_count += self._collect_component_uploads(
+                component_uploads, component_hashes, failed_components, key_prefix
+            )
+
+            try:
+                webpub_manifest = self.generate_epub_manifest(epub_zip, key, bucket)
+            except Exception:
+                logger.exception(f'Failed to generate webpub manifest for {key}')
+                webpub_manifest = None
+
+        logger.info(f'Stored {stored_count} of {len(component_hashes) + len(failed_components)} components for {key}')
+
+        self._put_component_manifest(component_hashes, manifest_key, bucket)
+
+        if webpub_manifest:
+            self.put_object(webpub_manifest.encode('utf-8'), f'{key_prefix}/manifest.json', bucket)
+
+        if failed_components:
+            raise S3Error(f'Unable to store {len(failed_components)} components of {key} in s3')
+
+    def _collect_component_uploads(
+        self,
+        component_uploads: dict,
+        component_hashes: dict,
+        failed_components: list,
+        key_prefix: str
+    ) -> int:
+        stored_count = 0
+
+        for component, (component_md5, component_upload) in component_uploads.items():
+            try:
+                component_upload.result()
+                component_hashes[component] = component_md5
+                stored_count += 1
+            except (ClientError, BotoCoreError):
+                logger.exception(f'Failed to store EPUB component {key_prefix}/{component}')
+                failed_components.append(component)
+
+        component_uploads.clear()
+
+        return stored_count
+
+    def generate_epub_manifest(self, epub_zip: ZipFile, key: str, bucket: str) -> str:
+        key_prefix = '.'.join(key.split('.')[:-1])
+
+        manifest = WebpubManifest.fromEpub(
+            epub_zip,
+            epubURL=get_stored_file_url(storage_name=bucket, file_path=key),
+            rootURL=get_stored_file_url(storage_name=bucket, file_path=key_prefix),
+            manifestURL=get_stored_file_url(storage_name=bucket, file_path=f'{key_prefix}/manifest.json')
+        )
+
+        return manifest.toJson()
+
+    def _put_epub_component(self, component_contents: bytes, component_md5: str, key: str, bucket: str):
+        return self.client.put_object(
+            ACL='public-read',
+            Body=component_contents,
+            Bucket=bucket,
+            Key=key,
+            ContentMD5=component_md5,
+            ContentType=mimetypes.guess_type(key)[0] or 'binary/octet-stream',
+            Metadata={ 'md5Checksum': component_md5 }
+        )
+
+    def _get_component_manifest(self, manifest_key: str, bucket: str) -> dict:
+        try:
+            manifest_response = self.get_object(manifest_key, bucket)
+
+            return json.loads(manifest_response['Body'].read())
+        except (S3Error, ValueError):
+            logger.info(f'No component manifest found at {manifest_key}')
+            return {}
+
+    def _put_component_manifest(self, component_hashes: dict, manifest_key: str, bucket: str):
+        try:
+            self.client.put_object(
+                Body=json.dumps(component_hashes).encode('utf-8'),
+                Bucket=bucket,
+                Key=manifest_key,
+                ContentType='application/json'
+            )
+        except (ClientError, BotoCoreError):
+            logger.exception(f'Failed to store component manifest {manifest_key}')
 
     def get_object(self, key: str, bucket: str, md5_hash=None):
         try:
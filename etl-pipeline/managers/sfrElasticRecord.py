@@ -1,5 +1,11 @@
+from copy import deepcopy
 from elasticsearch.exceptions import ConnectionTimeout
+import fasttext
+import hashlib
+import json
+import os
 
+from logger import create_log
 from model import (
     ESWork,
     ESSubject,
@@ -11,8 +17,20 @@ from model import (
     PerLanguageField
 )
 
+logger = create_log(__name__)
+
 
 class SFRElasticRecordManager:
+    # Language codes that have an analyzed PerLanguageField, keyed to the name of that field
+    LANGUAGE_FIELDS = {
+        'en': 'en', 'de': 'de', 'fr': 'fr', 'es': 'sp', 'pl': 'po', 'nl': 'nl',
+        'it': 'it', 'da': 'da', 'ar': 'ar', 'zh': 'zh', 'el': 'el', 'hi': 'hi',
+        'fa': 'fa', 'ja': 'ja', 'ru': 'ru', 'th': 'th'
+    }
+    LANGUAGE_THRESHOLD = 0.7
+
+    languageModel = None
+
     def __init__(self, dbWork):
         self.dbWork = dbWork
         self.work = None
@@ -26,6 +44,8 @@ class SFRElasticRecordManager:
         self.work = ESWork(**workData)
 
         self.enhanceWork()
+
+        self.work.content_hash = SFRElasticRecordManager.generateContentHash(self.work)
     
     def saveWork(self, retries=0):
         try:
@@ -45,6 +65,8 @@ class SFRElasticRecordManager:
         object. This builds a single object from the related tables of the 
         db object that can be indexed and searched in ElasticSearch.
         """
+        self.work.display = SFRElasticRecordManager.createWorkDisplay(self.dbWork)
+
         self.work.date_created = self.dbWork.date_created
         self.work.date_modified = self.dbWork.date_modified
 
@@ -84,6 +106,33 @@ class SFRElasticRecordManager:
 
         self.work.editions = [self.createEdition(e) for e in self.dbWork.editions]
 
+    @classmethod
+    def generateContentHash(cls, work):
+        """SHA-256 of the generated document, stored with it so that works whose
+        document has not changed since they were last indexed can be skipped"""
+        content = work.to_dict()
+        content.pop('content_hash', None)
+        # Postgres bumps the modification time whenever it rewrites the row, even with identical content
+        content.pop('date_modified', None)
+
+        normalizedContent = json.dumps(cls.normalizeContent(content), sort_keys=True, default=str)
+
+        return hashlib.sha256(normalizedContent.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def normalizeContent(cls, content):
+        # Related rows are loaded from postgres in no fixed order, so lists are sorted before hashing
+        if isinstance(content, dict):
+            return {key: cls.normalizeContent(value) for key, value in content.items()}
+
+        if isinstance(content, (list, tuple, set)):
+            return sorted(
+                (cls.normalizeContent(value) for value in content),
+                key=lambda value: json.dumps(value, sort_keys=True, default=str)
+            )
+
+        return content
+
     @staticmethod
     def addAgent(agent, defaultRole='author'):
         agent['sort_name'] = agent['name'].lower()
@@ -106,11 +155,59 @@ class SFRElasticRecordManager:
         else:
             return False
 
+    @staticmethod
+    def createWorkDisplay(work):
+        """Copy of the work fields displayed by the API, stored unindexed so
+        that search results can be rendered without querying postgres"""
+        return deepcopy(dict(work))
+
+    @staticmethod
+    def createEditionDisplay(edition):
+        return deepcopy({
+            **dict(edition),
+            'id': edition.id,
+            'links': [
+                SFRElasticRecordManager.createLinkDisplay(link)
+                for link in edition.links
+            ],
+            'items': [
+                {
+                    **dict(item),
+                    'id': item.id,
+                    'physical_location': item.physical_location,
+                    'links': [
+                        SFRElasticRecordManager.createLinkDisplay(link)
+                        for link in item.links
+                    ],
+                    'rights': [
+                        {
+                            'source': rights.source,
+                            'license': rights.license,
+                            'rights_statement': rights.rights_statement
+                        }
+                        for rights in item.rights
+                    ]
+                }
+                # Searched works are loaded with an inner join on item links
+                for item in edition.items if item.links
+            ]
+        })
+
+    @staticmethod
+    def createLinkDisplay(link):
+        return {
+            'id': link.id,
+            'media_type': link.media_type,
+            'url': link.url,
+            'flags': link.flags
+        }
+
     def createEdition(self, edition):
         newEd = ESEdition(**{
             field: getattr(edition, field, None)
             for field in ESEdition.getFields()
         })
+        newEd.display = SFRElasticRecordManager.createEditionDisplay(edition)
         newEd.edition_id = newEd.id
         del newEd.id
 
@@ -134,9 +231,9 @@ class SFRElasticRecordManager:
             for l in list(filter(None, edition.languages))
         ]
 
-        newEd.formats = [
-            f for f in set(SFRElasticRecordManager.addAvailableFormats(edition.items))
-        ]
+        newEd.formats = sorted(
+            set(SFRElasticRecordManager.addAvailableFormats(edition.items))
+        )
 
         return newEd
 
@@ -146,6 +243,65 @@ class SFRElasticRecordManager:
             for link in item.links:
                 yield link.media_type
     
+    @classmethod
+    def detectLanguages(cls, works):
+        """Detects the language of every title, alt title, edition title and
+        subject heading of the works in a single batch, filling the matching
+        per-language field when detection is confident. Replaces the
+        language_detector ingest pipeline, and returns False if detection
+        is disabled or unavailable so that the pipeline can be used instead."""
+        if os.environ.get('LOCAL_LANGUAGE_DETECTION', 'true').lower() != 'true':
+            return False
+
+        try:
+            languageModel = cls.loadLanguageModel()
+        except Exception:
+            logger.exception('Unable to load language detection model')
+            return False
+
+        languageFields = [
+            field for work in works for field in cls.getLanguageFields(work)
+            if field is not None and field.default
+        ]
+
+        if not languageFields:
+            return True
+
+        labels, scores = languageModel.predict(
+            [' '.join(str(field.default).split()) for field in languageFields], k=1
+        )
+
+        for field, label, score in zip(languageFields, labels, scores):
+            language = label[0].replace('__label__', '')
+            field.language = language
+
+            if language in cls.LANGUAGE_FIELDS and score[0] > cls.LANGUAGE_THRESHOLD:
+                setattr(field, cls.LANGUAGE_FIELDS[language], field.default)
+
+        return True
+
+    @classmethod
+    def loadLanguageModel(cls):
+        if cls.languageModel is None:
+            cls.languageModel = fasttext.load_model(
+                os.environ.get('LANGUAGE_MODEL_PATH', 'lid.176.ftz')
+            )
+
+        return cls.languageModel
+
+    @staticmethod
+    def getLanguageFields(work):
+        yield work.title
+
+        yield from (work.alt_titles or [])
+
+        for edition in work.editions or []:
+            yield edition.title
+            yield edition.sub_title
+
+        for subject in work.subjects or []:
+            yield subject.heading
+
     def setSortTitle(self):
         if self.work.sort_title is None:
             self.work.sort_title = self.dbWork.title.lower()
@@ -4,7 +4,8 @@ import json
 from Levenshtein import jaro_winkler
 import pycountry
 import re
-from uuid import uuid4
+from sqlalchemy import func, select
+from uuid import UUID, uuid4
 
 from model import Work, Edition, Item, Identifier, Link, Record, Rights
 from logger import create_log
@@ -24,6 +25,20 @@ class SFRRecordManager:
         self.iso639_2b = iso639['2b']
         self.work = Work(uuid=uuid4(), editions=[])
 
+    @staticmethod
+    def requeueWorks(session, workUUIDs):
+        """Marks the records of the works as unclustered so that the next
+        cluster run rebuilds and reindexes them"""
+        recordUUIDs = (
+            select(func.unnest(Edition.dcdw_uuids))
+            .join(Work, Work.id == Edition.work_id)
+            .where(Work.uuid.in_(workUUIDs))
+        )
+
+        return session.query(Record)\
+            .filter(Record.uuid.in_(recordUUIDs))\
+            .update({'cluster_status': False}, synchronize_session=False)
+
     def mergeRecords(self):
         dcdwUUIDs = set()
 
@@ -43,6 +58,7 @@ class SFRRecordManager:
 
         for edition in self.work.editions:
             allIdentifiers.extend(edition.identifiers)
+            edition.links = self.dedupeLinks(edition.links)
 
             for item in edition.items:
                 allIdentifiers.extend(item.identifiers)
@@ -60,14 +76,58 @@ class SFRRecordManager:
             for item in edition.items:
                 self.assignIdentifierIDs(cleanIdentifiers, item.identifiers)
 
+        # The oldest matched work is updated in place so that reclustering unchanged
+        # records keeps its ids, and only the other matched works are stale
         if len(matchedWorks) > 0:
-            _, work_uuid, work_date_created = matchedWorks[0]
+            work_id, work_uuid, work_date_created = matchedWorks[0]
+            self.work.id = work_id
             self.work.uuid = work_uuid
             self.work.date_created = work_date_created
+            # Only edition or item rows may have changed, which would leave the work's modification time untouched
+            self.work.date_modified = datetime.now(timezone.utc).replace(tzinfo=None)
+
+            self.assignExistingEditionIDs(work_id)
 
         self.work = self.session.merge(self.work)
 
-        return [w[0] for w in matchedWorks]
+        return [w[0] for w in matchedWorks[1:]]
+
+    def assignExistingEditionIDs(self, workID):
+        existingEditions = defaultdict(list)
+
+        for existingEdition in self.session.query(Edition)\
+            .filter(Edition.work_id == workID)\
+            .order_by(Edition.id)\
+            .all():
+            existingEditions[SFRRecordManager.getEditionKey(existingEdition)].append(existingEdition)
+
+        for edition in self.work.editions:
+            matchedEditions = existingEditions[SFRRecordManager.getEditionKey(edition)]
+
+            if not matchedEditions:
+                continue
+
+            existingEdition = matchedEditions.pop(0)
+            edition.id = existingEdition.id
+
+            existingItems = defaultdict(list)
+
+            for existingItem in sorted(existingEdition.items, key=lambda item: item.id):
+                existingItems[SFRRecordManager.getItemKey(existingItem)].append(existingItem)
+
+            for item in edition.items:
+                matchedItems = existingItems[SFRRecordManager.getItemKey(item)]
+
+                if matchedItems:
+                    item.id = matchedItems.pop(0).id
+
+    @staticmethod
+    def getEditionKey(edition):
+        return frozenset(UUID(str(dcdwUUID)).hex for dcdwUUID in edition.dcdw_uuids or [])
+
+    @staticmethod
+    def getItemKey(item):
+        return (item.record_id, frozenset(link.url for link in item.links))
 
     def dedupeIdentifiers(self, identifiers):
         queryGroups = defaultdict(set)
@@ -1,17 +1,30 @@
 import json
+from lxml import etree
 import os
-from typing import NoReturn
+import posixpath
+from typing import NoReturn, Optional
+from zipfile import ZipFile
 
 
 class WebpubManifest:
     # TODO: change - the library simplified PDF profile no longer exists
     WEBPUB_PDF_PROFILE = 'http://librarysimplified.org/terms/profiles/pdf'
 
+    EPUB_NAMESPACES = {
+        'container': 'urn:oasis:names:tc:opendocument:xmlns:container',
+        'opf': 'http://www.idpf.org/2007/opf',
+        'dc': 'http://purl.org/dc/elements/1.1/',
+        'ncx': 'http://www.daisy.org/z3986/2005/ncx/',
+        'xhtml': 'http://www.w3.org/1999/xhtml',
+        'epub': 'http://www.idpf.org/2007/ops'
+    }
+
     def __init__(self, source, sourceType):
         self.metadata: dict = {'@type': 'https://schema.org/Book'}
         self.links: list = [{'href': source, 'type': sourceType, 'rel': 'alternate'}]
         self.readingOrder: list = []
         self.resources: set = set()
+        self.resourceTypes: dict = {}
         self.tableOfContents: list = []
 
         self.openSection = None
@@ -65,15 +78,16 @@ class WebpubManifest:
         self.addReadingOrder(component)
         self.addResource(component['href'])
 
-    def addReadingOrder(self, component: dict) -> NoReturn:
-        component['type'] = 'application/pdf'
+    def addReadingOrder(self, component: dict, mediaType: str='application/pdf') -> NoReturn:
+        component['type'] = mediaType
 
         self.readingOrder.append(component)
 
-    def addResource(self, href: str) -> NoReturn:
+    def addResource(self, href: str, mediaType: str='application/pdf') -> NoReturn:
         rootHref, *_ = href.split('#')
 
         self.resources.add(rootHref)
+        self.resourceTypes[rootHref] = mediaType
 
     def toDict(self) -> dict:
         return {
@@ -82,7 +96,7 @@ class WebpubManifest:
             'links': self.links,
             'readingOrder': self.readingOrder,
             'resources': [
-                {'href': res, 'type': 'application/pdf'}
+                {'href': res, 'type': self.resourceTypes.get(res, 'application/pdf')}
                 for res in self.resources
             ],
             'toc': self.tableOfContents
@@ -90,3 +104,152 @@ class WebpubManifest:
 
     def toJson(self) -> str:
         return json.dumps(self.toDict())
+
+    @classmethod
+    def fromEpub(cls, epubZip: ZipFile, epubURL: str, rootURL: str, manifestURL: Optional[str]=None) -> 'WebpubManifest':
+        """Builds a manifest from the container.xml and OPF package of an EPUB,
+        with components linked relative to rootURL, where the EPUB is unzipped"""
+        container = cls._parseEpubXML(epubZip, 'META-INF/container.xml')
+        opfPath = container.find('.//container:rootfile', cls.EPUB_NAMESPACES).get('full-path')
+        opfRoot = posixpath.dirname(opfPath)
+
+        package = cls._parseEpubXML(epubZip, opfPath)
+
+        manifest = cls(epubURL, 'application/epub+zip')
+
+        manifest._addEpubMetadata(package)
+
+        if manifestURL:
+            manifest.links.append({'rel': 'self', 'href': manifestURL, 'type': 'application/webpub+json'})
+
+        items = {
+            item.get('id'): item
+            for item in package.findall('opf:manifest/opf:item', cls.EPUB_NAMESPACES)
+        }
+
+        def itemPath(item) -> str:
+            return posixpath.normpath(posixpath.join(opfRoot, item.get('href')))
+
+        def itemURL(path: str) -> str:
+            return f'{rootURL}/{path}'
+
+        spine = package.find('opf:spine', cls.EPUB_NAMESPACES)
+        spineIDs = set()
+
+        for itemRef in spine.findall('opf:itemref', cls.EPUB_NAMESPACES):
+            item = items.get(itemRef.get('idref'))
+
+            if item is None:
+                continue
+
+            spineIDs.add(item.get('id'))
+            manifest.addReadingOrder({'href': itemURL(itemPath(item))}, mediaType=item.get('media-type'))
+
+        for itemID, item in items.items():
+            if itemID not in spineIDs:
+                manifest.addResource(itemURL(itemPath(item)), mediaType=item.get('media-type'))
+
+        navItem = next((item for item in items.values() if 'nav' in (item.get('properties') or '').split()), None)
+        ncxItem = items.get(spine.get('toc'))
+
+        if navItem is not None:
+            navPath = itemPath(navItem)
+            manifest.tableOfContents = manifest._parseEpubNav(
+                cls._parseEpubXML(epubZip, navPath), posixpath.dirname(navPath), itemURL
+            )
+        elif ncxItem is not None:
+            ncxPath = itemPath(ncxItem)
+            manifest.tableOfContents = manifest._parseEpubNCX(
+                cls._parseEpubXML(epubZip, ncxPath), posixpath.dirname(ncxPath), itemURL
+            )
+
+        return manifest
+
+    def _addEpubMetadata(self, package) -> NoReturn:
+        metadata = package.find('opf:metadata', self.EPUB_NAMESPACES)
+
+        for field, element in (('title', 'dc:title'), ('author', 'dc:creator'), ('identifier', 'dc:identifier'), ('language', 'dc:language')):
+            value = metadata.findtext(element, namespaces=self.EPUB_NAMESPACES)
+
+            if value and value.strip():
+                self.metadata[field] = value.strip()
+
+    def _parseEpubNav(self, navDocument, navRoot: str, itemURL) -> list:
+        navs = navDocument.findall('.//xhtml:nav', self.EPUB_NAMESPACES)
+        tocNav = next(
+            (nav for nav in navs if nav.get('{{{}}}type'.format(self.EPUB_NAMESPACES['epub'])) == 'toc'),
+            navs[0] if navs else None
+        )
+
+        if tocNav is None:
+            return []
+
+        def parseList(navList) -> list:
+            entries = []
+
+            for listItem in navList.findall('xhtml:li', self.EPUB_NAMESPACES) if navList is not None else []:
+                label = listItem.find('xhtml:a', self.EPUB_NAMESPACES)
+
+                if label is None:
+                    label = listItem.find('xhtml:span', self.EPUB_NAMESPACES)
+
+                entry = {}
+
+                if label is not None and label.get('href'):
+                    entry['href'] = self._resolveEpubHref(navRoot, label.get('href'), itemURL)
+
+                if label is not None:
+                    entry['title'] = ' '.join(''.join(label.itertext()).split())
+
+                children = parseList(listItem.find('xhtml:ol', self.EPUB_NAMESPACES))
+
+                if children:
+                    entry['children'] = children
+
+                entries.append(entry)
+
+            return entries
+
+        return parseList(tocNav.find('xhtml:ol', self.EPUB_NAMESPACES))
+
+    def _parseEpubNCX(self, ncxDocument, ncxRoot: str, itemURL) -> list:
+        def parseNavPoints(parent) -> list:
+            entries = []
+
+            for navPoint in parent.findall('ncx:navPoint', self.EPUB_NAMESPACES):
+                content = navPoint.find('ncx:content', self.EPUB_NAMESPACES)
+                title = navPoint.findtext('ncx:navLabel/ncx:text', namespaces=self.EPUB_NAMESPACES)
+
+                entry = {}
+
+                if content is not None and content.get('src'):
+                    entry['href'] = self._resolveEpubHref(ncxRoot, content.get('src'), itemURL)
+
+                if title:
+                    entry['title'] = title.strip()
+
+                children = parseNavPoints(navPoint)
+
+                if children:
+                    entry['children'] = children
+
+                entries.append(entry)
+
+            return entries
+
+        navMap = ncxDocument.find('ncx:navMap', self.EPUB_NAMESPACES)
+
+        return parseNavPoints(navMap) if navMap is not None else []
+
+    @staticmethod
+    def _resolveEpubHref(documentRoot: str, href: str, itemURL) -> str:
+        path, _, fragment = href.partition('#')
+        resolvedURL = itemURL(posixpath.normpath(posixpath.join(documentRoot, path)))
+
+        return f'{resolvedURL}#{fragment}' if fragment else resolvedURL
+
+    @staticmethod
+    def _parseEpubXML(epubZip: ZipFile, path: str):
+        parser = etree.XMLParser(resolve_entities=False, no_network=True)
+
+        return etree.fromstring(epubZip.read(path), parser=parser)
@@ -0,0 +1,66 @@
+"""Add record identifiers adjacency index
+
+Revision ID: 3b1f6c2d9e47
+Revises: 0cebb9a98a6f
+Create Date: 2026-10-18 09:12:41.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b1f6c2d9e47'
+down_revision = '0cebb9a98a6f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'record_identifiers',
+        sa.Column('identifier', sa.Unicode, primary_key=True),
+        sa.Column(
+            'record_id',
+            sa.Integer,
+            sa.ForeignKey('records.id', ondelete='CASCADE'),
+            primary_key=True,
+        ),
+    )
+    op.create_index('ix_record_identifiers_record_id', 'record_identifiers', ['record_id'])
+
+    op.execute(r'''
+        CREATE OR REPLACE FUNCTION sync_record_identifiers() RETURNS TRIGGER AS $$
+        BEGIN
+            DELETE FROM record_identifiers WHERE record_id = NEW.id;
+
+            INSERT INTO record_identifiers (identifier, record_id)
+            SELECT DISTINCT record_identifier, NEW.id
+            FROM unnest(NEW.identifiers) AS record_identifier
+            WHERE record_identifier ~ '\|(isbn|issn|oclc|lccn|owi)$';
+
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    ''')
+
+    op.execute('''
+        CREATE TRIGGER sync_record_identifiers
+        AFTER INSERT OR UPDATE OF identifiers ON records
+        FOR EACH ROW EXECUTE FUNCTION sync_record_identifiers()
+    ''')
+
+    op.execute(r'''
+        INSERT INTO record_identifiers (identifier, record_id)
+        SELECT DISTINCT record_identifier, records.id
+        FROM records
+        CROSS JOIN LATERAL unnest(records.identifiers) AS record_identifier
+        WHERE record_identifier ~ '\|(isbn|issn|oclc|lccn|owi)$'
+    ''')
+
+
+def downgrade():
+    op.execute('DROP TRIGGER IF EXISTS sync_record_identifiers ON records')
+    op.execute('DROP FUNCTION IF EXISTS sync_record_identifiers()')
+    op.drop_index('ix_record_identifiers_record_id')
+    op.drop_table('record_identifiers')
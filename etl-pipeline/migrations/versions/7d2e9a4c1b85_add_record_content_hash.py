@@ -0,0 +1,24 @@
+"""Add record content hash
+
+Revision ID: 7d2e9a4c1b85
+Revises: 3b1f6c2d9e47
+Create Date: 2026-10-18 14:37:05.918342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d2e9a4c1b85'
+down_revision = '3b1f6c2d9e47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('records', sa.Column('content_hash', sa.Unicode, nullable=True))
+
+
+def downgrade():
+    op.drop_column('records', 'content_hash')
@@ -21,6 +21,7 @@ class Edition(BaseInner):
     summary = Text()
     formats = Keyword()
     edition_id = Integer()
+    display = Object(enabled=False)
 
     agents = Nested(Agent)
     identifiers = Nested(Identifier)
@@ -18,6 +18,8 @@ class Work(BaseDoc):
     series = Text(fields={'keyword': Keyword()})
     series_position = Keyword()
     is_government_document = Boolean(multi=False)
+    display = Object(enabled=False)
+    content_hash = Keyword(index=False)
 
     editions = Nested(Edition)
     identifiers = Nested(Identifier)
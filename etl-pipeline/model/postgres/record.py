@@ -1,8 +1,9 @@
 from dataclasses import dataclass, asdict
 
 from enum import Enum
+import hashlib
 import json
-from sqlalchemy import Column, DateTime, Integer, Unicode, Boolean, Index
+from sqlalchemy import Column, DateTime, Integer, Unicode, Boolean, Index, Table, ForeignKey, DDL, event
 from sqlalchemy.dialects.postgresql import ARRAY, UUID, ENUM
 from sqlalchemy.ext.hybrid import hybrid_property
 from model.utilities.extractDailyEdition import extract
@@ -113,9 +114,17 @@ class Record(Base, Core):
     abstract = Column(Unicode) # dc:abstract, Non-Repeating
     has_part = Column(ARRAY(Unicode, dimensions=1)) # dc:hasPart, Repeating, Format "itemNo|uri|source|type|flags"
     coverage = Column(ARRAY(Unicode, dimensions=1)) # dc:coverage, non-Repeating, Format "locationCode|locationName|itemNo"
+    content_hash = Column(Unicode) # SHA-256 of the mapped metadata, used to skip unchanged records on re-ingest
 
     __tableargs__ = (Index('ix_record_identifiers', identifiers, postgresql_using="gin"))
 
+    CONTENT_HASH_FIELDS = (
+        'source', 'publisher_project_source', 'source_id', 'title', 'alternative', 'medium', 'is_part_of',
+        'subjects', 'authors', 'contributors', 'languages', 'dates', 'rights', 'identifiers', 'date_submitted',
+        'requires', 'spatial', 'publisher', 'has_version', 'table_of_contents', 'extent', 'abstract', 'has_part',
+        'coverage'
+    )
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._deletion_flag = False
@@ -130,13 +139,18 @@ class Record(Base, Core):
             'title', 'alternative', 'medium', 'is_part_of', 'subjects', 'authors',
             'contributors', 'languages', 'dates', 'rights', 'identifiers',
             'date_submitted', 'requires', 'spatial', 'publisher', 'has_version',
-            'table_of_contents', 'extent', 'abstract', 'has_part', 'coverage', 'date_modified'
+            'table_of_contents', 'extent', 'abstract', 'has_part', 'coverage', 'date_modified', 'content_hash'
         ]
     
     def __iter__(self):
         for attr in dir(self):
             yield attr, getattr(self, attr)
 
+    def generate_content_hash(self) -> str:
+        content = json.dumps([getattr(self, field) for field in self.CONTENT_HASH_FIELDS], default=str)
+
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
     @property
     def parts(self) -> list[Part]:
         parts = []
@@ -173,3 +187,37 @@ class Record(Base, Core):
     @deletion_flag.setter
     def deletion_flag(self, deletion_flag):
         self._deletion_flag = deletion_flag
+
+
+# Adjacency index of matchable identifiers to records, kept in sync with
+# records.identifiers by a trigger so every write path maintains it
+RECORD_IDENTIFIERS = Table('record_identifiers', Base.metadata,
+    Column('identifier', Unicode, primary_key=True),
+    Column('record_id', Integer, ForeignKey('records.id', ondelete='CASCADE'), primary_key=True, index=True)
+)
+
+MATCHABLE_IDENTIFIER_PATTERN = r'\|(isbn|issn|oclc|lccn|owi)$'
+
+SYNC_RECORD_IDENTIFIERS_FUNCTION = DDL(f'''
+    CREATE OR REPLACE FUNCTION sync_record_identifiers() RETURNS TRIGGER AS $$
+    BEGIN
+        DELETE FROM record_identifiers WHERE record_id = NEW.id;
+
+        INSERT INTO record_identifiers (identifier, record_id)
+        SELECT DISTINCT record_identifier, NEW.id
+        FROM unnest(NEW.identifiers) AS record_identifier
+        WHERE record_identifier ~ '{MATCHABLE_IDENTIFIER_PATTERN}';
+
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+''')
+
+SYNC_RECORD_IDENTIFIERS_TRIGGER = DDL('''
+    CREATE TRIGGER sync_record_identifiers
+    AFTER INSERT OR UPDATE OF identifiers ON records
+    FOR EACH ROW EXECUTE FUNCTION sync_record_identifiers()
+''')
+
+event.listen(RECORD_IDENTIFIERS, 'after_create', SYNC_RECORD_IDENTIFIERS_FUNCTION)
+event.listen(RECORD_IDENTIFIERS, 'after_create', SYNC_RECORD_IDENTIFIERS_TRIGGER)
@@ -16,6 +16,7 @@ from .ingest.met import METProcess
 from .util.db_maintenance import DatabaseMaintenanceProcess
 from .util.db_migration import MigrationProcess
 from .util.redrive_records import RedriveRecordsProcess
+from .util.es_reindex import ElasticsearchReindexProcess
 from .ingest.chicago_isac import ChicagoISACProcess
 from .ingest.loc import LOCProcess
 from .ingest.publisher_backlist import PublisherBacklistProcess
@@ -1,17 +1,23 @@
+import os
 import re
-from sqlalchemy.exc import DataError
+import time
+from collections import defaultdict
+from multiprocessing import Process
 from typing import Optional
 
 from constants.get_constants import get_constants
 from managers import (
     DBManager,
+    EditionGrouper,
     SFRRecordManager,
     KMeansManager,
     SFRElasticRecordManager,
     ElasticsearchManager,
     RedisManager,
+    IdentifierGraphManager,
+    ResponseCache,
 )
-from model import Record, Work
+from model import Edition, Record, Work
 from logger import create_log
 from . import utils
 
@@ -22,9 +28,13 @@ class ClusterProcess:
     MAX_MATCH_DISTANCE = 4
     CLUSTER_BATCH_SIZE = 50
     CLUSTER_SIZE_LIMIT = 10000
-    IDENTIFIERS_TO_MATCH = r"\|(?:isbn|issn|oclc|lccn|owi)$"
+    RECORD_CHUNK_SIZE = 500
+    CLAIM_RETRY_SECONDS = 5
+    RECORD_LOCK_NAMESPACE = 1001
+    WORK_LOCK_NAMESPACE = 1002
 
     def __init__(self, *args):
+        self.process_args = args
         self.params = utils.parse_process_args(*args)
 
         self.db_manager = DBManager()
@@ -33,6 +43,8 @@ class ClusterProcess:
         self.redis_manager = RedisManager()
         self.redis_manager.create_client()
 
+        self.response_cache = ResponseCache(self.redis_manager.client)
+
         self.elastic_search_manager = ElasticsearchManager()
 
         self.elastic_search_manager.create_elastic_connection()
@@ -43,7 +55,16 @@ class ClusterProcess:
 
     def runProcess(self):
         try:
-            self.cluster_records(
+            number_of_workers = int(os.environ.get("CLUSTER_WORKERS", 1))
+
+            if number_of_workers > 1:
+                cluster_records = self.cluster_records_in_parallel
+            elif "batch" in self.params.options:
+                cluster_records = self.cluster_records_in_batches
+            else:
+                cluster_records = self.cluster_records
+
+            cluster_records(
                 start_datetime=utils.get_start_datetime(
                     process_type=self.params.process_type,
                     ingest_period=self.params.ingest_period,
@@ -57,7 +78,9 @@ class ClusterProcess:
         finally:
             self.db_manager.close_connection()
 
-    def cluster_records(self, start_datetime=None, record_uuid=None, source=None):
+    def get_unclustered_records_query(
+        self, start_datetime=None, record_uuid=None, source=None
+    ):
         query_filters = [
             Record.frbr_status == "complete",
             Record.cluster_status == False,
@@ -74,13 +97,17 @@ class ClusterProcess:
         if source:
             query_filters.append(Record.source == source)
 
-        get_unclustered_records_query = self.db_manager.session.query(Record).filter(
-            *query_filters
+        return self.db_manager.session.query(Record).filter(*query_filters)
+
+    def cluster_records(self, start_datetime=None, record_uuid=None, source=None):
+        get_unclustered_records_query = self.get_unclustered_records_query(
+            start_datetime=start_datetime, record_uuid=record_uuid, source=source
         )
 
         works_to_index = []
         work_ids_to_delete = set()
         number_of_records_clustered = 0
+        start_time = time.perf_counter()
 
         while unclustered_record := get_unclustered_records_query.first():
             try:
@@ -104,22 +131,275 @@ class ClusterProcess:
             if len(works_to_index) >= self.CLUSTER_BATCH_SIZE:
                 self.update_elastic_search(works_to_index, work_ids_to_delete)
                 logger.info(f"Clustered {len(works_to_index)} works")
+
+                # Reclustered works are updated in place, so their cached responses are stale as well
+                work_ids_to_invalidate = work_ids_to_delete | {work.id for work in works_to_index}
                 works_to_index = []
 
                 self.delete_stale_works(work_ids_to_delete)
+                self.db_manager.session.commit()
+
+                self.response_cache.invalidate_works(work_ids_to_invalidate)
                 work_ids_to_delete = set()
 
+        logger.info(f"Clustered {len(works_to_index)} works")
+        self.update_elastic_search(works_to_index, work_ids_to_delete)
+        self.delete_stale_works(work_ids_to_delete)
+
+        work_ids_to_invalidate = work_ids_to_delete | {work.id for work in works_to_index}
+
+        self.db_manager.session.commit()
+
+        self.response_cache.invalidate_works(work_ids_to_invalidate)
+
+        self.log_clustering_rate(number_of_records_clustered, start_time)
+        self.requeue_dead_letter_works()
+
+    def cluster_records_in_parallel(
+        self, start_datetime=None, record_uuid=None, source=None
+    ):
+        number_of_workers = int(os.environ.get("CLUSTER_WORKERS", 1))
+        cluster_args = {
+            "start_datetime": start_datetime,
+            "record_uuid": record_uuid,
+            "source": source,
+        }
+
+        cluster_workers = []
+
+        for worker_index in range(number_of_workers):
+            cluster_worker = Process(
+                target=ClusterProcess.run_cluster_worker,
+                args=(
+                    self.process_args,
+                    cluster_args,
+                    (worker_index, number_of_workers),
+                ),
+            )
+            cluster_worker.start()
+
+            cluster_workers.append(cluster_worker)
+
+        for cluster_worker in cluster_workers:
+            cluster_worker.join()
+
+        failed_workers = [
+            worker_index
+            for worker_index, cluster_worker in enumerate(cluster_workers)
+            if cluster_worker.exitcode != 0
+        ]
+
+        if failed_workers:
+            raise ClusterError(f"Cluster workers {failed_workers} failed")
+
+    @staticmethod
+    def run_cluster_worker(process_args: tuple, cluster_args: dict, shard: tuple):
+        cluster_process = ClusterProcess(*process_args)
+
+        try:
+            cluster_process.cluster_records_in_batches(**cluster_args, shard=shard)
+        except Exception as e:
+            logger.exception(f"Cluster worker {shard[0]} failed")
+            raise e
+        finally:
+            cluster_process.db_manager.close_connection()
+
+    def cluster_records_in_batches(
+        self, start_datetime=None, record_uuid=None, source=None, shard=None
+    ):
+        get_unclustered_records_query = self.get_unclustered_records_query(
+            start_datetime=start_datetime, record_uuid=record_uuid, source=source
+        )
+
+        if shard is not None:
+            worker_index, number_of_workers = shard
+            get_unclustered_records_query = get_unclustered_records_query.filter(
+                Record.id.op("%")(number_of_workers) == worker_index
+            )
+
+        get_unclustered_records_query = get_unclustered_records_query.order_by(
+            Record.id
+        )
+
+        works_to_index = []
+        work_ids_to_delete = set()
+        clustered_record_ids = set()
+        deferred_record_ids = set()
+        number_of_works_clustered = 0
+        last_record_id = None
+        start_time = time.perf_counter()
+
+        while True:
+            records_query = get_unclustered_records_query
+
+            if last_record_id is not None:
+                records_query = records_query.filter(Record.id > last_record_id)
+
+            record_chunk = records_query.limit(self.RECORD_CHUNK_SIZE).all()
+
+            if not record_chunk and deferred_record_ids:
+                logger.info(
+                    f"Retrying {len(deferred_record_ids)} records claimed by other workers"
+                )
+
+                self.db_manager.session.commit()
+                time.sleep(self.CLAIM_RETRY_SECONDS)
+
+                deferred_record_ids = set()
+                last_record_id = None
+                continue
+
+            if not record_chunk:
+                break
+
+            last_record_id = record_chunk[-1].id
+
+            unclustered_records = [
+                record
+                for record in record_chunk
+                if record.id not in clustered_record_ids
+            ]
+
+            for seed_records, matched_record_ids in self.find_record_components(
+                unclustered_records
+            ):
+                if shard is not None:
+                    if not self.claim_component(matched_record_ids):
+                        deferred_record_ids.update(record.id for record in seed_records)
+                        self.db_manager.session.commit()
+                        continue
+
+                    seed_records = self.get_still_unclustered_records(seed_records)
+
+                    if not seed_records:
+                        clustered_record_ids.update(matched_record_ids)
+                        continue
+
+                try:
+                    work, stale_work_ids = self.cluster_component(
+                        matched_record_ids, seed_records
+                    )
+                    works_to_index.append(work)
+                    work_ids_to_delete.update(stale_work_ids)
+                    clustered_record_ids.update(matched_record_ids)
+                except ClusterError:
+                    logger.exception(f"Failed to cluster records {seed_records}")
+
+                    self.update_cluster_status([record.id for record in seed_records])
+                    self.db_manager.session.commit()
+
+                clustered_record_ids.update(record.id for record in seed_records)
+                number_of_works_clustered += 1
+
+                if (
+                    self.params.limit
+                    and number_of_works_clustered >= self.params.limit
+                ):
+                    break
+
+            if len(works_to_index) >= self.CLUSTER_BATCH_SIZE:
+                self.update_elastic_search(works_to_index, work_ids_to_delete)
+                logger.info(f"Clustered {len(works_to_index)} works")
+
+                # Reclustered works are updated in place, so their cached responses are stale as well
+                work_ids_to_invalidate = work_ids_to_delete | {work.id for work in works_to_index}
+                works_to_index = []
+
+                self.delete_stale_works(work_ids_to_delete)
                 self.db_manager.session.commit()
 
+                self.response_cache.invalidate_works(work_ids_to_invalidate)
+                work_ids_to_delete = set()
+
+            self.log_clustering_rate(len(clustered_record_ids), start_time)
+
+            if self.params.limit and number_of_works_clustered >= self.params.limit:
+                break
+
         logger.info(f"Clustered {len(works_to_index)} works")
         self.update_elastic_search(works_to_index, work_ids_to_delete)
         self.delete_stale_works(work_ids_to_delete)
 
+        work_ids_to_invalidate = work_ids_to_delete | {work.id for work in works_to_index}
+
+        self.db_manager.session.commit()
+
+        self.response_cache.invalidate_works(work_ids_to_invalidate)
+
+        self.log_clustering_rate(len(clustered_record_ids), start_time)
+        self.requeue_dead_letter_works()
+
+    def claim_component(self, record_ids: list[int]) -> bool:
+        """Take transaction scoped advisory locks on the records of a component
+        and on the works they currently belong to, so that concurrent workers
+        never merge the same records or works. The locks are released when the
+        worker commits its batch."""
+        if not self.db_manager.try_advisory_xact_locks(
+            self.RECORD_LOCK_NAMESPACE, record_ids
+        ):
+            return False
+
+        record_uuids = [
+            record_uuid.hex
+            for (record_uuid,) in self.db_manager.session.query(Record.uuid).filter(
+                Record.id.in_(record_ids)
+            )
+        ]
+
+        work_ids = [
+            work_id
+            for (work_id,) in self.db_manager.session.query(Edition.work_id)
+            .filter(Edition.dcdw_uuids.overlap(record_uuids))
+            .distinct()
+            if work_id is not None
+        ]
+
+        return self.db_manager.try_advisory_xact_locks(
+            self.WORK_LOCK_NAMESPACE, work_ids
+        )
+
+    def get_still_unclustered_records(self, records: list[Record]) -> list[Record]:
+        unclustered_record_ids = {
+            record_id
+            for (record_id,) in self.db_manager.session.query(Record.id)
+            .filter(Record.id.in_([record.id for record in records]))
+            .filter(Record.cluster_status == False)
+        }
+
+        return [record for record in records if record.id in unclustered_record_ids]
+
+    def log_clustering_rate(self, number_of_records: int, start_time: float):
+        elapsed_seconds = time.perf_counter() - start_time
+        records_per_second = (
+            number_of_records / elapsed_seconds if elapsed_seconds > 0 else 0.0
+        )
+
+        logger.info(
+            f"Clustered {number_of_records} records in {elapsed_seconds:.2f}s "
+            f"({records_per_second:.2f} records/sec)"
+        )
+
+    def requeue_dead_letter_works(self):
+        # Re-queued records would be picked up again by the running loop, so works are only re-queued once it ends
+        dead_letter_works = self.elastic_search_manager.drain_dead_letter_works()
+
+        if not dead_letter_works:
+            return
+
+        logger.error(
+            f"Unable to index {len(dead_letter_works)} works in ElasticSearch, "
+            f"re-queueing works: {', '.join(dead_letter_works)}"
+        )
+
+        SFRRecordManager.requeueWorks(self.db_manager.session, dead_letter_works)
         self.db_manager.session.commit()
 
     def cluster_record(self, record: Record):
         matched_record_ids = self.find_all_matching_records(record) + [record.id]
 
+        return self.cluster_component(matched_record_ids, [record])
+
+    def cluster_component(self, matched_record_ids: list[int], seed_records: list):
         clustered_editions, records = self.cluster_matched_records(matched_record_ids)
         work, stale_work_ids = self.create_work_from_editions(
             clustered_editions, records
@@ -129,9 +409,9 @@ class ClusterProcess:
             self.db_manager.session.flush()
         except Exception:
             self.db_manager.session.rollback()
-            logger.exception(f"Unable to cluster record {record}")
+            logger.exception(f"Unable to cluster records {seed_records}")
 
-            raise ClusterError(f"Unable to cluster record {record}")
+            raise ClusterError(f"Unable to cluster records {seed_records}")
 
         self.update_cluster_status(matched_record_ids)
 
@@ -160,97 +440,94 @@ class ClusterProcess:
             .all()
         )
 
-        kmean_manager = KMeansManager(records)
+        editions = EditionGrouper(records).group_editions()
 
-        kmean_manager.createDF()
-        kmean_manager.generateClusters()
-        editions = kmean_manager.parseEditions()
+        if editions is None:
+            kmean_manager = KMeansManager(records)
+
+            kmean_manager.createDF()
+            kmean_manager.generateClusters()
+            editions = kmean_manager.parseEditions()
 
         return editions, records
 
     def find_all_matching_records(self, record: Record):
-        tokenized_record_title = self.tokenize_title(record.title)
-        ids_to_match = list(
-            filter(
-                lambda id: re.search(self.IDENTIFIERS_TO_MATCH, id), record.identifiers
-            )
-        )
+        if not record.title:
+            raise ClusterError(f"Record {record.uuid} has no title")
 
-        matched_record_ids = set()
-        checked_ids = set()
+        identifier_graph_manager = IdentifierGraphManager(
+            self.db_manager.session, self.MAX_MATCH_DISTANCE
+        )
 
-        ids_to_check = ids_to_match
+        matched_record_ids = identifier_graph_manager.get_matched_record_ids(
+            record.id, limit=self.CLUSTER_SIZE_LIMIT + 1
+        )
 
-        for match_distance in range(0, self.MAX_MATCH_DISTANCE):
-            matched_records = self.get_matched_records(
-                list(ids_to_check), matched_record_ids.copy()
+        if len(matched_record_ids) > self.CLUSTER_SIZE_LIMIT:
+            raise ClusterError(
+                f"Records matched is greater than {self.CLUSTER_SIZE_LIMIT}"
             )
 
-            if len(matched_records) == 0:
-                break
+        return matched_record_ids
 
-            checked_ids.update(ids_to_check)
+    def find_record_components(self, records: list[Record]):
+        """Find the matching records for a chunk of records at once.
 
-            ids_to_check = set()
+        Seed records that share matched records are merged into a single
+        component. Returns a list of (seed_records, matched_record_ids) tuples.
+        """
+        seed_records = {record.id: record for record in records}
+        parents = {}
 
-            for matched_record in matched_records:
-                matched_record_title, matched_record_id, matched_record_identifiers = (
-                    matched_record
-                )
+        def find_root(record_id):
+            while parents[record_id] != record_id:
+                parents[record_id] = parents[parents[record_id]]
+                record_id = parents[record_id]
 
-                tokenized_matched_record_title = self.tokenize_title(
-                    matched_record_title
-                )
+            return record_id
 
-                if match_distance > 0 and not self.titles_overlap(
-                    tokenized_record_title, tokenized_matched_record_title
-                ):
-                    continue
-
-                ids_to_check.update(
-                    list(
-                        filter(
-                            lambda id: re.search(self.IDENTIFIERS_TO_MATCH, id)
-                            and id not in checked_ids,
-                            matched_record_identifiers,
-                        )
-                    )
-                )
+        def union(record_id, other_record_id):
+            parents.setdefault(record_id, record_id)
+            parents.setdefault(other_record_id, other_record_id)
+            parents[find_root(record_id)] = find_root(other_record_id)
 
-                matched_record_ids.add(matched_record_id)
+        identifier_graph_manager = IdentifierGraphManager(
+            self.db_manager.session, self.MAX_MATCH_DISTANCE
+        )
 
-        if len(matched_record_ids) > self.CLUSTER_SIZE_LIMIT:
-            raise ClusterError(
-                f"Records matched is greater than {self.CLUSTER_SIZE_LIMIT}"
-            )
+        matches_by_seed = identifier_graph_manager.get_matched_record_ids_by_seed(
+            list(seed_records.keys()), limit=self.CLUSTER_SIZE_LIMIT + 1
+        )
 
-        return list(matched_record_ids)
+        for seed_id, matched_record_ids in matches_by_seed.items():
+            parents.setdefault(seed_id, seed_id)
 
-    def get_matched_records(
-        self, identifiers: list[str], already_matched_record_ids: list[str]
-    ):
-        batch_size = 100
-        matched_records = []
+            for matched_record_id in matched_record_ids:
+                union(matched_record_id, seed_id)
 
-        for i in range(0, len(identifiers), batch_size):
-            id_batch = self.format_identifiers(identifiers[i : i + batch_size])
+        components = defaultdict(lambda: ([], set()))
 
-            try:
-                records = (
-                    self.db_manager.session.query(
-                        Record.title, Record.id, Record.identifiers
-                    )
-                    .filter(~Record.id.in_(list(already_matched_record_ids)))
-                    .filter(Record.identifiers.overlap(id_batch))
-                    .filter(Record.title.isnot(None))
-                    .all()
+        for record_id in parents:
+            component_seeds, component_record_ids = components[find_root(record_id)]
+            component_record_ids.add(record_id)
+
+            if record_id in seed_records:
+                component_seeds.append(seed_records[record_id])
+
+        record_components = []
+
+        for component_seeds, component_record_ids in components.values():
+            if len(component_record_ids) > self.CLUSTER_SIZE_LIMIT:
+                logger.error(
+                    f"Records matched is greater than {self.CLUSTER_SIZE_LIMIT} "
+                    f"for {component_seeds}"
                 )
+                self.update_cluster_status([record.id for record in component_seeds])
+                continue
 
-                matched_records.extend(records)
-            except DataError:
-                logger.exception("Unable to get matching records")
+            record_components.append((component_seeds, list(component_record_ids)))
 
-        return matched_records
+        return record_components
 
     def create_work_from_editions(self, editions, records):
         record_manager = SFRRecordManager(
@@ -273,27 +550,21 @@ class ClusterProcess:
             elastic_manager.getCreateWork()
             work_documents.append(elastic_manager.work)
 
-        self.elastic_search_manager.save_work_records(work_documents)
+        changed_documents = self.elastic_search_manager.get_changed_works(work_documents)
 
-    def titles_overlap(
-        self, tokenized_record_title: set, tokenized_matched_record_title: set
-    ):
-        if (
-            len(tokenized_record_title) == 1
-            and not tokenized_record_title <= tokenized_matched_record_title
-        ):
-            return False
-        elif (
-            len(tokenized_matched_record_title) == 1
-            and not tokenized_record_title >= tokenized_matched_record_title
-        ):
-            return False
-        elif (
-            len(tokenized_record_title) > 1 and len(tokenized_matched_record_title) > 1
-        ) and len(tokenized_record_title & tokenized_matched_record_title) < 2:
-            return False
+        if len(changed_documents) < len(work_documents):
+            logger.info(
+                f"Skipping {len(work_documents) - len(changed_documents)} unchanged works"
+            )
+
+        if not changed_documents:
+            return
+
+        languages_detected = SFRElasticRecordManager.detectLanguages(changed_documents)
 
-        return True
+        self.elastic_search_manager.save_work_records(
+            changed_documents, pipeline=None if languages_detected else "language_detector"
+        )
 
     def tokenize_title(self, title: Optional[str]):
         if not title:
@@ -303,15 +574,6 @@ class ClusterProcess:
 
         return set(title_tokens) - set(["a", "an", "the", "of"])
 
-    def format_identifiers(self, identifiers):
-        formatted_ids = []
-
-        for id in identifiers:
-            formatted_id = f'"{id}"' if re.search(r"[{},]{1}", id) else id
-            formatted_ids.append(formatted_id)
-
-        return "{{{}}}".format(",".join(formatted_ids))
-
 
 class ClusterError(Exception):
     pass
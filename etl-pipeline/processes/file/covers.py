@@ -2,8 +2,10 @@ from datetime import datetime, timedelta, timezone
 import os
 
 from digital_assets import get_stored_file_url
-from managers import CoverManager, DBManager, RedisManager, S3Manager
-from model import Edition, FileFlags, Link
+from managers import (
+    CoverManager, DBManager, ElasticsearchManager, RedisManager, ResponseCache, S3Manager, SFRElasticRecordManager
+)
+from model import Edition, FileFlags, Link, Work
 from model.postgres.edition import EDITION_LINKS
 from logger import create_log
 from .. import utils
@@ -23,6 +25,11 @@ class CoverProcess():
         self.redis_manager = RedisManager()
         self.redis_manager.create_client()
 
+        self.response_cache = ResponseCache(self.redis_manager.client)
+
+        self.elastic_search_manager = ElasticsearchManager()
+        self.elastic_search_manager.create_elastic_connection()
+
         self.s3_manager = S3Manager()
         self.fileBucket = os.environ['FILE_BUCKET']
 
@@ -36,7 +43,7 @@ class CoverProcess():
 
             self.get_edition_covers(editions_with_covers_query)
 
-            self.db_manager.bulk_save_objects(self.editions_to_update)
+            self.save_editions()
         except Exception:
             logger.exception('Failed to run cover process')
         finally:
@@ -98,5 +105,41 @@ class CoverProcess():
         self.editions_to_update.add(edition)
 
         if len(self.editions_to_update) >= CoverProcess.BATCH_SIZE:
-            self.db_manager.bulk_save_objects(self.editions_to_update)
-            self.editions_to_update.clear()
+            self.save_editions()
+
+    def save_editions(self):
+        self.db_manager.bulk_save_objects(self.editions_to_update)
+
+        self.update_works(set(edition.work_id for edition in self.editions_to_update))
+
+        self.editions_to_update.clear()
+
+    def update_works(self, work_ids):
+        if not work_ids:
+            return
+
+        # Covers are part of the work documents in ElasticSearch and of the cached API responses
+        works = self.db_manager.session.query(Work).filter(Work.id.in_(list(work_ids))).all()
+
+        for work in works:
+            work.date_modified = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        self.db_manager.session.commit()
+
+        work_documents = []
+
+        for work in works:
+            elastic_manager = SFRElasticRecordManager(work)
+            elastic_manager.getCreateWork()
+            work_documents.append(elastic_manager.work)
+
+        changed_documents = self.elastic_search_manager.get_changed_works(work_documents)
+
+        if changed_documents:
+            languages_detected = SFRElasticRecordManager.detectLanguages(changed_documents)
+
+            self.elastic_search_manager.save_work_records(
+                changed_documents, pipeline=None if languages_detected else 'language_detector'
+            )
+
+        self.response_cache.invalidate_works(work_ids)
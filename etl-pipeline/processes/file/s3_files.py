@@ -1,9 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 import json
 from multiprocessing import Process
 import os
 import requests
+from requests.adapters import HTTPAdapter
+import threading
 from time import sleep
-from urllib.parse import quote_plus
+from typing import Optional
+from urllib.parse import urlparse
 
 from managers import S3Manager, RabbitMQManager
 from logger import create_log
@@ -13,19 +18,41 @@ from utils import retry_request
 logger = create_log(__name__)
 
 
+class HostConcurrencyLimiter:
+
+    def __init__(self, per_host_limit: int):
+        self.per_host_limit = per_host_limit
+        self.host_semaphores = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def limit(self, url: str):
+        host = urlparse(url).netloc
+
+        with self.lock:
+            host_semaphore = self.host_semaphores.setdefault(host, threading.BoundedSemaphore(self.per_host_limit))
+
+        with host_semaphore:
+            yield
+
+
 class S3Process():
-    WEBPUB_CONVERSION_BASE_URL = 'https://epub-to-webpub.vercel.app'
+    USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5)'
 
     def __init__(self, *args):
-        pass
+        self.worker_count = int(os.environ.get('FILE_WORKERS', 4))
+        self.worker_concurrency = int(os.environ.get('FILE_WORKER_CONCURRENCY', 8))
+        self.per_host_limit = int(os.environ.get('FILE_PER_HOST_CONCURRENCY', 4))
 
     def runProcess(self, max_poll_attempts: int=4):
         try:
-            number_of_processes = 4
             file_processes = []
 
-            for _ in range(number_of_processes):
-                file_process = Process(target=S3Process.process_files, args=(max_poll_attempts,))
+            for _ in range(self.worker_count):
+                file_process = Process(
+                    target=S3Process.process_files,
+                    args=(max_poll_attempts, self.worker_concurrency, self.per_host_limit)
+                )
                 file_process.start()
 
                 file_processes.append(file_process)
@@ -36,7 +63,7 @@ class S3Process():
             logger.exception('Failed to run S3 Process')
 
     @staticmethod
-    def process_files(max_poll_attempts: int):
+    def process_files(max_poll_attempts: int, concurrency: int=1, per_host_limit: int=4):
         storage_manager = S3Manager()
 
         file_queue = os.environ['FILE_QUEUE']
@@ -46,90 +73,127 @@ class S3Process():
         rabbit_mq_manager.create_connection()
         rabbit_mq_manager.create_or_connect_queue(file_queue, file_route)
 
-        for poll_attempt in range(0, max_poll_attempts):
-            wait_time = 30 * poll_attempt
+        session = S3Process.create_session(concurrency)
+        host_limiter = HostConcurrencyLimiter(per_host_limit)
+        in_flight_messages = set()
 
-            if wait_time:
-                logger.info(f'Waiting {wait_time}s for S3 file messages')
-                sleep(wait_time)
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                for poll_attempt in range(0, max_poll_attempts):
+                    wait_time = 30 * poll_attempt
 
-            while message := rabbit_mq_manager.get_message_from_queue(file_queue):
-                message_props, _, message_body = message
+                    if wait_time:
+                        S3Process._wait_for_messages(rabbit_mq_manager, in_flight_messages, 0)
 
-                if not message_props or not message_body:
-                    break
+                        logger.info(f'Waiting {wait_time}s for S3 file messages')
+                        sleep(wait_time)
 
-                S3Process.process_message(
-                    message=message, 
-                    storage_manager=storage_manager, 
-                    rabbit_mq_manager=rabbit_mq_manager
-                )
+                    while message := rabbit_mq_manager.get_message_from_queue(file_queue):
+                        message_props, _, message_body = message
+
+                        if not message_props or not message_body:
+                            break
+
+                        # Acks happen on this thread, so wait here for a free slot before fetching more messages
+                        S3Process._wait_for_messages(rabbit_mq_manager, in_flight_messages, concurrency - 1)
+
+                        in_flight_messages.add(message_props.delivery_tag)
+                        executor.submit(
+                            S3Process.process_message,
+                            message=message,
+                            storage_manager=storage_manager,
+                            rabbit_mq_manager=rabbit_mq_manager,
+                            session=session,
+                            host_limiter=host_limiter,
+                            in_flight_messages=in_flight_messages
+                        )
+
+                S3Process._wait_for_messages(rabbit_mq_manager, in_flight_messages, 0)
+        finally:
+            session.close()
 
     @staticmethod
-    def process_message(message, storage_manager: S3Manager, rabbit_mq_manager: RabbitMQManager):
-        message_props, _, message_body = message
+    def create_session(concurrency: int) -> requests.Session:
+        session = requests.Session()
+        session.headers.update({ 'User-Agent': S3Process.USER_AGENT })
 
-        s3_file_bucket = os.environ['FILE_BUCKET']
-        file_data = json.loads(message_body)['fileData']
-        file_url = file_data['fileURL']
-        file_path = file_data['bucketPath']
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
 
-        try:
-            file_contents = S3Process.get_file_contents(file_url)
+        return session
+
+    @staticmethod
+    def _wait_for_messages(rabbit_mq_manager: RabbitMQManager, in_flight_messages: set, max_in_flight: int):
+        while len(in_flight_messages) > max_in_flight:
+            rabbit_mq_manager.process_data_events(time_limit=1)
+
+    @staticmethod
+    def process_message(
+        message,
+        storage_manager: S3Manager,
+        rabbit_mq_manager: RabbitMQManager,
+        session: Optional[requests.Session]=None,
+        host_limiter: Optional[HostConcurrencyLimiter]=None,
+        in_flight_messages: Optional[set]=None
+    ):
+        message_props, _, message_body = message
+        processed = False
 
-            storage_manager.put_object(file_contents, file_path, s3_file_bucket)
-            
-            del file_contents
+        try:
+            s3_file_bucket = os.environ['FILE_BUCKET']
+            file_data = json.loads(message_body)['fileData']
+            file_url = file_data['fileURL']
+            file_path = file_data['bucketPath']
+        except Exception:
+            logger.exception(f'Unable to parse file message: {message_body}')
+            S3Process._complete_message(rabbit_mq_manager, message_props.delivery_tag, processed, in_flight_messages)
+            return
 
-            if '.epub' in file_path:
-                file_root = '.'.join(file_path.split('.')[:-1])
+        host_limiter = host_limiter or HostConcurrencyLimiter(1)
 
-                web_pub_manifest = S3Process.generate_webpub(file_root, s3_file_bucket)
+        try:
+            # The download is streamed into S3, so the host slot is held until the upload finishes
+            with host_limiter.limit(file_url):
+                file_stream = S3Process.get_file_stream(file_url, session=session)
 
-                storage_manager.put_object(web_pub_manifest, f'{file_root}/manifest.json', s3_file_bucket)
+                storage_manager.put_object_stream(file_stream, file_path, s3_file_bucket)
 
-            rabbit_mq_manager.acknowledge_message_processed(message_props.delivery_tag)
+            processed = True
 
             logger.info(f'Stored file in S3 for {file_url}')
         except Exception:
             logger.exception(f'Failed to store file for file url: {file_url}')
-            rabbit_mq_manager.reject_message(delivery_tag=message_props.delivery_tag)
+        finally:
+            S3Process._complete_message(rabbit_mq_manager, message_props.delivery_tag, processed, in_flight_messages)
+
+    @staticmethod
+    def _complete_message(rabbit_mq_manager: RabbitMQManager, delivery_tag: int, processed: bool, in_flight_messages: Optional[set]):
+        def complete_message():
+            if processed:
+                rabbit_mq_manager.acknowledge_message_processed(delivery_tag)
+            else:
+                rabbit_mq_manager.reject_message(delivery_tag=delivery_tag)
+
+            if in_flight_messages is not None:
+                in_flight_messages.discard(delivery_tag)
+
+        rabbit_mq_manager.add_threadsafe_callback(complete_message)
 
     @staticmethod
     @retry_request()
-    def get_file_contents(file_url: str):
+    def get_file_stream(file_url: str, session: Optional[requests.Session]=None):
         try:
-            file_url_response = requests.get(
+            file_url_response = (session or requests).get(
                 file_url,
                 stream=True,
                 timeout=15,
-                headers={ 'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5)' }
+                headers={ 'User-Agent': S3Process.USER_AGENT }
             )
 
             file_url_response.raise_for_status()
 
-            file_contents = bytes()
-
-            for byte_chunk in file_url_response.iter_content(1024 * 250):
-                file_contents += byte_chunk
-
-            return file_contents
-        except Exception as e:
-            logger.exception(f'Failed to get file contents from {file_url}')
-            raise e
-
-    @staticmethod
-    @retry_request()
-    def generate_webpub(file_root, bucket):
-        s3_file_path = f'https://{bucket}.s3.amazonaws.com/{file_root}/META-INF/container.xml'
-        webpub_conversion_url = f'{S3Process.WEBPUB_CONVERSION_BASE_URL}/api/{quote_plus(s3_file_path)}'
-
-        try:
-            webpub_response = requests.get(webpub_conversion_url, timeout=15)
-
-            webpub_response.raise_for_status()
-
-            return webpub_response.content
+            return file_url_response.iter_content(1024 * 250)
         except Exception as e:
-            logger.exception(f'Failed to generate webpub for {file_root}')
+            logger.exception(f'Failed to get file stream from {file_url}')
             raise e
@@ -85,4 +85,4 @@ class DOABProcess():
     def _log_results(self):
         if self.record_buffer.deletion_count != 0:
             logger.info(f'Deleted {self.record_buffer.deletion_count} DOAB records')
-        logger.info(f'Ingested {self.record_buffer.ingest_count} DOAB records')
+        logger.info(f'Ingested {self.record_buffer.ingest_count} DOAB records, skipped {self.record_buffer.unchanged_count} unchanged records')
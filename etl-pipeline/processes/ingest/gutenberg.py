@@ -54,7 +54,7 @@ class GutenbergProcess():
 
         self.record_buffer.flush()
 
-        logger.info(f'Ingested {self.record_buffer.ingest_count} Gutenberg records')
+        logger.info(f'Ingested {self.record_buffer.ingest_count} Gutenberg records, skipped {self.record_buffer.unchanged_count} unchanged records')
 
         return self.record_buffer.ingest_count
 
@@ -13,7 +13,7 @@ class HathiTrustProcess():
         self.db_manager = DBManager()
         self.db_manager.create_session()
 
-        self.record_buffer = RecordBuffer(db_manager=self.db_manager, batch_size=1000)
+        self.record_buffer = RecordBuffer(db_manager=self.db_manager, batch_size=1000, upsert=True)
 
         self.hathi_trust_service = HathiTrustService()
 
@@ -29,6 +29,10 @@ class HathiTrustProcess():
 
         self.record_buffer.flush()
 
-        logger.info(f'Ingested {self.record_buffer.ingest_count} Hathi Trust records')
+        logger.info(
+            f'Ingested {self.record_buffer.ingest_count} Hathi Trust records: '
+            f'{self.record_buffer.inserted_count} inserted, {self.record_buffer.updated_count} updated, '
+            f'{self.record_buffer.unchanged_count} unchanged and skipped'
+        )
 
         return self.record_buffer.ingest_count
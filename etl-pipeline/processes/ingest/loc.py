@@ -48,7 +48,7 @@ class LOCProcess():
 
         self.record_buffer.flush()
 
-        logger.info(f'Ingested {self.record_buffer.ingest_count} LOC records')
+        logger.info(f'Ingested {self.record_buffer.ingest_count} LOC records, skipped {self.record_buffer.unchanged_count} unchanged records')
 
     def store_epub(self, record: Record):
         record_id = record.source_id.split('|')[0]
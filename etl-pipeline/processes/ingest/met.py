@@ -40,4 +40,4 @@ class METProcess():
 
         self.record_buffer.flush()
 
-        logger.info(f'Ingested {self.record_buffer.ingest_count} MET records')
+        logger.info(f'Ingested {self.record_buffer.ingest_count} MET records, skipped {self.record_buffer.unchanged_count} unchanged records')
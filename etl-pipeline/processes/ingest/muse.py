@@ -51,7 +51,7 @@ class MUSEProcess():
 
         self.record_buffer.flush()
 
-        logger.info(f'Ingested {self.record_buffer.ingest_count} MUSE records')
+        logger.info(f'Ingested {self.record_buffer.ingest_count} MUSE records, skipped {self.record_buffer.unchanged_count} unchanged records')
 
     def parse_muse_record(self, marc_record):
         record = map_muse_record(marc_record)
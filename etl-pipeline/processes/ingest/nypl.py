@@ -31,7 +31,7 @@ class NYPLProcess():
             
             self.record_buffer.flush()
 
-            logger.info(f'Ingested {self.record_buffer.ingest_count} NYPL records')
+            logger.info(f'Ingested {self.record_buffer.ingest_count} NYPL records, skipped {self.record_buffer.unchanged_count} unchanged records')
         except Exception as e:
             logger.exception(f'Failed to ingest NYPL records')
             raise e
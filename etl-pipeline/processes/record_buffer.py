@@ -1,20 +1,107 @@
+from sqlalchemy import Column, MetaData, Table, inspect, text
+
+from logger import create_log
 from managers import DBManager
 from model import Record, FRBRStatus
 
+logger = create_log(__name__)
+
+
+UNSTAGED_COLUMNS = ('id', 'date_created', 'date_modified')
+STATUS_COLUMNS = ('frbr_status', 'cluster_status')
+FRBR_RECORD_SOURCES = ('oclcClassify', 'oclcCatalog')
+
+STAGED_RECORD_COLUMNS = [column for column in Record.__table__.columns if column.name not in UNSTAGED_COLUMNS]
+METADATA_COLUMN_NAMES = [
+    column.name for column in STAGED_RECORD_COLUMNS if column.name not in STATUS_COLUMNS + ('uuid',)
+]
+STAGED_COLUMN_NAMES = [column.name for column in STAGED_RECORD_COLUMNS]
+
+STAGED_RECORDS = Table(
+    'staged_records',
+    MetaData(),
+    *[Column(column.name, column.type) for column in STAGED_RECORD_COLUMNS]
+)
+
+CREATE_STAGED_RECORDS = f'''
+    CREATE TEMPORARY TABLE staged_records ON COMMIT DROP AS
+    SELECT {', '.join(STAGED_COLUMN_NAMES)} FROM records WITH NO DATA
+'''
+
+COUNT_UNCHANGED_STAGED_RECORDS = '''
+    SELECT count(*)
+    FROM staged_records
+    JOIN records existing
+        ON existing.source_id = staged_records.source_id AND existing.source = staged_records.source
+    WHERE existing.content_hash = staged_records.content_hash
+'''
+
+# Changed records take the staged metadata and go back through FRBR and
+# clustering, other than records created by the FRBR process itself
+UPDATE_STAGED_RECORDS = f'''
+    UPDATE records SET
+        {', '.join(f'{name} = staged.{name}' for name in METADATA_COLUMN_NAMES)},
+        cluster_status = FALSE,
+        frbr_status = CASE
+            WHEN records.source IN ({', '.join(f"'{source}'" for source in FRBR_RECORD_SOURCES)}) THEN staged.frbr_status
+            ELSE '{FRBRStatus.TODO.value}'
+        END,
+        date_modified = timezone('utc', now())
+    FROM staged_records staged
+    WHERE records.source_id = staged.source_id
+        AND records.source = staged.source
+        AND records.content_hash IS DISTINCT FROM staged.content_hash
+'''
+
+INSERT_STAGED_RECORDS = f'''
+    INSERT INTO records ({', '.join(STAGED_COLUMN_NAMES)}, date_created, date_modified)
+    SELECT {', '.join(
+        'COALESCE(staged_records.cluster_status, FALSE)' if name == 'cluster_status' else f'staged_records.{name}'
+        for name in STAGED_COLUMN_NAMES
+    )},
+        timezone('utc', now()),
+        timezone('utc', now())
+    FROM staged_records
+    WHERE NOT EXISTS (
+        SELECT 1 FROM records
+        WHERE records.source_id = staged_records.source_id AND records.source = staged_records.source
+    )
+'''
+
 
 class RecordBuffer:
-    def __init__(self, db_manager: DBManager, batch_size: int=500):
+    def __init__(self, db_manager: DBManager, batch_size: int=500, upsert: bool=False):
         self.db_manager = db_manager
         self.records = set()
         self.batch_size = batch_size
         self.ingest_count = 0
         self.deletion_count = 0
 
+        self.upsert = upsert
+        self.staged_records = {}
+        self.inserted_count = 0
+        self.updated_count = 0
+        self.unchanged_count = 0
+
     def add(self, record: Record):
+        record.content_hash = record.generate_content_hash()
+
+        if self.upsert:
+            self.staged_records[(record.source_id, record.source)] = record
+
+            if len(self.staged_records) >= self.batch_size:
+                self.flush()
+
+            return
+
         existing_record = self.db_manager.session.query(Record).filter(
             Record.source_id == record.source_id
         ).first()
 
+        if existing_record and existing_record.content_hash == record.content_hash:
+            self.unchanged_count += 1
+            return
+
         if existing_record:
             existing_record = self._update_record(record, existing_record)
             self.records.discard(existing_record)
@@ -37,10 +124,59 @@ class RecordBuffer:
             self.db_manager.session.commit()
 
     def flush(self):
+        if self.upsert:
+            self._upsert_staged_records()
+            return
+
         self.db_manager.bulk_save_objects(self.records)
         self.ingest_count += len(self.records)
         self.records.clear()
 
+    def _upsert_staged_records(self):
+        if not self.staged_records:
+            return
+
+        session = self.db_manager.session
+
+        try:
+            session.execute(text(CREATE_STAGED_RECORDS))
+            session.execute(
+                STAGED_RECORDS.insert(),
+                [self._get_staged_record_row(record) for record in self.staged_records.values()]
+            )
+
+            unchanged_count = session.execute(text(COUNT_UNCHANGED_STAGED_RECORDS)).scalar()
+            updated_count = session.execute(text(UPDATE_STAGED_RECORDS)).rowcount
+            inserted_count = session.execute(text(INSERT_STAGED_RECORDS)).rowcount
+
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            raise e
+
+        self.inserted_count += inserted_count
+        self.updated_count += updated_count
+        self.unchanged_count += unchanged_count
+        self.ingest_count += inserted_count + updated_count
+
+        logger.info(
+            f'Upserted {len(self.staged_records)} records: {inserted_count} inserted, '
+            f'{updated_count} updated, {unchanged_count} unchanged'
+        )
+
+        self.staged_records.clear()
+
+    def _get_staged_record_row(self, record: Record) -> dict:
+        staged_row = {}
+
+        for column_attribute in inspect(Record).column_attrs:
+            column_name = column_attribute.columns[0].name
+
+            if column_name in STAGED_COLUMN_NAMES:
+                staged_row[column_name] = getattr(record, column_attribute.key)
+
+        return staged_row
+
     def _update_record(self, record: Record, existing_record: Record) -> Record:
         for attribute, value in record:
             if attribute == 'uuid': 
@@ -1,10 +1,12 @@
-import re
-from sqlalchemy.exc import DataError
 from logger import create_log
 from managers import (
     DBManager,
-    ElasticsearchManager,
+    EditionGrouper,
+    ElasticsearchIndexBuffer,
+    IdentifierGraphManager,
     KMeansManager,
+    RedisManager,
+    ResponseCache,
     SFRElasticRecordManager,
     SFRRecordManager,
 )
@@ -18,16 +20,16 @@ logger = create_log(__name__)
 class RecordClusterer:
     MAX_MATCH_DISTANCE = 4
     CLUSTER_SIZE_LIMIT = 10000
-    IDENTIFIERS_TO_MATCH = r"\|(?:isbn|issn|oclc|lccn|owi)$"
 
-    def __init__(self, db_manager: DBManager):
+    def __init__(
+        self, db_manager: DBManager, elastic_index_buffer: ElasticsearchIndexBuffer
+    ):
         self.db_manager = db_manager
+        self.elastic_index_buffer = elastic_index_buffer
 
-        self.elastic_search_manager = ElasticsearchManager()
-
-        self.elastic_search_manager.create_elastic_connection()
-        self.elastic_search_manager.create_elastic_search_ingest_pipeline()
-        self.elastic_search_manager.create_elastic_search_index()
+        self.redis_manager = RedisManager()
+        self.redis_manager.create_client()
+        self.response_cache = ResponseCache(self.redis_manager.client)
 
         self.constants = get_constants()
 
@@ -36,15 +38,20 @@ class RecordClusterer:
             work, stale_work_ids, records = self._get_clustered_work_and_records(record)
             self._commit_changes()
 
+            # Reclustered works are updated in place, so their cached responses are stale as well
+            work_ids_to_invalidate = [*stale_work_ids, work.id]
+
             self._delete_stale_works(stale_work_ids)
             self._commit_changes()
 
+            self.response_cache.invalidate_works(work_ids_to_invalidate)
+
             logger.info(f"Clustered record: {record}")
 
             self._update_elastic_search(
                 work_to_index=work, works_to_delete=stale_work_ids
             )
-            logger.info(f"Indexed {work} in ElasticSearch")
+            logger.info(f"Queued {work} for indexing in ElasticSearch")
 
             return records
         except Exception as e:
@@ -70,7 +77,7 @@ class RecordClusterer:
             raise e
 
     def _update_elastic_search(self, work_to_index: Work, works_to_delete: set):
-        self.elastic_search_manager.delete_work_records(works_to_delete)
+        self.elastic_index_buffer.delete_works(works_to_delete)
         self._index_works_in_elastic_search(work_to_index)
 
     def _delete_stale_works(self, work_ids: set[str]):
@@ -85,11 +92,14 @@ class RecordClusterer:
             .all()
         )
 
-        kmean_manager = KMeansManager(records)
+        editions = EditionGrouper(records).group_editions()
+
+        if editions is None:
+            kmean_manager = KMeansManager(records)
 
-        kmean_manager.createDF()
-        kmean_manager.generateClusters()
-        editions = kmean_manager.parseEditions()
+            kmean_manager.createDF()
+            kmean_manager.generateClusters()
+            editions = kmean_manager.parseEditions()
 
         return editions, records
 
@@ -103,86 +113,20 @@ class RecordClusterer:
         )
 
     def _find_all_matching_records(self, record: Record):
-        tokenized_record_title = self._tokenize_title(record.title)
-        ids_to_check = {
-            id for id in record.identifiers if re.search(self.IDENTIFIERS_TO_MATCH, id)
-        }
-
-        matched_record_ids = set()
-        checked_ids = set()
-
-        for match_distance in range(0, self.MAX_MATCH_DISTANCE):
-            matched_records = self._get_matched_records(
-                list(ids_to_check), matched_record_ids.copy()
-            )
+        identifier_graph_manager = IdentifierGraphManager(
+            self.db_manager.session, self.MAX_MATCH_DISTANCE
+        )
 
-            if not matched_records:
-                break
-
-            checked_ids.update(ids_to_check)
-            ids_to_check.clear()
-
-            for (
-                matched_record_title,
-                matched_record_id,
-                matched_record_identifiers,
-                *_,
-            ) in matched_records:
-                if not matched_record_title:
-                    logger.warning("Invalid title found in matched records")
-                    continue
-
-                tokenized_matched_record_title = self._tokenize_title(
-                    matched_record_title
-                )
-
-                if match_distance > 0 and not self._titles_overlap(
-                    tokenized_record_title, tokenized_matched_record_title
-                ):
-                    continue
-
-                ids_to_check.update(
-                    {
-                        id
-                        for id in matched_record_identifiers
-                        if re.search(self.IDENTIFIERS_TO_MATCH, id)
-                        and id not in checked_ids
-                    }
-                )
-                matched_record_ids.add(matched_record_id)
+        matched_record_ids = identifier_graph_manager.get_matched_record_ids(
+            record.id, limit=self.CLUSTER_SIZE_LIMIT + 1
+        )
 
         if len(matched_record_ids) > self.CLUSTER_SIZE_LIMIT:
             raise Exception(
                 f"Records matched is greater than {self.CLUSTER_SIZE_LIMIT}"
             )
 
-        return list(matched_record_ids)
-
-    def _get_matched_records(
-        self, identifiers: list[str], already_matched_record_ids: list[str]
-    ):
-        batch_size = 100
-        matched_records = []
-
-        for i in range(0, len(identifiers), batch_size):
-            id_batch = self._format_identifiers(identifiers[i : i + batch_size])
-
-            try:
-                records = (
-                    self.db_manager.session.query(
-                        Record.title, Record.id, Record.identifiers, Record.has_part
-                    )
-                    .filter(~Record.id.in_(already_matched_record_ids))
-                    .filter(Record.identifiers.overlap(id_batch))
-                    .filter(Record.title.isnot(None))
-                    .all()
-                )
-
-                matched_records.extend(records)
-            except DataError:
-                logger.exception("Unable to get matching records")
-
-        return matched_records
+        return matched_record_ids
 
     def _create_work_from_editions(self, editions: list, records: list[Record]):
         record_manager = SFRRecordManager(
@@ -198,45 +142,7 @@ class RecordClusterer:
         return record_manager.work, stale_work_ids
 
     def _index_works_in_elastic_search(self, work: Work):
-        work_documents = []
-
         elastic_manager = SFRElasticRecordManager(work)
         elastic_manager.getCreateWork()
-        work_documents.append(elastic_manager.work)
 
-        # TODO: save single work
-        self.elastic_search_manager.save_work_records(work_documents)
-
-    def _titles_overlap(
-        self, tokenized_record_title: set, tokenized_matched_record_title: set
-    ):
-        if (
-            len(tokenized_record_title) == 1
-            and not tokenized_record_title <= tokenized_matched_record_title
-        ):
-            return False
-        elif (
-            len(tokenized_matched_record_title) == 1
-            and not tokenized_record_title >= tokenized_matched_record_title
-        ):
-            return False
-        elif (
-            len(tokenized_record_title) > 1 and len(tokenized_matched_record_title) > 1
-        ) and len(tokenized_record_title & tokenized_matched_record_title) < 2:
-            return False
-
-        return True
-
-    def _tokenize_title(self, title: str):
-        title_tokens = re.findall(r"(\w+)", title.lower())
-
-        return set(title_tokens) - set(["a", "an", "the", "of"])
-
-    def _format_identifiers(self, identifiers: list[str]):
-        formatted_ids = []
-
-        for id in identifiers:
-            formatted_id = f'"{id}"' if re.search(r"[{},]{1}", id) else id
-            formatted_ids.append(formatted_id)
-
-        return "{{{}}}".format(",".join(formatted_ids))
+        self.elastic_index_buffer.index_work(elastic_manager.work)
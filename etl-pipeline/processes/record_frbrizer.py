@@ -49,7 +49,7 @@ class RecordFRBRizer:
             search_query = self.oclc_catalog_manager.generate_search_query(identifier=id, identifier_type=id_type)
             self._add_works(self.oclc_catalog_manager.query_bibs(query=search_query))
 
-        if self.record_buffer.ingest_count == 0 and len(self.record_buffer.records) == 0 and author and title:
+        if self.record_buffer.ingest_count == 0 and self.record_buffer.unchanged_count == 0 and len(self.record_buffer.records) == 0 and author and title:
             search_query = self.oclc_catalog_manager.generate_search_query(author=author, title=title)
             self._add_works(self.oclc_catalog_manager.query_bibs(query=search_query))
 
@@ -57,11 +57,16 @@ class RecordFRBRizer:
         for oclc_bib in oclc_bibs:
             owi_number, related_oclc_numbers = self._add_work(oclc_bib) 
             
-            for oclc_number, uncached in self.redis_manager.multi_check_or_set_key('catalog', related_oclc_numbers, 'oclc'):
-                if not uncached:
-                    continue
+            uncached_oclc_numbers = [
+                oclc_number
+                for oclc_number, uncached in self.redis_manager.multi_check_or_set_key('catalog', related_oclc_numbers, 'oclc')
+                if uncached
+            ]
 
-                self._add_edition(owi_number, oclc_number)
+            catalog_records = self.oclc_catalog_manager.query_catalogs(uncached_oclc_numbers)
+
+            for oclc_number in uncached_oclc_numbers:
+                self._add_edition(owi_number, oclc_number, catalog_records.get(oclc_number))
 
     def _add_work(self, oclc_bib: dict) -> tuple:
         oclc_number = oclc_bib.get('identifier', {}).get('oclcNumber')
@@ -82,10 +87,8 @@ class RecordFRBRizer:
 
         return (owi_number, related_oclc_numbers)
 
-    def _add_edition(self, owi_number: int, oclc_number: str):
+    def _add_edition(self, owi_number: int, oclc_number: str, catalog_record: str):
         try:
-            catalog_record = self.oclc_catalog_manager.query_catalog(oclc_number)
-
             parsed_marc_xml = etree.fromstring(catalog_record.encode('utf-8'))
             
             catalog_record_mapping = CatalogMapping(parsed_marc_xml, { 'oclc': 'http://www.loc.gov/MARC21/slim' }, {})
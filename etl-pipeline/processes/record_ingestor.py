@@ -1,24 +1,64 @@
+from itertools import islice
 import json
 from multiprocessing import Pool
+from multiprocessing.util import Finalize
 import os
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import tuple_
 
 from logger import create_log
 from managers import DBManager, RabbitMQManager, S3Manager
-from model import Record
+from model import FRBRStatus, Record
 from services.sources.source_service import SourceService
 from . import utils
 
 logger = create_log(__name__)
 
 
+class RecordIngestorWorker:
+
+    def __init__(self):
+        self.db_manager = DBManager()
+        self.db_manager.generate_engine()
+
+        self.rabbitmq_manager = RabbitMQManager(
+            queue_name=os.environ.get('RECORD_PIPELINE_QUEUE'),
+            routing_key=os.environ.get('RECORD_PIPELINE_ROUTING_KEY')
+        )
+        self.rabbitmq_manager.create_connection()
+        self.rabbitmq_manager.create_or_connect_queue(self.rabbitmq_manager.queue_name, self.rabbitmq_manager.routing_key)
+
+        self.s3_manager = S3Manager()
+        self.file_bucket = os.environ.get('FILE_BUCKET')
+
+    def close(self):
+        try:
+            self.rabbitmq_manager.close_connection()
+        except Exception:
+            logger.debug('Unable to close RabbitMQ connection for record ingest worker')
+
+        self.db_manager.engine.dispose()
+
+
+ingest_worker: Optional[RecordIngestorWorker] = None
+
+
 class RecordIngestor:
+    INGESTED = 'ingested'
+    UNCHANGED = 'unchanged'
+    FAILED = 'failed'
 
     def __init__(self, source_service: SourceService, source: str):
         self.source = source
         self.source_service = source_service
 
+        self.worker_count = int(os.environ.get('RECORD_INGEST_WORKERS', 4))
+        self.batch_size = int(os.environ.get('RECORD_INGEST_BATCH_SIZE', 50))
+
     def ingest(self, params: utils.ProcessParams) -> int:
         ingest_count = 0
+        unchanged_count = 0
 
         try:
             records = self.source_service.get_records(
@@ -27,67 +67,179 @@ class RecordIngestor:
                 limit=params.limit
             )
 
-            with Pool(processes=4) as pool:
-                ingest_results = pool.imap_unordered(RecordIngestor._ingest_record, records)
-                ingest_count = len(set([result[0] for result in ingest_results if result[1] is True]))
+            with Pool(processes=self.worker_count, initializer=RecordIngestor._initialize_worker) as pool:
+                ingested_source_ids = set()
+                unchanged_source_ids = set()
+
+                for ingest_results in pool.imap_unordered(RecordIngestor._ingest_records, self._batch_records(records)):
+                    ingested_source_ids.update(source_id for source_id, result in ingest_results if result == RecordIngestor.INGESTED)
+                    unchanged_source_ids.update(source_id for source_id, result in ingest_results if result == RecordIngestor.UNCHANGED)
+
+                pool.close()
+                pool.join()
+
+            ingest_count = len(ingested_source_ids)
+            unchanged_count = len(unchanged_source_ids)
         except Exception:
             logger.exception(f'Failed to ingest {self.source} records')
 
-        logger.info(f'Ingested {ingest_count} {self.source} records')
+        logger.info(f'Ingested {ingest_count} {self.source} records, skipped {unchanged_count} unchanged records')
         return ingest_count
-    
+
+    def _batch_records(self, records: Iterable[Record]) -> Iterator[list[Record]]:
+        records = iter(records)
+
+        while record_batch := list(islice(records, self.batch_size)):
+            yield record_batch
+
+    @staticmethod
+    def _initialize_worker():
+        global ingest_worker
+
+        ingest_worker = RecordIngestorWorker()
+
+        Finalize(ingest_worker, ingest_worker.close, exitpriority=10)
+
+    @staticmethod
+    def _ingest_records(records: list[Record]) -> list[tuple]:
+        stored_records = []
+        ingest_results = []
+
+        for record in records:
+            record.content_hash = record.generate_content_hash()
+
+        existing_records = RecordIngestor._get_existing_records(records=records)
+
+        for record in records:
+            existing_content_hash, existing_frbr_status = existing_records.get((record.source_id, record.source), (None, None))
+
+            if existing_content_hash == record.content_hash:
+                # Unchanged records that never made it through the pipeline are sent again
+                if existing_frbr_status != FRBRStatus.COMPLETE.value:
+                    RecordIngestor._send_record_pipeline_message(source_id=record.source_id, source=record.source)
+
+                ingest_results.append((record.source_id, RecordIngestor.UNCHANGED))
+                continue
+
+            try:
+                RecordIngestor._store_record_files(record=record)
+                stored_records.append(record)
+            except Exception:
+                logger.exception(f'Failed to store files for record: {record}')
+                ingest_results.append((record.source_id, RecordIngestor.FAILED))
+
+        for (source_id, source), saved in RecordIngestor._save_records(records=stored_records):
+            if saved:
+                saved = RecordIngestor._send_record_pipeline_message(source_id=source_id, source=source)
+
+            ingest_results.append((source_id, RecordIngestor.INGESTED if saved else RecordIngestor.FAILED))
+
+        return ingest_results
+
     @staticmethod
-    def _ingest_record(record: Record) -> tuple:
+    def _get_existing_records(records: list[Record]) -> dict[tuple, tuple]:
+        db_manager = ingest_worker.db_manager
+        db_manager.create_session()
+
         try:
-            source_id = record.source_id
-            source = record.source
+            existing_records = (
+                db_manager.session.query(Record.source_id, Record.source, Record.content_hash, Record.frbr_status)
+                    .filter(tuple_(Record.source_id, Record.source).in_(
+                        [(record.source_id, record.source) for record in records]
+                    ))
+                    .all()
+            )
 
-            RecordIngestor._store_record_files(record=record)
-            RecordIngestor._save_record(record=record)
-            RecordIngestor._send_record_pipeline_message(source_id=source_id, source=source)
+            return {
+                (source_id, source): (content_hash, frbr_status)
+                for source_id, source, content_hash, frbr_status in existing_records
+            }
+        finally:
+            db_manager.session.close()
 
-            return (source_id, True)
+    @staticmethod
+    def _save_records(records: list[Record]) -> list[tuple]:
+        if not records:
+            return []
+
+        record_keys = [(record.source_id, record.source) for record in records]
+
+        try:
+            RecordIngestor._save_record_batch(records=records)
+
+            return [(record_key, True) for record_key in record_keys]
         except Exception:
-            logger.exception(f'Failed to ingest record: {record}')
-            return (source_id, False)
-        
+            logger.warning(f'Failed to save batch of {len(records)} records, saving records individually')
+
+        save_results = []
+
+        for record_key, record in zip(record_keys, records):
+            try:
+                RecordIngestor._save_record_batch(records=[record])
+                save_results.append((record_key, True))
+            except Exception:
+                logger.exception(f'Failed to save record with source_id: {record_key[0]} and source: {record_key[1]}')
+                save_results.append((record_key, False))
+
+        return save_results
+
     @staticmethod
-    def _save_record(record: Record):
-        with DBManager() as db_manager:
-            existing_record = (
-                db_manager.session.query(Record)
-                    .filter(Record.source_id == record.source_id)
-                    .filter(Record.source == record.source)
-                    .first()
-            )
+    def _save_record_batch(records: list[Record]):
+        db_manager = ingest_worker.db_manager
+        db_manager.create_session()
 
-            if existing_record:
-                existing_record = RecordIngestor._update_record(record, existing_record)
-            else:
-                db_manager.session.add(record)
+        try:
+            existing_records = {
+                (existing_record.source_id, existing_record.source): existing_record
+                for existing_record in (
+                    db_manager.session.query(Record)
+                        .filter(tuple_(Record.source_id, Record.source).in_(
+                            [(record.source_id, record.source) for record in records]
+                        ))
+                        .all()
+                )
+            }
+
+            for record in records:
+                existing_record = existing_records.get((record.source_id, record.source))
+
+                if existing_record:
+                    RecordIngestor._update_record(record, existing_record)
+                else:
+                    db_manager.session.add(record)
+                    existing_records[(record.source_id, record.source)] = record
 
             db_manager.session.commit()
-        
+        except Exception as e:
+            db_manager.session.rollback()
+            raise e
+        finally:
+            db_manager.session.close()
+
     @staticmethod
-    def _send_record_pipeline_message(source_id: str, source: str):
-        with RabbitMQManager(queue_name=os.environ.get('RECORD_PIPELINE_QUEUE'), routing_key=os.environ.get('RECORD_PIPELINE_ROUTING_KEY')) as rabbitmq_manager:
+    def _send_record_pipeline_message(source_id: str, source: str) -> bool:
+        rabbitmq_manager = ingest_worker.rabbitmq_manager
+
+        try:
             rabbitmq_manager.send_message_to_queue(
-                queue_name=rabbitmq_manager.queue_name, 
-                routing_key=rabbitmq_manager.routing_key, 
+                queue_name=rabbitmq_manager.queue_name,
+                routing_key=rabbitmq_manager.routing_key,
                 message=json.dumps({ 'sourceId': source_id, 'source': source })
             )
 
+            return True
+        except Exception:
+            logger.exception(f'Failed to send record pipeline message for record with source_id: {source_id} and source: {source}')
+            return False
+
     @staticmethod
     def _store_record_files(record: Record):
-        s3_manager = S3Manager()
-        file_bucket = os.environ.get('FILE_BUCKET')
-
-        s3_manager.store_pdf_manifest(record=record, bucket_name=file_bucket)
+        ingest_worker.s3_manager.store_pdf_manifest(record=record, bucket_name=ingest_worker.file_bucket)
 
     @staticmethod
     def _update_record(record: Record, existing_record: Record) -> Record:
         for attribute, value in record:
-            if attribute == 'uuid': 
+            if attribute == 'uuid':
                 continue
 
             setattr(existing_record, attribute, value)
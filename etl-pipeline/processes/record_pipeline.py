@@ -1,81 +1,231 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import json
 import os
-from time import sleep
+from queue import Queue
+import signal
+import threading
+from time import monotonic
+from typing import Optional
 
 from .record_frbrizer import RecordFRBRizer
 from .record_clusterer import RecordClusterer
 from .link_fulfiller import LinkFulfiller
 
 from logger import create_log
-from managers import DBManager, RabbitMQManager
+from managers import DBManager, ElasticsearchIndexBuffer, ElasticsearchManager, RabbitMQManager, SFRRecordManager
 from model import Record
 
 logger = create_log(__name__)
 
 
-class RecordPipelineProcess:
+class RecordPipelineWorker:
 
-    def __init__(self, *args):
+    def __init__(self, cluster_lock: threading.Lock, elastic_index_buffer: ElasticsearchIndexBuffer):
         self.db_manager = DBManager()
+        self.cluster_lock = cluster_lock
+
+        self.record_frbrizer = RecordFRBRizer(db_manager=self.db_manager)
+        self.record_clusterer = RecordClusterer(db_manager=self.db_manager, elastic_index_buffer=elastic_index_buffer)
+        self.link_fulfiller = LinkFulfiller(db_manager=self.db_manager)
+
+    def process_record(self, source_id: str, source: str):
+        try:
+            self.db_manager.create_session()
+
+            record = (
+                self.db_manager.session.query(Record)
+                    .filter(Record.source_id == source_id, Record.source == source)
+                    .first()
+            )
+
+            frbrized_record = self.record_frbrizer.frbrize_record(record)
+
+            # Overlapping clusters would race on the same works, so only one worker clusters at a time
+            with self.cluster_lock:
+                clustered_records = self.record_clusterer.cluster_record(frbrized_record)
 
+            self.link_fulfiller.fulfill_records_links(clustered_records)
+        finally:
+            if self.db_manager.session:
+                self.db_manager.session.close()
+
+    def close(self):
+        if self.db_manager.engine:
+            self.db_manager.engine.dispose()
+
+
+class RecordPipelineProcess:
+    POLL_INTERVAL_SECONDS = 1
+
+    def __init__(self, *args):
         self.record_queue = os.environ['RECORD_PIPELINE_QUEUE']
         self.record_route = os.environ['RECORD_PIPELINE_ROUTING_KEY']
 
+        self.prefetch_count = int(os.environ.get('RECORD_PIPELINE_PREFETCH_COUNT', 10))
+        self.worker_count = int(os.environ.get('RECORD_PIPELINE_WORKERS', 1))
+        self.idle_timeout = int(os.environ.get('RECORD_PIPELINE_IDLE_TIMEOUT', 180))
+
         self.rabbitmq_manager = RabbitMQManager()
         self.rabbitmq_manager.create_connection()
         self.rabbitmq_manager.create_or_connect_queue(self.record_queue, self.record_route)
+        self.rabbitmq_manager.set_prefetch_count(self.prefetch_count)
+
+        elastic_search_manager = ElasticsearchManager()
+        elastic_search_manager.create_elastic_connection()
+        elastic_search_manager.create_elastic_search_ingest_pipeline()
+        elastic_search_manager.create_elastic_search_index()
+
+        # Index and delete operations from every worker are coalesced into shared bulk requests
+        self.elastic_index_buffer = ElasticsearchIndexBuffer(
+            elastic_search_manager, requeue_works=RecordPipelineProcess.requeue_works
+        )
+
+        cluster_lock = threading.Lock()
+        self.workers = [
+            RecordPipelineWorker(cluster_lock=cluster_lock, elastic_index_buffer=self.elastic_index_buffer)
+            for _ in range(self.worker_count)
+        ]
+        self.idle_workers = Queue()
+
+        for worker in self.workers:
+            self.idle_workers.put(worker)
+
+        self.executor = None
+        self.pending_messages = OrderedDict()
+        self.processing_messages = {}
+        self.shutdown_requested = False
+
+    @staticmethod
+    def requeue_works(work_uuids: list[str]):
+        # Records marked as unclustered are rebuilt and reindexed by the next cluster run
+        with DBManager() as db_manager:
+            SFRRecordManager.requeueWorks(db_manager.session, work_uuids)
+            db_manager.session.commit()
+
+    def runProcess(self, idle_timeout: Optional[int]=None):
+        idle_timeout = self.idle_timeout if idle_timeout is None else idle_timeout
+        previous_handlers = self._register_shutdown_handlers()
 
-        self.record_frbrizer = RecordFRBRizer(db_manager=self.db_manager)
-        self.record_clusterer = RecordClusterer(db_manager=self.db_manager)
-        self.link_fulfiller = LinkFulfiller(db_manager=self.db_manager)
-
-    def runProcess(self, max_attempts: int=4):
         try:
-             for attempt in range(0, max_attempts):
-                wait_time = 30 * attempt
+            self.executor = ThreadPoolExecutor(max_workers=self.worker_count)
+            self.elastic_index_buffer.start()
 
-                if wait_time:
-                    logger.info(f'Waiting {wait_time}s for record messages')
-                    sleep(wait_time)
-
-                while message := self.rabbitmq_manager.get_message_from_queue(self.record_queue):
-                    message_props, _, message_body = message
-
-                    if not message_props or not message_body:
-                        break
-                    
-                    self._process_message(message)
+            self._consume_messages(idle_timeout)
+            self._finish_processing_messages()
         except Exception:
             logger.exception('Failed to run record pipeline process')
         finally:
+            if self.executor:
+                self.executor.shutdown(wait=True)
+
+            self.elastic_index_buffer.close()
+
+            self._restore_signal_handlers(previous_handlers)
             self.rabbitmq_manager.close_connection()
-            if self.db_manager.engine: 
-                self.db_manager.engine.dispose()
-    
-    def _process_message(self, message):
+
+            for worker in self.workers:
+                worker.close()
+
+    def _consume_messages(self, idle_timeout: int):
+        last_activity = monotonic()
+
+        for message_method, _, message_body in self.rabbitmq_manager.consume_messages(
+            self.record_queue, inactivity_timeout=self.POLL_INTERVAL_SECONDS
+        ):
+            if message_method:
+                self._add_pending_message(message_method.delivery_tag, message_body)
+                self._dispatch_pending_messages()
+
+            if message_method or self.pending_messages or self.processing_messages:
+                last_activity = monotonic()
+
+            if self.shutdown_requested:
+                logger.info('Shutting down record pipeline process')
+                break
+
+            if idle_timeout > 0 and monotonic() - last_activity >= idle_timeout:
+                logger.info(f'No record messages received in {idle_timeout}s')
+                break
+
+    def _finish_processing_messages(self):
+        self.rabbitmq_manager.cancel_consumer()
+
+        for delivery_tags in self.pending_messages.values():
+            for delivery_tag in delivery_tags:
+                self.rabbitmq_manager.reject_message(delivery_tag=delivery_tag, requeue=True)
+
+        self.pending_messages.clear()
+
+        while self.processing_messages:
+            self.rabbitmq_manager.process_data_events(time_limit=self.POLL_INTERVAL_SECONDS)
+
+    def _add_pending_message(self, delivery_tag: int, message_body):
         try:
-            self.db_manager.create_session()
+            record_key = self._parse_message(message_body=message_body)
+        except (ValueError, AttributeError):
+            logger.exception(f'Unable to parse record message: {message_body}')
+            self.rabbitmq_manager.reject_message(delivery_tag=delivery_tag)
+            return
 
-            message_props, _, message_body = message
-            source_id, source = self._parse_message(message_body=message_body)
+        if record_key in self.pending_messages:
+            logger.debug(f'Coalescing message for record with source_id: {record_key[0]} and source: {record_key[1]}')
 
-            record = (
-                self.db_manager.session.query(Record)
-                    .filter(Record.source_id == source_id, Record.source == source)
-                    .first()
-            )
+        self.pending_messages.setdefault(record_key, []).append(delivery_tag)
 
-            frbrized_record = self.record_frbrizer.frbrize_record(record)
-            clustered_records = self.record_clusterer.cluster_record(frbrized_record)
-            self.link_fulfiller.fulfill_records_links(clustered_records)
-                
-            self.rabbitmq_manager.acknowledge_message_processed(message_props.delivery_tag)
+    def _dispatch_pending_messages(self):
+        for record_key in list(self.pending_messages.keys()):
+            if self.shutdown_requested or len(self.processing_messages) >= self.worker_count:
+                return
+
+            # A record already in the pipeline is picked up again once its current run finishes
+            if record_key not in self.pending_messages or record_key in self.processing_messages:
+                continue
+
+            self.processing_messages[record_key] = self.pending_messages.pop(record_key)
+            self.executor.submit(self._process_record, record_key)
+
+    def _process_record(self, record_key: tuple):
+        source_id, source = record_key
+        processed = False
+        worker = self.idle_workers.get()
+
+        try:
+            worker.process_record(source_id, source)
+            processed = True
         except Exception:
             logger.exception(f'Failed to process record with source_id: {source_id} and source: {source}')
-            self.rabbitmq_manager.reject_message(delivery_tag=message_props.delivery_tag)         
         finally:
-            if self.db_manager.session: 
-                self.db_manager.session.close()
+            self.idle_workers.put(worker)
+            self.rabbitmq_manager.add_threadsafe_callback(
+                partial(self._complete_messages, record_key, processed)
+            )
+
+    def _complete_messages(self, record_key: tuple, processed: bool):
+        for delivery_tag in self.processing_messages.pop(record_key, []):
+            if processed:
+                self.rabbitmq_manager.acknowledge_message_processed(delivery_tag)
+            else:
+                self.rabbitmq_manager.reject_message(delivery_tag=delivery_tag)
+
+        self._dispatch_pending_messages()
+
+    def _register_shutdown_handlers(self) -> dict:
+        previous_handlers = {}
+
+        for shutdown_signal in (signal.SIGINT, signal.SIGTERM):
+            previous_handlers[shutdown_signal] = signal.signal(shutdown_signal, self._request_shutdown)
+
+        return previous_handlers
+
+    def _restore_signal_handlers(self, previous_handlers: dict):
+        for shutdown_signal, handler in previous_handlers.items():
+            signal.signal(shutdown_signal, handler)
+
+    def _request_shutdown(self, signal_number, frame):
+        logger.info(f'Received signal {signal_number}, finishing in progress records')
+        self.shutdown_requested = True
 
     def _parse_message(self, message_body) -> tuple:
         message = json.loads(message_body)
@@ -0,0 +1,335 @@
+from datetime import datetime, timezone
+from itertools import islice
+from multiprocessing import Process, cpu_count
+import os
+import time
+
+from sqlalchemy.orm import selectinload
+
+from logger import create_log
+from managers import DBManager, ElasticsearchManager, RedisManager, SFRElasticRecordManager
+from model import Edition, Item, Work
+from .. import utils
+
+logger = create_log(__name__)
+
+
+class ElasticsearchReindexProcess:
+    """Rebuilds the work index from postgres without search downtime. Works
+    are streamed in keyset paginated slices by parallel worker processes and
+    bulk loaded into a new versioned index, which then atomically replaces
+    the index behind the ELASTICSEARCH_INDEX alias. The last work indexed in
+    each slice is checkpointed in redis, so an interrupted run resumes where
+    it stopped unless the restart option is passed."""
+
+    BATCH_SIZE = 500
+    PROGRESS_INTERVAL_SECONDS = 30
+
+    WORK_LOAD_OPTIONS = (
+        selectinload(Work.identifiers),
+        selectinload(Work.editions).selectinload(Edition.identifiers),
+        selectinload(Work.editions).selectinload(Edition.links),
+        selectinload(Work.editions).selectinload(Edition.rights),
+        selectinload(Work.editions).selectinload(Edition.items).selectinload(Item.links),
+        selectinload(Work.editions).selectinload(Edition.items).selectinload(Item.rights),
+    )
+
+    def __init__(self, *args):
+        self.process_args = args
+        self.params = utils.parse_process_args(*args)
+
+        self.worker_count = int(os.environ.get('ELASTICSEARCH_REINDEX_WORKERS', cpu_count()))
+        self.batch_size = int(os.environ.get('ELASTICSEARCH_REINDEX_BATCH_SIZE', self.BATCH_SIZE))
+
+        self.db_manager = DBManager()
+        self.db_manager.create_session()
+
+        self.elastic_search_manager = ElasticsearchManager()
+        self.elastic_search_manager.create_elastic_connection()
+
+        self.redis_manager = RedisManager()
+        self.redis_manager.create_client()
+
+        self.state_key = f'{self.redis_manager.environment}/es-reindex/{self.elastic_search_manager.index}'
+
+    def runProcess(self):
+        try:
+            self.elastic_search_manager.create_elastic_search_ingest_pipeline()
+
+            index_name, started_at, worker_count = self.get_or_create_reindex()
+
+            self.reindex_works_in_parallel(index_name, worker_count)
+
+            # Works reclustered while the slices were loading may have been read before they changed
+            self.reindex_works(index_name, Work.date_modified >= started_at)
+            self.reindex_failed_works(index_name)
+            self.delete_orphaned_works(index_name)
+
+            self.swap_index(index_name)
+            self.clear_reindex_state()
+        except Exception as e:
+            logger.exception('Failed to reindex works in ElasticSearch')
+            raise e
+        finally:
+            self.db_manager.close_connection()
+
+    def get_or_create_reindex(self) -> tuple[str, datetime, int]:
+        reindex_state = {
+            key.decode('utf-8'): value.decode('utf-8')
+            for key, value in self.redis_manager.client.hgetall(self.state_key).items()
+        }
+
+        if reindex_state and 'restart' not in self.params.options:
+            if self.elastic_search_manager.client.indices.exists(index=reindex_state['index']):
+                logger.info(f'Resuming reindex into {reindex_state["index"]}')
+
+                return (
+                    reindex_state['index'],
+                    datetime.fromisoformat(reindex_state['started_at']),
+                    int(reindex_state['workers'])
+                )
+
+        if reindex_state:
+            logger.info(f'Discarding incomplete reindex into {reindex_state["index"]}')
+            self.elastic_search_manager.client.indices.delete(index=reindex_state['index'], ignore=[404])
+
+        self.clear_reindex_state()
+
+        started_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        index_name = f'{self.elastic_search_manager.index}-{started_at.strftime("%Y%m%d%H%M%S")}'
+
+        self.elastic_search_manager.create_versioned_index(index_name)
+
+        self.redis_manager.client.hset(
+            self.state_key,
+            mapping={
+                'index': index_name,
+                'started_at': started_at.isoformat(),
+                'workers': self.worker_count
+            }
+        )
+
+        logger.info(f'Reindexing works into {index_name}')
+
+        return index_name, started_at, self.worker_count
+
+    def reindex_works_in_parallel(self, index_name: str, worker_count: int):
+        total_works = self.db_manager.session.query(Work.id).count()
+        indexed_works = self.get_indexed_count()
+        start_time = time.perf_counter()
+
+        reindex_workers = []
+
+        for worker_index in range(worker_count):
+            reindex_worker = Process(
+                target=ElasticsearchReindexProcess.run_reindex_worker,
+                args=(self.process_args, index_name, (worker_index, worker_count))
+            )
+            reindex_worker.start()
+
+            reindex_workers.append(reindex_worker)
+
+        for reindex_worker in reindex_workers:
+            while reindex_worker.is_alive():
+                reindex_worker.join(timeout=self.PROGRESS_INTERVAL_SECONDS)
+
+                self.log_reindex_progress(total_works, indexed_works, start_time)
+
+        failed_workers = [
+            worker_index
+            for worker_index, reindex_worker in enumerate(reindex_workers)
+            if reindex_worker.exitcode != 0
+        ]
+
+        if failed_workers:
+            raise ReindexError(f'Reindex workers {failed_workers} failed, rerun the process to resume')
+
+    @staticmethod
+    def run_reindex_worker(process_args: tuple, index_name: str, work_slice: tuple):
+        reindex_process = ElasticsearchReindexProcess(*process_args)
+
+        try:
+            reindex_process.reindex_slice(index_name, work_slice)
+        except Exception as e:
+            logger.exception(f'Reindex worker {work_slice[0]} failed')
+            raise e
+        finally:
+            reindex_process.db_manager.close_connection()
+
+    def reindex_slice(self, index_name: str, work_slice: tuple):
+        worker_index, worker_count = work_slice
+
+        checkpoint = self.redis_manager.client.hget(f'{self.state_key}/checkpoints', worker_index)
+
+        self.reindex_works(
+            index_name,
+            Work.id.op('%')(worker_count) == worker_index,
+            last_work_id=int(checkpoint) if checkpoint else 0,
+            worker_index=worker_index
+        )
+
+    def reindex_works(self, index_name: str, *filters, last_work_id: int=0, worker_index=None):
+        elastic_search_manager = self.get_index_manager(index_name)
+
+        works_query = (
+            self.db_manager.session.query(Work)
+                .filter(*filters)
+                .options(*self.WORK_LOAD_OPTIONS)
+                .order_by(Work.id)
+        )
+
+        while works := works_query.filter(Work.id > last_work_id).limit(self.batch_size).all():
+            failed_uuids = self.index_works(elastic_search_manager, works)
+
+            last_work_id = works[-1].id
+
+            reindex_pipe = self.redis_manager.client.pipeline()
+
+            if worker_index is not None:
+                reindex_pipe.hset(f'{self.state_key}/checkpoints', worker_index, last_work_id)
+                reindex_pipe.incrby(f'{self.state_key}/indexed', len(works) - len(failed_uuids))
+
+            if failed_uuids:
+                reindex_pipe.sadd(f'{self.state_key}/failed', *failed_uuids)
+
+            # Works that failed in an earlier pass are only cleared once they have been indexed
+            indexed_uuids = {str(work.uuid) for work in works} - set(failed_uuids)
+
+            if indexed_uuids:
+                reindex_pipe.srem(f'{self.state_key}/failed', *indexed_uuids)
+
+            reindex_pipe.execute()
+
+            # Building documents can modify the works in memory, which must never be flushed
+            self.db_manager.session.rollback()
+
+    def reindex_failed_works(self, index_name: str):
+        failed_uuids = [
+            failed_uuid.decode('utf-8')
+            for failed_uuid in self.redis_manager.client.smembers(f'{self.state_key}/failed')
+        ]
+
+        if not failed_uuids:
+            return
+
+        existing_uuids = {
+            str(work_uuid)
+            for work_uuid, in self.db_manager.session.query(Work.uuid).filter(Work.uuid.in_(failed_uuids))
+        }
+        deleted_uuids = set(failed_uuids) - existing_uuids
+
+        # Works deleted since they failed have nothing left to index
+        if deleted_uuids:
+            self.redis_manager.client.srem(f'{self.state_key}/failed', *deleted_uuids)
+
+        logger.info(f'Retrying {len(existing_uuids)} works that could not be indexed')
+
+        self.reindex_works(index_name, Work.uuid.in_(existing_uuids))
+
+        still_failed_count = self.redis_manager.client.scard(f'{self.state_key}/failed')
+
+        if still_failed_count:
+            raise ReindexError(
+                f'Unable to index {still_failed_count} works into {index_name}, rerun the process to retry them'
+            )
+
+    def delete_orphaned_works(self, index_name: str):
+        """Works deleted after their slice was loaded were indexed but never
+        replayed as deletes, so any document without a work is removed before
+        the new index goes live"""
+        elastic_search_manager = self.get_index_manager(index_name)
+
+        # Refreshes are disabled during the bulk load, so the loaded documents are not yet searchable
+        self.elastic_search_manager.client.indices.refresh(index=index_name)
+
+        orphaned_uuids = []
+        indexed_uuids = elastic_search_manager.scan_work_uuids()
+
+        while uuid_batch := list(islice(indexed_uuids, self.batch_size)):
+            existing_uuids = {
+                str(work_uuid)
+                for work_uuid, in self.db_manager.session.query(Work.uuid).filter(Work.uuid.in_(uuid_batch))
+            }
+
+            orphaned_uuids.extend(uuid for uuid in uuid_batch if uuid not in existing_uuids)
+
+        if not orphaned_uuids:
+            return
+
+        logger.info(f'Deleting {len(orphaned_uuids)} works from {index_name} that no longer exist')
+
+        errors = elastic_search_manager.delete_work_records(orphaned_uuids)
+
+        if errors:
+            raise ReindexError(
+                f'Unable to delete {len(errors)} deleted works from {index_name}, rerun the process to retry them'
+            )
+
+    def get_index_manager(self, index_name: str) -> ElasticsearchManager:
+        elastic_search_manager = ElasticsearchManager(index=index_name)
+        elastic_search_manager.client = self.elastic_search_manager.client
+        elastic_search_manager.es = self.elastic_search_manager.es
+
+        return elastic_search_manager
+
+    def index_works(self, elastic_search_manager: ElasticsearchManager, works: list[Work]) -> list[str]:
+        work_documents = []
+
+        for work in works:
+            elastic_manager = SFRElasticRecordManager(work)
+            elastic_manager.getCreateWork()
+            work_documents.append(elastic_manager.work)
+
+        # Works the catch-up pass or a resumed slice already indexed are not rewritten
+        work_documents = elastic_search_manager.get_changed_works(work_documents)
+
+        languages_detected = SFRElasticRecordManager.detectLanguages(work_documents)
+
+        return elastic_search_manager.save_work_records(
+            work_documents, pipeline=None if languages_detected else 'language_detector'
+        )
+
+    def swap_index(self, index_name: str):
+        number_of_replicas = self.elastic_search_manager.get_number_of_replicas()
+
+        if number_of_replicas is None:
+            number_of_replicas = int(os.environ.get('ELASTICSEARCH_REPLICAS', 1))
+
+        self.elastic_search_manager.finalize_versioned_index(index_name, number_of_replicas)
+
+        previous_indices = self.elastic_search_manager.swap_alias(index_name)
+
+        logger.info(f'Swapped alias {self.elastic_search_manager.index} to {index_name}')
+
+        if previous_indices and 'delete_previous' in self.params.options:
+            logger.info(f'Deleting previous indices {previous_indices}')
+
+            self.elastic_search_manager.client.indices.delete(index=','.join(previous_indices))
+
+    def get_indexed_count(self) -> int:
+        indexed_count = self.redis_manager.client.get(f'{self.state_key}/indexed')
+
+        return int(indexed_count) if indexed_count else 0
+
+    def log_reindex_progress(self, total_works: int, starting_count: int, start_time: float):
+        indexed_count = self.get_indexed_count()
+        elapsed_seconds = time.perf_counter() - start_time
+        works_per_second = (indexed_count - starting_count) / elapsed_seconds if elapsed_seconds > 0 else 0.0
+
+        logger.info(
+            f'Reindexed {indexed_count} of {total_works} works '
+            f'({indexed_count / total_works * 100 if total_works else 100:.1f}%) '
+            f'at {works_per_second:.2f} docs/sec'
+        )
+
+    def clear_reindex_state(self):
+        self.redis_manager.client.delete(
+            self.state_key,
+            f'{self.state_key}/checkpoints',
+            f'{self.state_key}/indexed',
+            f'{self.state_key}/failed'
+        )
+
+
+class ReindexError(Exception):
+    pass
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from dateutil import parser
 from datetime import datetime, timedelta, timezone
 from typing import Optional
@@ -26,6 +26,7 @@ class ProcessParams:
     limit: Optional[int] = None
     offset: int = 0
     source: Optional[str] = None
+    options: list[str] = field(default_factory=list)
 
 
 def parse_process_args(*args) -> ProcessParams:
@@ -37,4 +38,5 @@ def parse_process_args(*args) -> ProcessParams:
         limit=int(args[4]) if len(args) > 4 and args[4] is not None else None,
         offset=int(args[5]) if len(args) > 5 and args[5] is not None else 0,
         source=args[6] if len(args) > 6 else None,
+        options=list(args[7]) if len(args) > 7 and args[7] else [],
     )
@@ -17,3 +17,6 @@ from .deleteUMPManifestLinks import main as deleteUMPManifests
 from .deleteProblemWorks import main as deleteWorks
 from .check_queue_size import main as checkQueueSize
 from .report_missing_files import main as ReportMissingFiles
+from .benchmark_webpub_manifest import main as benchmarkWebpubManifest
+from .load_test_api import main as loadTestAPI
+from .benchmark_language_detection import main as benchmarkLanguageDetection
@@ -0,0 +1,77 @@
+import os
+import sys
+from time import perf_counter
+
+from elasticsearch_dsl import Index
+
+from managers import DBManager, ElasticsearchManager, SFRElasticRecordManager
+from model import ESWork, Work
+
+'''
+Compares Elasticsearch indexing throughput for a sample of works when titles and subjects are language detected
+by the language_detector ingest pipeline and when they are detected locally before bulk submission. Works are
+indexed into a temporary index that is deleted once the benchmark completes.
+
+Usage:  python main.py --script benchmarkLanguageDetection -e <env> options limit=<limit>
+'''
+
+
+def main(*args):
+    limit_arg = next(filter(lambda option: option.startswith('limit'), args), None)
+    limit = int(limit_arg.split('=')[1]) if limit_arg else 1000
+
+    benchmark_index = f'{os.environ["ELASTICSEARCH_INDEX"]}-language-benchmark'
+
+    db_manager = DBManager()
+    db_manager.create_session()
+
+    elastic_search_manager = ElasticsearchManager(index=benchmark_index)
+    elastic_search_manager.create_elastic_connection()
+    elastic_search_manager.create_elastic_search_ingest_pipeline()
+
+    ESWork.init(index=benchmark_index)
+
+    try:
+        works = db_manager.session.query(Work).order_by(Work.id.desc()).limit(limit).all()
+
+        print(f'Indexing {len(works)} works into {benchmark_index}')
+
+        pipeline_documents = build_work_documents(works)
+
+        start_time = perf_counter()
+        elastic_search_manager.save_work_records(pipeline_documents, pipeline='language_detector')
+        print_throughput('Ingest pipeline', len(works), perf_counter() - start_time)
+
+        local_documents = build_work_documents(works)
+
+        start_time = perf_counter()
+        SFRElasticRecordManager.detectLanguages(local_documents)
+        detection_time = perf_counter() - start_time
+
+        elastic_search_manager.save_work_records(local_documents, pipeline=None)
+        print_throughput('Local detection', len(works), perf_counter() - start_time)
+
+        print(f'Local detection took {detection_time:.2f}s of the local run')
+    finally:
+        Index(benchmark_index).delete(ignore=404)
+        db_manager.close_connection()
+
+
+def build_work_documents(works: list) -> list:
+    work_documents = []
+
+    for work in works:
+        elastic_manager = SFRElasticRecordManager(work)
+        elastic_manager.getCreateWork()
+        work_documents.append(elastic_manager.work)
+
+    return work_documents
+
+
+def print_throughput(label: str, work_count: int, elapsed: float):
+    print(f'{label}: {elapsed:.2f}s, {work_count / elapsed:.1f} works/sec')
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(*args)
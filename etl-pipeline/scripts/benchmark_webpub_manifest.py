@@ -0,0 +1,80 @@
+from io import BytesIO
+import json
+import os
+import sys
+from time import perf_counter
+from urllib.parse import quote_plus
+from zipfile import ZipFile
+
+import requests
+
+from digital_assets import get_stored_file_url
+from managers import S3Manager
+
+'''
+Compares local webpub manifest generation against the remote epub-to-webpub conversion service
+for an EPUB that has already been stored and unzipped in the file bucket.
+
+Usage:  python main.py --script benchmarkWebpubManifest -e <env> options epubPath=<epubPath> iterations=<iterations>
+'''
+
+WEBPUB_CONVERSION_BASE_URL = 'https://epub-to-webpub.vercel.app'
+
+
+def main(*args):
+    epub_path_arg = next(filter(lambda option: option.startswith('epubPath'), args), None)
+    iterations_arg = next(filter(lambda option: option.startswith('iterations'), args), None)
+
+    if not epub_path_arg:
+        print('An epubPath option is required, e.g. epubPath=epubs/gutenberg/1234_images.epub')
+        return
+
+    epub_path = epub_path_arg.split('=')[1]
+    iterations = int(iterations_arg.split('=')[1]) if iterations_arg else 10
+    file_bucket = os.environ['FILE_BUCKET']
+    epub_root = '.'.join(epub_path.split('.')[:-1])
+
+    s3_manager = S3Manager()
+    epub_bytes = s3_manager.get_object(epub_path, file_bucket)['Body'].read()
+
+    local_timings = []
+
+    for _ in range(iterations):
+        start_time = perf_counter()
+
+        with ZipFile(BytesIO(epub_bytes)) as epub_zip:
+            local_manifest = json.loads(s3_manager.generate_epub_manifest(epub_zip, epub_path, file_bucket))
+
+        local_timings.append(perf_counter() - start_time)
+
+    container_url = get_stored_file_url(storage_name=file_bucket, file_path=f'{epub_root}/META-INF/container.xml')
+    remote_timings = []
+
+    for _ in range(iterations):
+        start_time = perf_counter()
+
+        remote_response = requests.get(f'{WEBPUB_CONVERSION_BASE_URL}/api/{quote_plus(container_url)}', timeout=30)
+        remote_response.raise_for_status()
+        remote_manifest = remote_response.json()
+
+        remote_timings.append(perf_counter() - start_time)
+
+    print_timings('Local', local_timings)
+    print_timings('Remote', remote_timings)
+
+    local_reading_order = [link['href'] for link in local_manifest.get('readingOrder', [])]
+    remote_reading_order = [link['href'] for link in remote_manifest.get('readingOrder', [])]
+
+    print(f'Reading order matches: {local_reading_order == remote_reading_order} ({len(local_reading_order)} local, {len(remote_reading_order)} remote)')
+    print(f'Table of contents entries: {len(local_manifest.get("toc", []))} local, {len(remote_manifest.get("toc", []))} remote')
+
+
+def print_timings(label: str, timings: list):
+    timings = sorted(timings)
+
+    print(f'{label}: mean {sum(timings) / len(timings) * 1000:.1f}ms, median {timings[len(timings) // 2] * 1000:.1f}ms, max {timings[-1] * 1000:.1f}ms')
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(*args)
@@ -0,0 +1,101 @@
+from multiprocessing import Pool, cpu_count
+import sys
+from time import perf_counter
+
+import requests
+
+'''
+Measures API throughput at increasing numbers of concurrent clients. Run it against the API with
+different API_WORKERS settings to compare how requests/sec scales with the cores available to the server.
+
+Usage:  python main.py --script loadTestAPI -e <env> options host=<host> duration=<seconds> concurrency=<levels> paths=<paths>
+
+Concurrency levels and paths are comma separated, e.g. concurrency=1,2,4,8 paths=/search?query=history,/utils/languages
+'''
+
+DEFAULT_PATHS = [
+    '/search?query=keyword%3Ahistory',
+    '/search?query=subject%3Ascience&page=5',
+    '/utils/languages',
+    '/utils/counts'
+]
+
+
+def main(*args):
+    options = dict(option.split('=', 1) for option in args if '=' in option)
+
+    host = options.get('host', 'http://localhost:5050').rstrip('/')
+    duration = int(options.get('duration', 30))
+    paths = options['paths'].split(',') if 'paths' in options else DEFAULT_PATHS
+    concurrency_levels = [int(level) for level in options['concurrency'].split(',')]\
+        if 'concurrency' in options else default_concurrency_levels()
+
+    print(f'Load testing {host} for {duration}s per level from a client with {cpu_count()} cores')
+    print(f'{"clients":>8} {"requests":>9} {"errors":>7} {"req/sec":>9} {"p50 ms":>8} {"p95 ms":>8} {"speedup":>8}')
+
+    base_throughput = None
+
+    for concurrency in concurrency_levels:
+        with Pool(concurrency) as client_pool:
+            client_results = client_pool.starmap(
+                run_client, [(host, paths, duration, client) for client in range(concurrency)]
+            )
+
+        latencies = sorted(latency for results in client_results for latency in results['latencies'])
+        errors = sum(results['errors'] for results in client_results)
+        throughput = len(latencies) / duration
+
+        base_throughput = base_throughput or throughput
+
+        print(
+            f'{concurrency:>8} {len(latencies):>9} {errors:>7} {throughput:>9.1f} '
+            f'{percentile(latencies, 50):>8.1f} {percentile(latencies, 95):>8.1f} '
+            f'{throughput / base_throughput if base_throughput else 0:>7.2f}x'
+        )
+
+
+def run_client(host: str, paths: list, duration: int, client: int) -> dict:
+    session = requests.Session()
+    latencies = []
+    errors = 0
+    request_count = client
+
+    end_time = perf_counter() + duration
+
+    while perf_counter() < end_time:
+        path = paths[request_count % len(paths)]
+        request_count += 1
+
+        start_time = perf_counter()
+
+        try:
+            response = session.get(f'{host}{path}', timeout=30)
+            response.raise_for_status()
+        except requests.RequestException:
+            errors += 1
+            continue
+
+        latencies.append((perf_counter() - start_time) * 1000)
+
+    return { 'latencies': latencies, 'errors': errors }
+
+
+def default_concurrency_levels() -> list:
+    levels = [1]
+
+    while levels[-1] < cpu_count() * 2:
+        levels.append(levels[-1] * 2)
+
+    return levels
+
+
+def percentile(values: list, percent: int) -> float:
+    if not values:
+        return 0.0
+
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    main(*args)
@@ -19,6 +19,8 @@ class TestCoverProcess:
                 self.batchSize = 3
                 self.runTime = datetime.now()
                 self.redis_manager = mocker.MagicMock()
+                self.response_cache = mocker.MagicMock()
+                self.elastic_search_manager = mocker.MagicMock()
                 self.s3_manager = mocker.MagicMock(client=mocker.MagicMock())
                 self.editions_to_update = set()
 
@@ -182,6 +184,7 @@ class TestCoverProcess:
         mockFetcher = mocker.MagicMock(SOURCE='test', coverID=1)
         mockManager = mocker.MagicMock(fetcher=mockFetcher, coverFormat='tst', coverContent='testBytes')
         mockEdition = mocker.MagicMock(links=[])
+        mockSave = mocker.patch.object(CoverProcess, 'save_editions')
 
         testProcess.editions_to_update = set([f'ed{i}' for i in range(25)])
         testProcess.store_cover(mockManager, mockEdition)
@@ -189,5 +192,49 @@ class TestCoverProcess:
         assert mockEdition.links[0].url == 'test_aws_bucket.s3.amazonaws.com/covers/test/1.tst'
         assert mockEdition.links[0].media_type == 'image/tst'
         assert mockEdition.links[0].flags == {'cover': True}
-        testProcess.db_manager.bulk_save_objects.assert_called_once_with(testProcess.editions_to_update)
+        mockSave.assert_called_once()
         testProcess.s3_manager.put_object.assert_called_once_with('testBytes', 'covers/test/1.tst', 'test_aws_bucket')
+
+    def test_save_editions(self, testProcess: CoverProcess, mocker):
+        mockUpdateWorks = mocker.patch.object(CoverProcess, 'update_works')
+        mockEditions = [mocker.MagicMock(work_id=1), mocker.MagicMock(work_id=1), mocker.MagicMock(work_id=2)]
+
+        savedEditions = []
+        testProcess.db_manager.bulk_save_objects.side_effect = lambda editions: savedEditions.extend(editions)
+
+        testProcess.editions_to_update = set(mockEditions)
+        testProcess.save_editions()
+
+        assert set(savedEditions) == set(mockEditions)
+        mockUpdateWorks.assert_called_once_with(set([1, 2]))
+        assert testProcess.editions_to_update == set()
+
+    def test_update_works(self, testProcess: CoverProcess, mocker):
+        mockWorks = [mocker.MagicMock(id=1, date_modified=None), mocker.MagicMock(id=2, date_modified=None)]
+        testProcess.db_manager.session.query().filter().all.return_value = mockWorks
+
+        mockElasticManager = mocker.patch('processes.file.covers.SFRElasticRecordManager')
+        mockElasticManager.side_effect = lambda work: mocker.MagicMock(work=f'doc{work.id}')
+        mockElasticManager.detectLanguages.return_value = True
+
+        testProcess.elastic_search_manager.get_changed_works.return_value = ['doc2']
+
+        testProcess.update_works(set([1, 2]))
+
+        assert all(work.date_modified is not None for work in mockWorks)
+        testProcess.db_manager.session.commit.assert_called_once()
+        testProcess.elastic_search_manager.get_changed_works.assert_called_once_with(['doc1', 'doc2'])
+        testProcess.elastic_search_manager.save_work_records.assert_called_once_with(['doc2'], pipeline=None)
+        testProcess.response_cache.invalidate_works.assert_called_once_with(set([1, 2]))
+
+    def test_update_works_unchanged(self, testProcess: CoverProcess, mocker):
+        testProcess.db_manager.session.query().filter().all.return_value = [mocker.MagicMock(id=1)]
+
+        mocker.patch('processes.file.covers.SFRElasticRecordManager')
+
+        testProcess.elastic_search_manager.get_changed_works.return_value = []
+
+        testProcess.update_works(set([1]))
+
+        testProcess.elastic_search_manager.save_work_records.assert_not_called()
+        testProcess.response_cache.invalidate_works.assert_called_once_with(set([1]))
@@ -3,6 +3,7 @@ import requests
 
 from tests.helper import TestHelpers
 from processes import S3Process
+from processes.file.s3_files import HostConcurrencyLimiter
 
 
 class TestS3Process:
@@ -19,6 +20,9 @@ class TestS3Process:
         class TestS3Process(S3Process):
             def __init__(self, process, customFile, ingestPeriod):
                 self.bucket = 'testBucket'
+                self.worker_count = 4
+                self.worker_concurrency = 8
+                self.per_host_limit = 2
         
         return TestS3Process('TestProcess', 'testFile', 'testDate')
 
@@ -43,6 +47,7 @@ class TestS3Process:
 
         mock_process_files.assert_called_once
         assert mock_process.call_count == 4
+        mock_process.assert_called_with(target=S3Process.process_files, args=(4, 8, 2))
         assert mock_file_process.start.call_count == 4
         assert mock_file_process.join.call_count == 4
 
@@ -56,6 +61,7 @@ class TestS3Process:
         mock_rabbit_mq = mocker.MagicMock()
         mock_rabbit_mq_manager = mocker.patch('processes.file.s3_files.RabbitMQManager')
         mock_rabbit_mq_manager.return_value = mock_rabbit_mq
+        mock_rabbit_mq.add_threadsafe_callback.side_effect = lambda callback: callback()
         mock_message_propse = mocker.MagicMock()
         mock_message_propse.delivery_tag = 'rabbitMQTag'
         mock_rabbit_mq.get_message_from_queue.side_effect = [
@@ -66,13 +72,10 @@ class TestS3Process:
             (None, None, None)
         ]
 
-        mock_get_file_contents = mocker.patch.object(S3Process, 'get_file_contents')
-        mock_get_file_contents.return_value = 'testFileBytes'
+        mock_get_file_stream = mocker.patch.object(S3Process, 'get_file_stream')
+        mock_get_file_stream.return_value = 'testFileStream'
 
-        mock_generate_webpub = mocker.patch.object(S3Process, 'generate_webpub')
-        mock_generate_webpub.return_value = 'testWebpubJson'
-
-        S3Process.process_files(4)
+        S3Process.process_files(4, concurrency=2)
 
         assert mock_rabbit_mq.get_message_from_queue.call_count == 5
         mock_rabbit_mq.get_message_from_queue.assert_called_with('test_file_queue')
@@ -81,24 +84,88 @@ class TestS3Process:
             mocker.call(30), mocker.call(60), mocker.call(90)
         ])
 
-        mock_generate_webpub.assert_called_once_with('testBucketPath', 'test_aws_bucket')
+        mock_get_file_stream.assert_called_once_with('testSourceURL', session=mocker.ANY)
 
-        mock_s3.put_object.assert_has_calls([
-            mocker.call('testFileBytes', 'testBucketPath.epub', 'test_aws_bucket'),
-            mocker.call('testWebpubJson', 'testBucketPath/manifest.json', 'test_aws_bucket')
-        ])
+        mock_s3.put_object_stream.assert_called_once_with('testFileStream', 'testBucketPath.epub', 'test_aws_bucket')
         mock_rabbit_mq.acknowledge_message_processed.assert_called_once_with('rabbitMQTag')
 
-    def test_get_file_contents_success(self, test_instance, mocker):
+    def test_process_files_waits_for_in_flight_messages(self, test_file_message, mocker):
+        class SynchronousExecutor:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                pass
+
+            def submit(self, function, *args, **kwargs):
+                function(*args, **kwargs)
+
+        mocker.patch('processes.file.s3_files.ThreadPoolExecutor', SynchronousExecutor)
+        mocker.patch('processes.file.s3_files.sleep')
+        mocker.patch('processes.file.s3_files.S3Manager')
+
+        mock_rabbit_mq = mocker.MagicMock()
+        mocker.patch('processes.file.s3_files.RabbitMQManager').return_value = mock_rabbit_mq
+        mock_rabbit_mq.get_message_from_queue.side_effect = [
+            (mocker.MagicMock(delivery_tag=1), {}, test_file_message),
+            (mocker.MagicMock(delivery_tag=2), {}, test_file_message),
+            (None, None, None)
+        ]
+
+        completions = []
+        mock_rabbit_mq.add_threadsafe_callback.side_effect = completions.append
+        mock_rabbit_mq.process_data_events.side_effect = lambda time_limit: completions.pop(0)()
+
+        mock_process_message = mocker.patch.object(S3Process, 'process_message')
+        mock_process_message.side_effect = lambda message, rabbit_mq_manager, in_flight_messages, **kwargs: \
+            S3Process._complete_message(rabbit_mq_manager, message[0].delivery_tag, True, in_flight_messages)
+
+        S3Process.process_files(1, concurrency=1)
+
+        assert mock_process_message.call_count == 2
+        assert mock_rabbit_mq.process_data_events.call_count == 2
+        mock_rabbit_mq.acknowledge_message_processed.assert_has_calls([mocker.call(1), mocker.call(2)])
+
+    def test_process_message_rejects_failed_file(self, test_file_message, mocker):
+        mock_rabbit_mq = mocker.MagicMock()
+        mock_rabbit_mq.add_threadsafe_callback.side_effect = lambda callback: callback()
+        mock_get_file_stream = mocker.patch.object(S3Process, 'get_file_stream')
+        mock_get_file_stream.side_effect = Exception('test failure')
+        in_flight_messages = {'rabbitMQTag'}
+
+        S3Process.process_message(
+            message=(mocker.MagicMock(delivery_tag='rabbitMQTag'), {}, test_file_message),
+            storage_manager=mocker.MagicMock(),
+            rabbit_mq_manager=mock_rabbit_mq,
+            in_flight_messages=in_flight_messages
+        )
+
+        mock_rabbit_mq.reject_message.assert_called_once_with(delivery_tag='rabbitMQTag')
+        mock_rabbit_mq.acknowledge_message_processed.assert_not_called()
+        assert in_flight_messages == set()
+
+    def test_host_concurrency_limiter_shares_host_semaphore(self):
+        host_limiter = HostConcurrencyLimiter(2)
+
+        with host_limiter.limit('https://example.com/file1.pdf'), host_limiter.limit('https://example.com/file2.pdf'):
+            assert not host_limiter.host_semaphores['example.com'].acquire(blocking=False)
+
+        assert list(host_limiter.host_semaphores.keys()) == ['example.com']
+
+    def test_get_file_stream_success(self, test_instance, mocker):
         mock_get_request = mocker.patch.object(requests, 'get')
         mock_response = mocker.MagicMock()
         mock_response.status_code = 200
-        mock_response.iter_content.return_value = [b'e', b'p', b'u', b'b']
+        mock_response.iter_content.return_value = iter([b'e', b'p', b'u', b'b'])
         mock_get_request.return_value = mock_response
 
-        test_file = test_instance.get_file_contents('testURL')
+        test_file_stream = test_instance.get_file_stream('testURL')
 
-        assert test_file == b'epub'
+        assert b''.join(test_file_stream) == b'epub'
+        mock_response.iter_content.assert_called_once_with(1024 * 250)
         mock_get_request.assert_called_once_with(
             'testURL',
             stream=True,
@@ -106,39 +173,11 @@ class TestS3Process:
             headers={'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_11_5)'}
         )
         
-    def test_get_file_contents_error(self, test_instance, mocker):
+    def test_get_file_stream_error(self, test_instance, mocker):
         mock_get_request = mocker.patch.object(requests, 'get')
         mock_response = mocker.MagicMock()
         mock_response.raise_for_status.side_effect = Exception
         mock_get_request.return_value = mock_response
 
         with pytest.raises(Exception):
-            test_instance.get_file_contents('testURL')
-
-    def test_generate_webpub_success(self, mocker):
-        mock_get_request = mocker.patch.object(requests, 'get')
-        mock_response = mocker.MagicMock(content='testWebpub')
-        mock_get_request.return_value = mock_response
-
-        test_webpub = S3Process.generate_webpub('testRoot', 'testBucket')
-
-        assert test_webpub == 'testWebpub'
-
-        mock_get_request.assert_called_once_with(
-            f'{S3Process.WEBPUB_CONVERSION_BASE_URL}/api/https%3A%2F%2FtestBucket.s3.amazonaws.com%2FtestRoot%2FMETA-INF%2Fcontainer.xml',
-            timeout=15
-        )
-
-    def test_generate_webpub_error(self, mocker):
-        mock_get_request = mocker.patch.object(requests, 'get')
-        mock_response = mocker.MagicMock(content='testWebpub')
-        mock_response.raise_for_status.side_effect = Exception
-        mock_get_request.return_value = mock_response
-
-        with pytest.raises(Exception):
-            S3Process.generate_webpub('testRoot', 'testBucket')
-
-        mock_get_request.assert_called_once_with(
-            f'{S3Process.WEBPUB_CONVERSION_BASE_URL}/api/https%3A%2F%2FtestBucket.s3.amazonaws.com%2FtestRoot%2FMETA-INF%2Fcontainer.xml',
-            timeout=15
-        )
+            test_instance.get_file_stream('testURL')
@@ -0,0 +1,184 @@
+import json
+import pytest
+from queue import Queue
+
+from processes.record_pipeline import RecordPipelineProcess, RecordPipelineWorker
+
+
+class TestRecordPipelineProcess:
+    @pytest.fixture
+    def test_instance(self, mocker):
+        class TestRecordPipelineProcess(RecordPipelineProcess):
+            def __init__(self):
+                self.record_queue = 'testQueue'
+                self.worker_count = 2
+                self.idle_timeout = 1
+                self.rabbitmq_manager = mocker.MagicMock()
+                self.rabbitmq_manager.add_threadsafe_callback.side_effect = lambda callback: callback()
+                self.elastic_index_buffer = mocker.MagicMock()
+                self.workers = [mocker.MagicMock(), mocker.MagicMock()]
+                self.idle_workers = Queue()
+                for worker in self.workers:
+                    self.idle_workers.put(worker)
+                self.executor = None
+                self.pending_messages = {}
+                self.processing_messages = {}
+                self.shutdown_requested = False
+
+        return TestRecordPipelineProcess()
+
+    @pytest.fixture
+    def mock_executor(self, mocker):
+        class SynchronousExecutor:
+            def __init__(self, *args, **kwargs):
+                pass
+
+            def submit(self, function, *args):
+                function(*args)
+
+            def shutdown(self, wait=True):
+                pass
+
+        mocker.patch('processes.record_pipeline.ThreadPoolExecutor', SynchronousExecutor)
+        mocker.patch.object(RecordPipelineProcess, '_register_shutdown_handlers', return_value={})
+
+    @staticmethod
+    def create_message(mocker, delivery_tag, source_id, source='test_source'):
+        message_method = mocker.MagicMock(delivery_tag=delivery_tag)
+
+        return (message_method, None, json.dumps({ 'sourceId': source_id, 'source': source }))
+
+    def test_run_process_acknowledges_processed_messages(self, test_instance, mock_executor, mocker):
+        test_instance.rabbitmq_manager.consume_messages.return_value = iter([
+            self.create_message(mocker, 1, 'record_1'),
+            self.create_message(mocker, 2, 'record_2'),
+        ])
+
+        test_instance.runProcess()
+
+        test_instance.workers[0].process_record.assert_called_once_with('record_1', 'test_source')
+        test_instance.workers[1].process_record.assert_called_once_with('record_2', 'test_source')
+        test_instance.rabbitmq_manager.acknowledge_message_processed.assert_has_calls([mocker.call(1), mocker.call(2)])
+        test_instance.rabbitmq_manager.reject_message.assert_not_called()
+        test_instance.rabbitmq_manager.cancel_consumer.assert_called_once()
+        test_instance.rabbitmq_manager.close_connection.assert_called_once()
+        test_instance.elastic_index_buffer.start.assert_called_once()
+        test_instance.elastic_index_buffer.close.assert_called_once()
+        for worker in test_instance.workers:
+            worker.close.assert_called_once()
+
+    def test_run_process_rejects_failed_messages(self, test_instance, mock_executor, mocker):
+        test_instance.workers[0].process_record.side_effect = Exception('test failure')
+        test_instance.rabbitmq_manager.consume_messages.return_value = iter([
+            self.create_message(mocker, 1, 'record_1')
+        ])
+
+        test_instance.runProcess()
+
+        test_instance.rabbitmq_manager.acknowledge_message_processed.assert_not_called()
+        test_instance.rabbitmq_manager.reject_message.assert_called_once_with(delivery_tag=1)
+
+    def test_run_process_rejects_unparseable_messages(self, test_instance, mock_executor, mocker):
+        test_instance.rabbitmq_manager.consume_messages.return_value = iter([
+            (mocker.MagicMock(delivery_tag=1), None, 'not json')
+        ])
+
+        test_instance.runProcess()
+
+        test_instance.workers[0].process_record.assert_not_called()
+        test_instance.rabbitmq_manager.reject_message.assert_called_once_with(delivery_tag=1)
+
+    def test_run_process_stops_after_idle_timeout(self, test_instance, mock_executor, mocker):
+        mocker.patch('processes.record_pipeline.monotonic', side_effect=[0, 0.5, 2])
+        test_instance.rabbitmq_manager.consume_messages.return_value = iter([
+            (None, None, None), (None, None, None), (None, None, None)
+        ])
+
+        test_instance.runProcess()
+
+        test_instance.rabbitmq_manager.consume_messages.assert_called_once_with('testQueue', inactivity_timeout=1)
+        test_instance.rabbitmq_manager.cancel_consumer.assert_called_once()
+
+    def test_run_process_stops_on_shutdown_request(self, test_instance, mock_executor, mocker):
+        def consume_messages(*args, **kwargs):
+            yield self.create_message(mocker, 1, 'record_1')
+            test_instance._request_shutdown(15, None)
+            yield self.create_message(mocker, 2, 'record_2')
+            yield self.create_message(mocker, 3, 'record_3')
+
+        test_instance.rabbitmq_manager.consume_messages.side_effect = consume_messages
+
+        test_instance.runProcess()
+
+        test_instance.workers[0].process_record.assert_called_once_with('record_1', 'test_source')
+        test_instance.rabbitmq_manager.acknowledge_message_processed.assert_called_once_with(1)
+        test_instance.rabbitmq_manager.reject_message.assert_called_once_with(delivery_tag=2, requeue=True)
+
+    def test_add_pending_message_coalesces_messages(self, test_instance, mocker):
+        test_instance._add_pending_message(1, json.dumps({ 'sourceId': 'record_1', 'source': 'test_source' }))
+        test_instance._add_pending_message(2, json.dumps({ 'sourceId': 'record_2', 'source': 'test_source' }))
+        test_instance._add_pending_message(3, json.dumps({ 'sourceId': 'record_1', 'source': 'test_source' }))
+
+        assert test_instance.pending_messages == {
+            ('record_1', 'test_source'): [1, 3],
+            ('record_2', 'test_source'): [2]
+        }
+
+    def test_dispatch_pending_messages_waits_for_record_in_progress(self, test_instance, mocker):
+        test_instance.executor = mocker.MagicMock()
+        test_instance.processing_messages = { ('record_1', 'test_source'): [1] }
+        test_instance.pending_messages = {
+            ('record_1', 'test_source'): [2],
+            ('record_2', 'test_source'): [3],
+            ('record_3', 'test_source'): [4]
+        }
+
+        test_instance._dispatch_pending_messages()
+
+        test_instance.executor.submit.assert_called_once_with(test_instance._process_record, ('record_2', 'test_source'))
+        assert test_instance.processing_messages == {
+            ('record_1', 'test_source'): [1],
+            ('record_2', 'test_source'): [3]
+        }
+        assert test_instance.pending_messages == {
+            ('record_1', 'test_source'): [2],
+            ('record_3', 'test_source'): [4]
+        }
+
+    def test_complete_messages_acknowledges_coalesced_messages(self, test_instance, mocker):
+        test_instance.executor = mocker.MagicMock()
+        test_instance.processing_messages = { ('record_1', 'test_source'): [1, 3] }
+        test_instance.pending_messages = { ('record_1', 'test_source'): [5] }
+
+        test_instance._complete_messages(('record_1', 'test_source'), True)
+
+        test_instance.rabbitmq_manager.acknowledge_message_processed.assert_has_calls([mocker.call(1), mocker.call(3)])
+        test_instance.executor.submit.assert_called_once_with(test_instance._process_record, ('record_1', 'test_source'))
+        assert test_instance.processing_messages == { ('record_1', 'test_source'): [5] }
+
+    def test_process_record_returns_worker(self, test_instance, mocker):
+        test_instance.processing_messages = { ('record_1', 'test_source'): [1] }
+        mock_complete_messages = mocker.patch.object(RecordPipelineProcess, '_complete_messages')
+
+        test_instance._process_record(('record_1', 'test_source'))
+
+        test_instance.workers[0].process_record.assert_called_once_with('record_1', 'test_source')
+        mock_complete_messages.assert_called_once_with(('record_1', 'test_source'), True)
+        assert test_instance.idle_workers.qsize() == 2
+
+    def test_worker_serializes_clustering(self, mocker):
+        mocker.patch('processes.record_pipeline.DBManager')
+        mocker.patch('processes.record_pipeline.RecordFRBRizer')
+        mocker.patch('processes.record_pipeline.RecordClusterer')
+        mocker.patch('processes.record_pipeline.LinkFulfiller')
+
+        cluster_lock = mocker.MagicMock()
+        worker = RecordPipelineWorker(cluster_lock=cluster_lock, elastic_index_buffer=mocker.MagicMock())
+
+        worker.process_record('record_1', 'test_source')
+
+        worker.record_frbrizer.frbrize_record.assert_called_once()
+        worker.record_clusterer.cluster_record.assert_called_once_with(worker.record_frbrizer.frbrize_record.return_value)
+        worker.link_fulfiller.fulfill_records_links.assert_called_once_with(worker.record_clusterer.cluster_record.return_value)
+        cluster_lock.__enter__.assert_called_once()
+        worker.db_manager.session.close.assert_called_once()
@@ -5,7 +5,6 @@ import pytest
 
 from tests.helper import TestHelpers
 from processes.cluster import ClusterProcess, ClusterError
-from model import Record
 from processes.utils import ProcessParams
 
 
@@ -24,6 +23,9 @@ class TestClusterProcess:
             def __init__(self):
                 self.params = ProcessParams()
                 self.db_manager = mocker.MagicMock()
+                self.response_cache = mocker.MagicMock()
+                self.elastic_search_manager = mocker.MagicMock()
+                self.elastic_search_manager.drain_dead_letter_works.return_value = []
                 self.records = []
                 self.ingestPeriod = None
                 self.limit = None
@@ -72,6 +74,61 @@ class TestClusterProcess:
             source=testInstance.params.source
         )
 
+    def test_runProcess_batch(self, testInstance: ClusterProcess, mocker):
+        mockCluster = mocker.patch.object(ClusterProcess, 'cluster_records')
+        mockBatchCluster = mocker.patch.object(ClusterProcess, 'cluster_records_in_batches')
+
+        testInstance.params.process_type = 'complete'
+        testInstance.params.options = ['batch']
+        testInstance.runProcess()
+
+        mockCluster.assert_not_called()
+        mockBatchCluster.assert_called_once_with(
+            start_datetime=None,
+            record_uuid=None,
+            source=None
+        )
+
+    def test_runProcess_parallel(self, testInstance: ClusterProcess, mocker):
+        mocker.patch.dict('os.environ', {'CLUSTER_WORKERS': '4'})
+        mockCluster = mocker.patch.object(ClusterProcess, 'cluster_records')
+        mockParallelCluster = mocker.patch.object(ClusterProcess, 'cluster_records_in_parallel')
+
+        testInstance.params.process_type = 'complete'
+        testInstance.runProcess()
+
+        mockCluster.assert_not_called()
+        mockParallelCluster.assert_called_once_with(
+            start_datetime=None,
+            record_uuid=None,
+            source=None
+        )
+
+    def test_cluster_records_in_parallel(self, testInstance: ClusterProcess, mocker):
+        mocker.patch.dict('os.environ', {'CLUSTER_WORKERS': '2'})
+        mockProcess = mocker.patch('processes.cluster.Process')
+        mockProcess.return_value.exitcode = 0
+        testInstance.process_args = ('complete',)
+
+        testInstance.cluster_records_in_parallel(source='test')
+
+        cluster_args = {'start_datetime': None, 'record_uuid': None, 'source': 'test'}
+        mockProcess.assert_has_calls([
+            mocker.call(target=ClusterProcess.run_cluster_worker, args=(('complete',), cluster_args, (0, 2))),
+            mocker.call(target=ClusterProcess.run_cluster_worker, args=(('complete',), cluster_args, (1, 2))),
+        ], any_order=True)
+        assert mockProcess.return_value.start.call_count == 2
+        assert mockProcess.return_value.join.call_count == 2
+
+    def test_cluster_records_in_parallel_worker_failure(self, testInstance: ClusterProcess, mocker):
+        mocker.patch.dict('os.environ', {'CLUSTER_WORKERS': '2'})
+        mockProcess = mocker.patch('processes.cluster.Process')
+        mockProcess.return_value.exitcode = 1
+        testInstance.process_args = ()
+
+        with pytest.raises(ClusterError):
+            testInstance.cluster_records_in_parallel()
+
     def test_cluster_records_not_full(self, testInstance: ClusterProcess, mocker):
         clusterMocks = mocker.patch.multiple(
             ClusterProcess,
@@ -86,8 +143,9 @@ class TestClusterProcess:
         mockQuery.filter.return_value = mockQuery
         mockQuery.first.side_effect = ['rec1', 'rec2', None]
 
+        work1, work4 = mocker.MagicMock(id=1), mocker.MagicMock(id=4)
         clusterMocks['cluster_record'].side_effect = [
-            ('work1', ['uuid2', 'uuid3']), ('work4', ['uuid3', 'uuid4'])
+            (work1, ['uuid2', 'uuid3']), (work4, ['uuid3', 'uuid4'])
         ]
 
         testInstance.cluster_records()
@@ -96,12 +154,15 @@ class TestClusterProcess:
 
         clusterMocks['cluster_record'].assert_has_calls([mocker.call('rec1'), mocker.call('rec2')])
         clusterMocks['update_elastic_search'].assert_called_once_with(
-            ['work1', 'work4'], set(['uuid2', 'uuid3', 'uuid4'])
+            [work1, work4], set(['uuid2', 'uuid3', 'uuid4'])
         )
         clusterMocks['delete_stale_works'].assert_called_once_with(
             set(['uuid2', 'uuid3', 'uuid4'])
         )
         testInstance.db_manager.session.commit.assert_called_once()
+        testInstance.response_cache.invalidate_works.assert_called_once_with(
+            set(['uuid2', 'uuid3', 'uuid4', 1, 4])
+        )
 
     def test_cluster_records_custom_range(self, testInstance: ClusterProcess, mocker):
         clusterMocks = mocker.patch.multiple(
@@ -117,9 +178,8 @@ class TestClusterProcess:
         mockQuery.filter.return_value = mockQuery
         mockQuery.first.side_effect = ['rec{}'.format(i) for i in range(50)] + [None]
 
-        clusterMocks['cluster_record'].side_effect = [
-            ('work{}'.format(i), []) for i in range(50)
-        ]
+        testWorks = [mocker.MagicMock(id=i) for i in range(50)]
+        clusterMocks['cluster_record'].side_effect = [(work, []) for work in testWorks]
 
         testInstance.cluster_records(start_datetime='testDate')
 
@@ -128,7 +188,7 @@ class TestClusterProcess:
             [mocker.call('rec{}'.format(i)) for i in range(50)]
         )
         clusterMocks['update_elastic_search'].assert_has_calls([
-            mocker.call(['work{}'.format(i) for i in range(50)], set([])),
+            mocker.call(testWorks, set([])),
             mocker.call([], set([]))
         ])
         clusterMocks['delete_stale_works'].assert_has_calls([
@@ -150,13 +210,171 @@ class TestClusterProcess:
         mockQueryResponses = [mocker.MagicMock(id=1), mocker.MagicMock(id=2), None]
         mockQuery.first.side_effect = mockQueryResponses
 
-        clusterMocks['cluster_record'].side_effect = [('work1', []), ClusterError]
+        clusterMocks['cluster_record'].side_effect = [(mocker.MagicMock(id=1), []), ClusterError]
 
         testInstance.cluster_records()
 
         assert mockQuery.first.call_count == 3
         clusterMocks['update_cluster_status'].assert_called_once_with([2])
 
+    def test_cluster_records_in_batches(self, testInstance: ClusterProcess, mocker):
+        clusterMocks = mocker.patch.multiple(
+            ClusterProcess,
+            find_record_components=mocker.DEFAULT,
+            cluster_component=mocker.DEFAULT,
+            update_elastic_search=mocker.DEFAULT,
+            delete_stale_works=mocker.DEFAULT,
+            update_cluster_status=mocker.DEFAULT
+        )
+
+        mockQuery = mocker.MagicMock()
+        testInstance.db_manager.session.query().filter.return_value = mockQuery
+        mockQuery.order_by.return_value = mockQuery
+        mockQuery.filter.return_value = mockQuery
+        mockQuery.limit.return_value = mockQuery
+
+        rec1, rec2, rec3 = [mocker.MagicMock(id=i) for i in range(1, 4)]
+        mockQuery.all.side_effect = [[rec1, rec2], [rec3], []]
+
+        clusterMocks['find_record_components'].side_effect = [
+            [([rec1], [1, 3, 5]), ([rec2], [2])],
+            []
+        ]
+        work1 = mocker.MagicMock(id=1)
+        clusterMocks['cluster_component'].side_effect = [
+            (work1, ['uuid1']), ClusterError
+        ]
+
+        testInstance.cluster_records_in_batches()
+
+        assert mockQuery.all.call_count == 3
+        clusterMocks['find_record_components'].assert_has_calls([
+            mocker.call([rec1, rec2]), mocker.call([])
+        ])
+        clusterMocks['cluster_component'].assert_has_calls([
+            mocker.call([1, 3, 5], [rec1]), mocker.call([2], [rec2])
+        ])
+        clusterMocks['update_cluster_status'].assert_called_once_with([2])
+        clusterMocks['update_elastic_search'].assert_called_once_with([work1], set(['uuid1']))
+        clusterMocks['delete_stale_works'].assert_called_once_with(set(['uuid1']))
+
+    def test_cluster_records_in_batches_shard_deferred(self, testInstance: ClusterProcess, mocker):
+        clusterMocks = mocker.patch.multiple(
+            ClusterProcess,
+            find_record_components=mocker.DEFAULT,
+            claim_component=mocker.DEFAULT,
+            get_still_unclustered_records=mocker.DEFAULT,
+            cluster_component=mocker.DEFAULT,
+            update_elastic_search=mocker.DEFAULT,
+            delete_stale_works=mocker.DEFAULT
+        )
+        mockSleep = mocker.patch('processes.cluster.time.sleep')
+
+        mockQuery = mocker.MagicMock()
+        testInstance.db_manager.session.query().filter.return_value = mockQuery
+        mockQuery.order_by.return_value = mockQuery
+        mockQuery.filter.return_value = mockQuery
+        mockQuery.limit.return_value = mockQuery
+
+        rec1, rec2 = [mocker.MagicMock(id=i) for i in range(1, 3)]
+        mockQuery.all.side_effect = [[rec1, rec2], [], [rec2], []]
+
+        clusterMocks['find_record_components'].side_effect = [
+            [([rec1], [1, 3]), ([rec2], [2, 3])],
+            [([rec2], [2, 3])]
+        ]
+        clusterMocks['claim_component'].side_effect = [True, False, True]
+        clusterMocks['get_still_unclustered_records'].side_effect = lambda records: records
+        work1, work2 = mocker.MagicMock(id=1), mocker.MagicMock(id=2)
+        clusterMocks['cluster_component'].side_effect = [(work1, []), (work2, [])]
+
+        testInstance.cluster_records_in_batches(shard=(0, 2))
+
+        clusterMocks['claim_component'].assert_has_calls([
+            mocker.call([1, 3]), mocker.call([2, 3]), mocker.call([2, 3])
+        ])
+        clusterMocks['cluster_component'].assert_has_calls([
+            mocker.call([1, 3], [rec1]), mocker.call([2, 3], [rec2])
+        ])
+        mockSleep.assert_called_once_with(ClusterProcess.CLAIM_RETRY_SECONDS)
+        clusterMocks['update_elastic_search'].assert_called_once_with([work1, work2], set())
+
+    def test_cluster_records_in_batches_shard_already_clustered(self, testInstance: ClusterProcess, mocker):
+        clusterMocks = mocker.patch.multiple(
+            ClusterProcess,
+            find_record_components=mocker.DEFAULT,
+            claim_component=mocker.DEFAULT,
+            get_still_unclustered_records=mocker.DEFAULT,
+            cluster_component=mocker.DEFAULT,
+            update_elastic_search=mocker.DEFAULT,
+            delete_stale_works=mocker.DEFAULT
+        )
+
+        mockQuery = mocker.MagicMock()
+        testInstance.db_manager.session.query().filter.return_value = mockQuery
+        mockQuery.order_by.return_value = mockQuery
+        mockQuery.filter.return_value = mockQuery
+        mockQuery.limit.return_value = mockQuery
+
+        rec1 = mocker.MagicMock(id=1)
+        mockQuery.all.side_effect = [[rec1], []]
+
+        clusterMocks['find_record_components'].return_value = [([rec1], [1, 3])]
+        clusterMocks['claim_component'].return_value = True
+        clusterMocks['get_still_unclustered_records'].return_value = []
+
+        testInstance.cluster_records_in_batches(shard=(1, 2))
+
+        clusterMocks['cluster_component'].assert_not_called()
+        clusterMocks['update_elastic_search'].assert_called_once_with([], set())
+
+    def test_claim_component(self, testInstance: ClusterProcess, mocker):
+        testInstance.db_manager.try_advisory_xact_locks.return_value = True
+        mockUUIDQuery = mocker.MagicMock()
+        mockUUIDQuery.filter.return_value = [(mocker.MagicMock(hex='uuid1'),)]
+        mockWorkQuery = mocker.MagicMock()
+        mockWorkQuery.filter().distinct.return_value = [(10,), (None,)]
+        testInstance.db_manager.session.query.side_effect = [mockUUIDQuery, mockWorkQuery]
+
+        assert testInstance.claim_component([1, 2]) is True
+
+        testInstance.db_manager.try_advisory_xact_locks.assert_has_calls([
+            mocker.call(ClusterProcess.RECORD_LOCK_NAMESPACE, [1, 2]),
+            mocker.call(ClusterProcess.WORK_LOCK_NAMESPACE, [10])
+        ])
+
+    def test_claim_component_records_locked(self, testInstance: ClusterProcess):
+        testInstance.db_manager.try_advisory_xact_locks.return_value = False
+
+        assert testInstance.claim_component([1, 2]) is False
+
+        testInstance.db_manager.try_advisory_xact_locks.assert_called_once_with(
+            ClusterProcess.RECORD_LOCK_NAMESPACE, [1, 2]
+        )
+
+    def test_find_record_components(self, testInstance: ClusterProcess, mocker):
+        mockGraphManager = mocker.patch('processes.cluster.IdentifierGraphManager')
+        mockGraphManager.return_value.get_matched_record_ids_by_seed.return_value = {
+            1: set([1, 5]),
+            2: set([2, 5, 6]),
+            4: set([4])
+        }
+
+        rec1 = mocker.MagicMock(id=1, title='Test Title')
+        rec2 = mocker.MagicMock(id=2, title='Test Title')
+        rec4 = mocker.MagicMock(id=4, title='Other Book')
+
+        components = testInstance.find_record_components([rec1, rec2, rec4])
+
+        mockGraphManager.assert_called_once_with(testInstance.db_manager.session, 4)
+        mockGraphManager.return_value.get_matched_record_ids_by_seed.assert_called_once_with(
+            [1, 2, 4], limit=testInstance.CLUSTER_SIZE_LIMIT + 1
+        )
+        assert sorted((sorted(r.id for r in seeds), sorted(ids)) for seeds, ids in components) == [
+            ([1, 2], [1, 2, 5, 6]),
+            ([4], [4])
+        ]
+
     def test_cluster_record_w_matching_records(self, testInstance: ClusterProcess, testRecord, mocker):
         clusterMocks = mocker.patch.multiple(
             ClusterProcess,
@@ -238,6 +456,8 @@ class TestClusterProcess:
         mockMLModel.parseEditions.return_value = ['ed1', 'ed2']
         mockKManager = mocker.patch('processes.cluster.KMeansManager')
         mockKManager.return_value = mockMLModel
+        mockGrouper = mocker.patch('processes.cluster.EditionGrouper')
+        mockGrouper.return_value.group_editions.return_value = None
 
         testInstance.db_manager.session.query().filter().all.return_value = ['rec1', 'rec2', 'rec3']
         testEditions, testRecords = testInstance.cluster_matched_records([1, 2, 3]) 
@@ -251,6 +471,19 @@ class TestClusterProcess:
         mockMLModel.generateClusters.assert_called_once
         mockMLModel.parseEditions.assert_called_once
 
+    def test_cluster_matched_records_small_cluster(self, testInstance: ClusterProcess, mocker):
+        mockKManager = mocker.patch('processes.cluster.KMeansManager')
+        mockGrouper = mocker.patch('processes.cluster.EditionGrouper')
+        mockGrouper.return_value.group_editions.return_value = [('1900', ['uuid1', 'uuid2'])]
+
+        testInstance.db_manager.session.query().filter().all.return_value = ['rec1', 'rec2']
+        testEditions, testRecords = testInstance.cluster_matched_records([1, 2])
+
+        assert testEditions == [('1900', ['uuid1', 'uuid2'])]
+        assert testRecords == ['rec1', 'rec2']
+        mockGrouper.assert_called_once_with(['rec1', 'rec2'])
+        mockKManager.assert_not_called()
+
     def test_create_work_from_editions(self, testInstance: ClusterProcess, mocker):
         mockRecManager = mocker.MagicMock()
         mockRecManager.buildWork.return_value = 'testWorkData'
@@ -268,48 +501,30 @@ class TestClusterProcess:
         mockRecManager.mergeRecords.assert_called_once()
 
     def test_find_all_matching_records_success(self, testInstance, testRecord, mocker):
-        mockGetBatches = mocker.patch.object(ClusterProcess, 'get_matched_records')
-        mockGetBatches.side_effect = [
-            [('title1', 1, ['1|isbn']), ('title2', 2, ['2|oclc', '3|other'])],
-            [('title3', 3, ['4|oclc'])],
-            [('title4', 4, ['5|oclc'])],
-            []
-        ]
-
-        mockCompareTitles = mocker.patch.object(ClusterProcess, 'titles_overlap')
-        mockCompareTitles.return_value = False
+        mockGraphManager = mocker.patch('processes.cluster.IdentifierGraphManager')
+        mockGraphManager.return_value.get_matched_record_ids.return_value = [1, 2]
 
         testIDs = testInstance.find_all_matching_records(testRecord)
 
         assert testIDs == [1, 2]
-        assert mockGetBatches.call_count == 4
+        mockGraphManager.assert_called_once_with(testInstance.db_manager.session, 4)
+        mockGraphManager.return_value.get_matched_record_ids.assert_called_once_with(1, limit=10001)
 
     def test_find_all_matching_records_exceed_cluster_threshold(self, testInstance, testRecord, mocker):
-        mockGetBatch = mocker.patch.object(ClusterProcess, 'get_matched_records')
-        mockGetBatch.side_effect = [
-            [('title{}'.format(i), i, ['{}|test'.format(i)]) for i in range(10001)],
-            []
-        ]
+        mockGraphManager = mocker.patch('processes.cluster.IdentifierGraphManager')
+        mockGraphManager.return_value.get_matched_record_ids.return_value = list(range(10001))
 
-        with pytest.raises(Exception):
+        with pytest.raises(ClusterError):
             testInstance.find_all_matching_records(testRecord)
 
-    def test_get_matched_records(self, testInstance: ClusterProcess, mocker):
-        mockFormatArray = mocker.patch.object(ClusterProcess, 'format_identifiers')
-        mockFormatArray.return_value = 'testIdentifierArray'
-
-        testInstance.db_manager.session.query().filter().filter().filter().all.side_effect = [[1], [2, 3]]
+    def test_find_all_matching_records_missing_title(self, testInstance, testRecord, mocker):
+        mockGraphManager = mocker.patch('processes.cluster.IdentifierGraphManager')
+        testRecord.title = None
 
-        testMatches = testInstance.get_matched_records([str(i) for i in range(103)], set([]))
-
-        assert testMatches == [1, 2, 3]
-        testInstance.db_manager.session.query().filter.call_args[0][0].compare(~Record.id.in_([]))
-
-        testInstance.db_manager.session.query().filter().filter.call_args[0][0].compare(Record.identifiers.overlap('testIdentifierArray'))
+        with pytest.raises(ClusterError):
+            testInstance.find_all_matching_records(testRecord)
 
-    def test_format_identifiers(self, testInstance):
-        assert testInstance.format_identifiers(['{test}|test', 'multi,test|test'])\
-            == '{"{test}|test","multi,test|test"}'
+        mockGraphManager.assert_not_called()
 
     def test_tokenize_title_success(self, testInstance):
         assert testInstance.tokenize_title('A Test Title') == set(['test', 'title'])
@@ -317,3 +532,46 @@ class TestClusterProcess:
     def test_tokenize_title_error(self, testInstance):
         with pytest.raises(ClusterError):
             testInstance.tokenize_title(None)
+
+    def test_requeue_dead_letter_works(self, testInstance, mocker):
+        mockLogger = mocker.patch('processes.cluster.logger')
+        mockRequeue = mocker.patch('processes.cluster.SFRRecordManager.requeueWorks')
+        testInstance.elastic_search_manager.drain_dead_letter_works.return_value = ['uuid1', 'uuid2']
+
+        testInstance.requeue_dead_letter_works()
+
+        mockLogger.error.assert_called_once_with(
+            'Unable to index 2 works in ElasticSearch, re-queueing works: uuid1, uuid2'
+        )
+        mockRequeue.assert_called_once_with(testInstance.db_manager.session, ['uuid1', 'uuid2'])
+        testInstance.db_manager.session.commit.assert_called_once()
+
+    def test_requeue_dead_letter_works_none_failed(self, testInstance, mocker):
+        mockLogger = mocker.patch('processes.cluster.logger')
+        mockRequeue = mocker.patch('processes.cluster.SFRRecordManager.requeueWorks')
+
+        testInstance.requeue_dead_letter_works()
+
+        mockLogger.error.assert_not_called()
+        mockRequeue.assert_not_called()
+
+    def test_index_works_in_elastic_search(self, testInstance, mocker):
+        mockRecordManager = mocker.patch('processes.cluster.SFRElasticRecordManager')
+        mockRecordManager.side_effect = lambda work: mocker.MagicMock(work='{}Doc'.format(work))
+        mockRecordManager.detectLanguages.return_value = True
+        testInstance.elastic_search_manager.get_changed_works.return_value = ['work2Doc']
+
+        testInstance.index_works_in_elastic_search(['work1', 'work2'])
+
+        testInstance.elastic_search_manager.get_changed_works.assert_called_once_with(['work1Doc', 'work2Doc'])
+        mockRecordManager.detectLanguages.assert_called_once_with(['work2Doc'])
+        testInstance.elastic_search_manager.save_work_records.assert_called_once_with(['work2Doc'], pipeline=None)
+
+    def test_index_works_in_elastic_search_unchanged(self, testInstance, mocker):
+        mockRecordManager = mocker.patch('processes.cluster.SFRElasticRecordManager')
+        testInstance.elastic_search_manager.get_changed_works.return_value = []
+
+        testInstance.index_works_in_elastic_search(['work1'])
+
+        mockRecordManager.detectLanguages.assert_not_called()
+        testInstance.elastic_search_manager.save_work_records.assert_not_called()
@@ -0,0 +1,157 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from model import Record
+from processes.record_buffer import (
+    COUNT_UNCHANGED_STAGED_RECORDS,
+    INSERT_STAGED_RECORDS,
+    RecordBuffer,
+    STAGED_RECORDS,
+    UPDATE_STAGED_RECORDS,
+)
+
+
+class TestRecordBuffer:
+    @pytest.fixture
+    def test_instance(self, mocker):
+        return RecordBuffer(db_manager=mocker.MagicMock(), batch_size=2, upsert=True)
+
+    @staticmethod
+    def create_record(source_id, source='test_source', title='Test Title'):
+        return Record(
+            uuid='a4a9d4c2-1a5b-4f86-9b0a-7d9a2c9c1f10',
+            frbr_status='to_do',
+            cluster_status=False,
+            source=source,
+            source_id=source_id,
+            title=title,
+            identifiers=[f'{source_id}|test'],
+            has_version='1st edition'
+        )
+
+    def test_add_upsert_stages_records(self, test_instance, mocker):
+        mock_flush = mocker.patch.object(RecordBuffer, 'flush')
+        first_record = self.create_record('1')
+        updated_record = self.create_record('1', title='Updated Title')
+
+        test_instance.add(first_record)
+        test_instance.add(updated_record)
+
+        assert test_instance.staged_records == { ('1', 'test_source'): updated_record }
+        test_instance.db_manager.session.query.assert_not_called()
+        mock_flush.assert_not_called()
+
+    def test_add_upsert_flushes_full_batch(self, test_instance, mocker):
+        mock_flush = mocker.patch.object(RecordBuffer, 'flush')
+
+        test_instance.add(self.create_record('1'))
+        test_instance.add(self.create_record('2'))
+
+        mock_flush.assert_called_once()
+
+    def test_add_sets_content_hash(self, test_instance, mocker):
+        mocker.patch.object(RecordBuffer, 'flush')
+        record = self.create_record('1')
+
+        test_instance.add(record)
+
+        assert record.content_hash == self.create_record('1').generate_content_hash()
+
+    def test_add_skips_unchanged_record(self, mocker):
+        test_instance = RecordBuffer(db_manager=mocker.MagicMock())
+        existing_record = self.create_record('1')
+        existing_record.content_hash = existing_record.generate_content_hash()
+        test_instance.db_manager.session.query.return_value.filter.return_value.first.return_value = existing_record
+        mock_update = mocker.patch.object(RecordBuffer, '_update_record')
+
+        test_instance.add(self.create_record('1'))
+
+        mock_update.assert_not_called()
+        assert test_instance.records == set()
+        assert test_instance.unchanged_count == 1
+
+    def test_add_updates_changed_record(self, mocker):
+        test_instance = RecordBuffer(db_manager=mocker.MagicMock())
+        existing_record = self.create_record('1')
+        existing_record.content_hash = existing_record.generate_content_hash()
+        test_instance.db_manager.session.query.return_value.filter.return_value.first.return_value = existing_record
+        updated_record = self.create_record('1', title='Updated Title')
+
+        test_instance.add(updated_record)
+
+        assert test_instance.records == {existing_record}
+        assert existing_record.title == 'Updated Title'
+        assert existing_record.content_hash == updated_record.content_hash
+        assert test_instance.unchanged_count == 0
+
+    def test_flush_upsert(self, test_instance, mocker):
+        mock_session = test_instance.db_manager.session
+        mock_count_result = mocker.MagicMock()
+        mock_count_result.scalar.return_value = 2
+        mock_session.execute.side_effect = [
+            mocker.MagicMock(),
+            mocker.MagicMock(),
+            mock_count_result,
+            mocker.MagicMock(rowcount=1),
+            mocker.MagicMock(rowcount=2)
+        ]
+        test_instance.staged_records = {
+            (source_id, 'test_source'): self.create_record(source_id) for source_id in ['1', '2', '3', '4', '5']
+        }
+
+        test_instance.flush()
+
+        assert test_instance.inserted_count == 2
+        assert test_instance.updated_count == 1
+        assert test_instance.unchanged_count == 2
+        assert test_instance.ingest_count == 3
+        assert test_instance.staged_records == {}
+        assert mock_session.execute.call_count == 5
+        assert len(mock_session.execute.call_args_list[1][0][1]) == 5
+        mock_session.commit.assert_called_once()
+        test_instance.db_manager.bulk_save_objects.assert_not_called()
+
+    def test_flush_upsert_error(self, test_instance, mocker):
+        mock_session = test_instance.db_manager.session
+        mock_session.execute.side_effect = Exception('test failure')
+        test_instance.staged_records = { ('1', 'test_source'): self.create_record('1') }
+
+        with pytest.raises(Exception):
+            test_instance.flush()
+
+        mock_session.rollback.assert_called_once()
+        assert test_instance.ingest_count == 0
+
+    def test_flush_upsert_empty(self, test_instance):
+        test_instance.flush()
+
+        test_instance.db_manager.session.execute.assert_not_called()
+
+    def test_flush_without_upsert(self, mocker):
+        test_instance = RecordBuffer(db_manager=mocker.MagicMock())
+        test_instance.records = {'record_1', 'record_2'}
+
+        test_instance.flush()
+
+        test_instance.db_manager.bulk_save_objects.assert_called_once()
+        assert test_instance.ingest_count == 2
+
+    def test_get_staged_record_row(self, test_instance):
+        staged_row = test_instance._get_staged_record_row(self.create_record('1'))
+
+        assert staged_row['source_id'] == '1'
+        assert staged_row['has_version'] == '1st edition|1'
+        assert staged_row['frbr_status'] == 'to_do'
+        assert 'id' not in staged_row
+        assert 'date_modified' not in staged_row
+
+    def test_staged_record_queries(self):
+        assert 'records.content_hash IS DISTINCT FROM staged.content_hash' in UPDATE_STAGED_RECORDS
+        assert 'existing.content_hash = staged_records.content_hash' in COUNT_UNCHANGED_STAGED_RECORDS
+        assert "WHEN records.source IN ('oclcClassify', 'oclcCatalog') THEN staged.frbr_status" in UPDATE_STAGED_RECORDS
+        assert 'COALESCE(staged_records.cluster_status, FALSE)' in INSERT_STAGED_RECORDS
+        assert 'uuid' not in UPDATE_STAGED_RECORDS.split('FROM (')[0]
+
+        compiled_insert = str(STAGED_RECORDS.insert().compile(dialect=postgresql.dialect()))
+
+        assert compiled_insert.startswith('INSERT INTO staged_records (uuid, frbr_status, cluster_status')
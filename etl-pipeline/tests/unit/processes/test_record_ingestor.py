@@ -0,0 +1,160 @@
+import pytest
+
+from processes import record_ingestor
+from processes.record_ingestor import RecordIngestor
+from processes.utils import ProcessParams
+
+
+class TestRecordIngestor:
+    @pytest.fixture
+    def test_instance(self, mocker):
+        mocker.patch.dict('os.environ', { 'RECORD_INGEST_WORKERS': '2', 'RECORD_INGEST_BATCH_SIZE': '2' })
+
+        return RecordIngestor(source_service=mocker.MagicMock(), source='test_source')
+
+    @pytest.fixture
+    def mock_worker(self, mocker):
+        mock_worker = mocker.MagicMock()
+        mock_worker.rabbitmq_manager.queue_name = 'testQueue'
+        mock_worker.rabbitmq_manager.routing_key = 'testKey'
+        mocker.patch.object(record_ingestor, 'ingest_worker', mock_worker)
+
+        return mock_worker
+
+    @staticmethod
+    def create_record(mocker, source_id):
+        return mocker.MagicMock(source_id=source_id, source='test_source')
+
+    def test_initializer(self, test_instance):
+        assert test_instance.worker_count == 2
+        assert test_instance.batch_size == 2
+
+    def test_ingest(self, test_instance, mocker):
+        test_instance.source_service.get_records.return_value = iter(['record_1', 'record_2', 'record_3'])
+        mock_pool = mocker.patch('processes.record_ingestor.Pool')
+        mock_pool.return_value.__enter__.return_value.imap_unordered.side_effect = lambda ingest, batches: [
+            [('record_1', RecordIngestor.INGESTED), ('record_2', RecordIngestor.FAILED)],
+            [('record_3', RecordIngestor.INGESTED), ('record_4', RecordIngestor.UNCHANGED)]
+        ]
+
+        assert test_instance.ingest(ProcessParams(process_type='complete')) == 2
+
+        mock_pool.assert_called_once_with(processes=2, initializer=RecordIngestor._initialize_worker)
+
+    def test_batch_records(self, test_instance):
+        assert list(test_instance._batch_records(iter(['record_1', 'record_2', 'record_3']))) == [
+            ['record_1', 'record_2'], ['record_3']
+        ]
+
+    def test_initialize_worker(self, mocker):
+        mock_worker = mocker.patch('processes.record_ingestor.RecordIngestorWorker')
+        mock_finalize = mocker.patch('processes.record_ingestor.Finalize')
+
+        RecordIngestor._initialize_worker()
+
+        assert record_ingestor.ingest_worker == mock_worker.return_value
+        mock_finalize.assert_called_once_with(mock_worker.return_value, mock_worker.return_value.close, exitpriority=10)
+
+    def test_ingest_records(self, mock_worker, mocker):
+        records = [self.create_record(mocker, 'record_1'), self.create_record(mocker, 'record_2')]
+        mock_worker.s3_manager.store_pdf_manifest.side_effect = [None, Exception('test failure')]
+        mocker.patch.object(RecordIngestor, '_get_existing_records', return_value={})
+        mock_save_batch = mocker.patch.object(RecordIngestor, '_save_record_batch')
+
+        assert RecordIngestor._ingest_records(records) == [
+            ('record_2', RecordIngestor.FAILED), ('record_1', RecordIngestor.INGESTED)
+        ]
+
+        mock_save_batch.assert_called_once_with(records=[records[0]])
+        mock_worker.rabbitmq_manager.send_message_to_queue.assert_called_once_with(
+            queue_name='testQueue',
+            routing_key='testKey',
+            message='{"sourceId": "record_1", "source": "test_source"}'
+        )
+
+    def test_ingest_records_skips_unchanged_records(self, mock_worker, mocker):
+        records = [
+            self.create_record(mocker, 'record_1'),
+            self.create_record(mocker, 'record_2'),
+            self.create_record(mocker, 'record_3')
+        ]
+        for record in records:
+            record.generate_content_hash.return_value = f'{record.source_id}_hash'
+        mocker.patch.object(RecordIngestor, '_get_existing_records', return_value={
+            ('record_1', 'test_source'): ('record_1_hash', 'complete'),
+            ('record_2', 'test_source'): ('record_2_hash', 'to_do'),
+            ('record_3', 'test_source'): ('stale_hash', 'complete')
+        })
+        mock_save_batch = mocker.patch.object(RecordIngestor, '_save_record_batch')
+
+        assert RecordIngestor._ingest_records(records) == [
+            ('record_1', RecordIngestor.UNCHANGED),
+            ('record_2', RecordIngestor.UNCHANGED),
+            ('record_3', RecordIngestor.INGESTED)
+        ]
+
+        mock_worker.s3_manager.store_pdf_manifest.assert_called_once_with(record=records[2], bucket_name=mock_worker.file_bucket)
+        mock_save_batch.assert_called_once_with(records=[records[2]])
+        assert mock_worker.rabbitmq_manager.send_message_to_queue.call_args_list == [
+            mocker.call(queue_name='testQueue', routing_key='testKey', message='{"sourceId": "record_2", "source": "test_source"}'),
+            mocker.call(queue_name='testQueue', routing_key='testKey', message='{"sourceId": "record_3", "source": "test_source"}')
+        ]
+
+    def test_get_existing_records(self, mock_worker, mocker):
+        mock_session = mock_worker.db_manager.session
+        mock_session.query.return_value.filter.return_value.all.return_value = [
+            ('record_1', 'test_source', 'record_1_hash', 'complete')
+        ]
+
+        assert RecordIngestor._get_existing_records([self.create_record(mocker, 'record_1')]) == {
+            ('record_1', 'test_source'): ('record_1_hash', 'complete')
+        }
+        mock_session.close.assert_called_once()
+
+    def test_save_records_falls_back_to_individual_saves(self, mock_worker, mocker):
+        records = [self.create_record(mocker, 'record_1'), self.create_record(mocker, 'record_2')]
+        mock_save_batch = mocker.patch.object(RecordIngestor, '_save_record_batch')
+        mock_save_batch.side_effect = [Exception('batch failure'), None, Exception('record failure')]
+
+        assert RecordIngestor._save_records(records) == [
+            (('record_1', 'test_source'), True),
+            (('record_2', 'test_source'), False)
+        ]
+
+        mock_save_batch.assert_has_calls([
+            mocker.call(records=records),
+            mocker.call(records=[records[0]]),
+            mocker.call(records=[records[1]])
+        ])
+
+    def test_save_record_batch(self, mock_worker, mocker):
+        existing_record = self.create_record(mocker, 'record_1')
+        new_record = self.create_record(mocker, 'record_2')
+        updated_record = self.create_record(mocker, 'record_1')
+        mock_session = mock_worker.db_manager.session
+        mock_session.query.return_value.filter.return_value.all.return_value = [existing_record]
+        mock_update = mocker.patch.object(RecordIngestor, '_update_record')
+
+        RecordIngestor._save_record_batch([updated_record, new_record])
+
+        mock_worker.db_manager.create_session.assert_called_once()
+        mock_update.assert_called_once_with(updated_record, existing_record)
+        mock_session.add.assert_called_once_with(new_record)
+        mock_session.commit.assert_called_once()
+        mock_session.close.assert_called_once()
+
+    def test_save_record_batch_error(self, mock_worker, mocker):
+        mock_session = mock_worker.db_manager.session
+        mock_session.query.return_value.filter.return_value.all.return_value = []
+        mock_session.commit.side_effect = Exception('test failure')
+
+        with pytest.raises(Exception):
+            RecordIngestor._save_record_batch([self.create_record(mocker, 'record_1')])
+
+        mock_session.rollback.assert_called_once()
+        mock_session.close.assert_called_once()
+
+    def test_send_record_pipeline_message_error(self, mock_worker):
+        mock_worker.rabbitmq_manager.send_message_to_queue.side_effect = Exception('test failure')
+
+        assert RecordIngestor._send_record_pipeline_message('record_1', 'test_source') is False
@@ -36,6 +36,10 @@ def test_get_start_datetime(process_type: str, ingest_period: Optional[str], exp
         offset=5000,
         source='hathitrust'
     )),
+    (('complete', None, None, None, None, None, None, ['batch']), utils.ProcessParams(
+        process_type='complete',
+        options=['batch']
+    )),
 ])
 def test_parse_process_args(args, expected_params: utils.ProcessParams):
     params = utils.parse_process_args(*args)
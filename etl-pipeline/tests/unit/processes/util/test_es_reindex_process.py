@@ -0,0 +1,250 @@
+from datetime import datetime
+import pytest
+
+from processes.util.es_reindex import ElasticsearchReindexProcess, ReindexError
+from processes.utils import ProcessParams
+
+
+class TestElasticsearchReindexProcess:
+    @pytest.fixture
+    def test_instance(self, mocker):
+        class TestElasticsearchReindexProcess(ElasticsearchReindexProcess):
+            def __init__(self):
+                self.process_args = ()
+                self.params = ProcessParams()
+                self.worker_count = 2
+                self.batch_size = 2
+                self.db_manager = mocker.MagicMock()
+                self.elastic_search_manager = mocker.MagicMock(index='testIndex')
+                self.redis_manager = mocker.MagicMock()
+                self.state_key = 'test/es-reindex/testIndex'
+
+        return TestElasticsearchReindexProcess()
+
+    def test_runProcess(self, test_instance, mocker):
+        process_mocks = mocker.patch.multiple(
+            ElasticsearchReindexProcess,
+            get_or_create_reindex=mocker.DEFAULT,
+            reindex_works_in_parallel=mocker.DEFAULT,
+            reindex_works=mocker.DEFAULT,
+            reindex_failed_works=mocker.DEFAULT,
+            delete_orphaned_works=mocker.DEFAULT,
+            swap_index=mocker.DEFAULT,
+            clear_reindex_state=mocker.DEFAULT
+        )
+        process_mocks['get_or_create_reindex'].return_value = ('testIndex-1', datetime(2024, 1, 1), 2)
+
+        test_instance.runProcess()
+
+        process_mocks['reindex_works_in_parallel'].assert_called_once_with('testIndex-1', 2)
+        process_mocks['reindex_works'].assert_called_once_with('testIndex-1', mocker.ANY)
+        process_mocks['reindex_failed_works'].assert_called_once_with('testIndex-1')
+        process_mocks['delete_orphaned_works'].assert_called_once_with('testIndex-1')
+        process_mocks['swap_index'].assert_called_once_with('testIndex-1')
+        process_mocks['clear_reindex_state'].assert_called_once()
+        test_instance.db_manager.close_connection.assert_called_once()
+
+    def test_runProcess_failure_keeps_state(self, test_instance, mocker):
+        process_mocks = mocker.patch.multiple(
+            ElasticsearchReindexProcess,
+            get_or_create_reindex=mocker.DEFAULT,
+            reindex_works_in_parallel=mocker.DEFAULT,
+            clear_reindex_state=mocker.DEFAULT
+        )
+        process_mocks['get_or_create_reindex'].return_value = ('testIndex-1', datetime(2024, 1, 1), 2)
+        process_mocks['reindex_works_in_parallel'].side_effect = ReindexError('test failure')
+
+        with pytest.raises(ReindexError):
+            test_instance.runProcess()
+
+        process_mocks['clear_reindex_state'].assert_not_called()
+        test_instance.db_manager.close_connection.assert_called_once()
+
+    def test_get_or_create_reindex_new(self, test_instance, mocker):
+        test_instance.redis_manager.client.hgetall.return_value = {}
+
+        index_name, started_at, worker_count = test_instance.get_or_create_reindex()
+
+        assert index_name == 'testIndex-{}'.format(started_at.strftime('%Y%m%d%H%M%S'))
+        assert worker_count == 2
+        test_instance.elastic_search_manager.create_versioned_index.assert_called_once_with(index_name)
+        test_instance.redis_manager.client.hset.assert_called_once_with(
+            'test/es-reindex/testIndex',
+            mapping={'index': index_name, 'started_at': started_at.isoformat(), 'workers': 2}
+        )
+
+    def test_get_or_create_reindex_resume(self, test_instance):
+        test_instance.redis_manager.client.hgetall.return_value = {
+            b'index': b'testIndex-1', b'started_at': b'2024-01-01T00:00:00', b'workers': b'4'
+        }
+        test_instance.elastic_search_manager.client.indices.exists.return_value = True
+
+        assert test_instance.get_or_create_reindex() == ('testIndex-1', datetime(2024, 1, 1), 4)
+
+        test_instance.elastic_search_manager.create_versioned_index.assert_not_called()
+        test_instance.redis_manager.client.delete.assert_not_called()
+
+    def test_get_or_create_reindex_restart(self, test_instance):
+        test_instance.params.options = ['restart']
+        test_instance.redis_manager.client.hgetall.return_value = {
+            b'index': b'testIndex-1', b'started_at': b'2024-01-01T00:00:00', b'workers': b'4'
+        }
+
+        index_name, _, worker_count = test_instance.get_or_create_reindex()
+
+        assert index_name != 'testIndex-1'
+        assert worker_count == 2
+        test_instance.elastic_search_manager.client.indices.delete.assert_called_once_with(
+            index='testIndex-1', ignore=[404]
+        )
+        test_instance.redis_manager.client.delete.assert_called_once()
+        test_instance.elastic_search_manager.create_versioned_index.assert_called_once_with(index_name)
+
+    def test_reindex_works_in_parallel_failed_worker(self, test_instance, mocker):
+        mock_process = mocker.patch('processes.util.es_reindex.Process')
+        mock_process.return_value.is_alive.return_value = False
+        mock_process.return_value.exitcode = 1
+        test_instance.redis_manager.client.get.return_value = None
+
+        with pytest.raises(ReindexError):
+            test_instance.reindex_works_in_parallel('testIndex-1', 2)
+
+        mock_process.assert_has_calls([
+            mocker.call(
+                target=ElasticsearchReindexProcess.run_reindex_worker,
+                args=((), 'testIndex-1', (0, 2))
+            ),
+            mocker.call(
+                target=ElasticsearchReindexProcess.run_reindex_worker,
+                args=((), 'testIndex-1', (1, 2))
+            )
+        ], any_order=True)
+
+    def test_reindex_slice_resumes_from_checkpoint(self, test_instance, mocker):
+        mock_reindex = mocker.patch.object(ElasticsearchReindexProcess, 'reindex_works')
+        test_instance.redis_manager.client.hget.return_value = b'42'
+
+        test_instance.reindex_slice('testIndex-1', (1, 2))
+
+        test_instance.redis_manager.client.hget.assert_called_once_with('test/es-reindex/testIndex/checkpoints', 1)
+        mock_reindex.assert_called_once_with('testIndex-1', mocker.ANY, last_work_id=42, worker_index=1)
+
+    def test_reindex_works(self, test_instance, mocker):
+        mock_index = mocker.patch.object(ElasticsearchReindexProcess, 'index_works')
+        mock_index.side_effect = [[], ['uuid3']]
+
+        test_works = [mocker.MagicMock(id=i, uuid='uuid{}'.format(i)) for i in range(1, 4)]
+        mock_query = test_instance.db_manager.session.query.return_value.filter.return_value.options.return_value.order_by.return_value
+        mock_query.filter.return_value.limit.return_value.all.side_effect = [test_works[:2], test_works[2:], []]
+        mock_pipe = test_instance.redis_manager.client.pipeline.return_value
+
+        test_instance.reindex_works('testIndex-1', 'testFilter', last_work_id=0, worker_index=1)
+
+        assert mock_index.call_count == 2
+        mock_pipe.hset.assert_has_calls([
+            mocker.call('test/es-reindex/testIndex/checkpoints', 1, 2),
+            mocker.call('test/es-reindex/testIndex/checkpoints', 1, 3)
+        ])
+        mock_pipe.incrby.assert_has_calls([
+            mocker.call('test/es-reindex/testIndex/indexed', 2),
+            mocker.call('test/es-reindex/testIndex/indexed', 0)
+        ])
+        mock_pipe.sadd.assert_called_once_with('test/es-reindex/testIndex/failed', 'uuid3')
+        mock_pipe.srem.assert_called_once_with('test/es-reindex/testIndex/failed', mocker.ANY, mocker.ANY)
+        assert set(mock_pipe.srem.call_args[0][1:]) == {'uuid1', 'uuid2'}
+        assert test_instance.db_manager.session.rollback.call_count == 2
+
+    def test_reindex_failed_works_none(self, test_instance, mocker):
+        mock_reindex = mocker.patch.object(ElasticsearchReindexProcess, 'reindex_works')
+        test_instance.redis_manager.client.smembers.return_value = set()
+
+        test_instance.reindex_failed_works('testIndex-1')
+
+        mock_reindex.assert_not_called()
+
+    def test_reindex_failed_works(self, test_instance, mocker):
+        mock_reindex = mocker.patch.object(ElasticsearchReindexProcess, 'reindex_works')
+        test_instance.redis_manager.client.smembers.return_value = {b'uuid1', b'uuid2'}
+        test_instance.db_manager.session.query.return_value.filter.return_value = [('uuid1',)]
+        test_instance.redis_manager.client.scard.return_value = 0
+
+        test_instance.reindex_failed_works('testIndex-1')
+
+        test_instance.redis_manager.client.delete.assert_not_called()
+        test_instance.redis_manager.client.srem.assert_called_once_with('test/es-reindex/testIndex/failed', 'uuid2')
+        mock_reindex.assert_called_once_with('testIndex-1', mocker.ANY)
+
+    def test_reindex_failed_works_still_failing(self, test_instance, mocker):
+        mock_reindex = mocker.patch.object(ElasticsearchReindexProcess, 'reindex_works')
+        test_instance.redis_manager.client.smembers.return_value = {b'uuid1'}
+        test_instance.db_manager.session.query.return_value.filter.return_value = [('uuid1',)]
+        test_instance.redis_manager.client.scard.return_value = 1
+
+        with pytest.raises(ReindexError):
+            test_instance.reindex_failed_works('testIndex-1')
+
+        test_instance.redis_manager.client.delete.assert_not_called()
+        mock_reindex.assert_called_once_with('testIndex-1', mocker.ANY)
+
+    def test_delete_orphaned_works(self, test_instance, mocker):
+        mock_manager = mocker.patch('processes.util.es_reindex.ElasticsearchManager').return_value
+        mock_manager.scan_work_uuids.return_value = iter(['uuid1', 'uuid2', 'uuid3'])
+        mock_manager.delete_work_records.return_value = []
+        test_instance.db_manager.session.query.return_value.filter.side_effect = [[('uuid1',)], [('uuid3',)]]
+
+        test_instance.delete_orphaned_works('testIndex-1')
+
+        test_instance.elastic_search_manager.client.indices.refresh.assert_called_once_with(index='testIndex-1')
+        mock_manager.delete_work_records.assert_called_once_with(['uuid2'])
+
+    def test_delete_orphaned_works_none(self, test_instance, mocker):
+        mock_manager = mocker.patch('processes.util.es_reindex.ElasticsearchManager').return_value
+        mock_manager.scan_work_uuids.return_value = iter(['uuid1'])
+        test_instance.db_manager.session.query.return_value.filter.return_value = [('uuid1',)]
+
+        test_instance.delete_orphaned_works('testIndex-1')
+
+        mock_manager.delete_work_records.assert_not_called()
+
+    def test_delete_orphaned_works_error(self, test_instance, mocker):
+        mock_manager = mocker.patch('processes.util.es_reindex.ElasticsearchManager').return_value
+        mock_manager.scan_work_uuids.return_value = iter(['uuid1'])
+        mock_manager.delete_work_records.return_value = [{'delete': {'_id': 'uuid1', 'status': 503}}]
+        test_instance.db_manager.session.query.return_value.filter.return_value = []
+
+        with pytest.raises(ReindexError):
+            test_instance.delete_orphaned_works('testIndex-1')
+
+    def test_index_works(self, test_instance, mocker):
+        mock_record_manager = mocker.patch('processes.util.es_reindex.SFRElasticRecordManager')
+        mock_record_manager.detectLanguages.return_value = True
+        mock_manager = mocker.MagicMock()
+        mock_manager.get_changed_works.return_value = ['changedWork']
+        mock_manager.save_work_records.return_value = []
+
+        assert test_instance.index_works(mock_manager, ['work1', 'work2']) == []
+
+        mock_manager.get_changed_works.assert_called_once_with([mock_record_manager.return_value.work] * 2)
+        mock_record_manager.detectLanguages.assert_called_once_with(['changedWork'])
+        mock_manager.save_work_records.assert_called_once_with(['changedWork'], pipeline=None)
+
+    def test_swap_index(self, test_instance, mocker):
+        mocker.patch.dict('os.environ', {'ELASTICSEARCH_REPLICAS': '2'})
+        test_instance.params.options = ['delete_previous']
+        test_instance.elastic_search_manager.get_number_of_replicas.return_value = None
+        test_instance.elastic_search_manager.swap_alias.return_value = ['testIndex-0']
+
+        test_instance.swap_index('testIndex-1')
+
+        test_instance.elastic_search_manager.finalize_versioned_index.assert_called_once_with('testIndex-1', 2)
+        test_instance.elastic_search_manager.swap_alias.assert_called_once_with('testIndex-1')
+        test_instance.elastic_search_manager.client.indices.delete.assert_called_once_with(index='testIndex-0')
+
+    def test_swap_index_keeps_previous(self, test_instance):
+        test_instance.elastic_search_manager.get_number_of_replicas.return_value = 1
+        test_instance.elastic_search_manager.swap_alias.return_value = ['testIndex-0']
+
+        test_instance.swap_index('testIndex-1')
+
+        test_instance.elastic_search_manager.finalize_versioned_index.assert_called_once_with('testIndex-1', 1)
+        test_instance.elastic_search_manager.client.indices.delete.assert_not_called()
@@ -22,10 +22,20 @@ class TestFlaskAPI:
 
     def test_run_production(self, testInstance, mocker):
         os.environ['ENVIRONMENT'] = 'production'
-        mockServe = mocker.patch('api.app.serve')
+        mockServer = mocker.patch('api.app.APIServer')
 
         testInstance.run()
 
-        mockServe.assert_called_once_with(
-            testInstance.app, host='0.0.0.0', port=80
+        mockServer.assert_called_once_with(
+            testInstance.app, postFork=testInstance.postFork
         )
+        mockServer.return_value.run.assert_called_once()
+
+    def test_postFork(self, testInstance, mocker):
+        testInstance.app = mocker.MagicMock(config={'DB_CLIENT': 'parentEngine'})
+        mockManager = mocker.patch('api.app.DBManager')
+        mockManager.return_value.generate_engine.return_value = 'workerEngine'
+
+        testInstance.postFork()
+
+        assert testInstance.app.config['DB_CLIENT'] == 'workerEngine'
@@ -21,17 +21,23 @@ class TestCollectionBlueprint:
             validatePassword=mocker.DEFAULT
         )
 
+    @pytest.fixture
+    def mock_response_cache(self, mocker):
+        return mocker.patch('api.blueprints.drbCollection.ResponseCache')
+
     @pytest.fixture
     def test_app(self):
         flask_app = Flask('test')
         flask_app.config['DB_CLIENT'] = 'testDBClient'
+        flask_app.config['REDIS_CLIENT'] = 'testRedisClient'
 
         return flask_app
 
-    def test_collection_replace_success(self, test_app, mock_utils, mocker):
+    def test_collection_replace_success(self, test_app, mock_utils, mock_response_cache, mocker):
         mock_db = mocker.MagicMock(session=mocker.MagicMock())
         mock_db_client = mocker.patch('api.blueprints.drbCollection.DBClient')
         mock_db_client.return_value = mock_db
+        mock_db.fetchCollectionWorkIDs.side_effect = [set([1, 2]), set([2, 3])]
 
         mock_db.fetchUser.return_value = mocker.MagicMock(
             user='testUser', password='testPswd', salt='testSalt'
@@ -74,6 +80,8 @@ class TestCollectionBlueprint:
             assert mock_db.session.execute.call_count == 1
             mock_db.fetchSingleCollection.assert_called_once_with('testUUID')
             mock_db.session.commit.assert_called_once()
+            mock_response_cache.assert_called_once_with('testRedisClient')
+            mock_response_cache.return_value.invalidate_works.assert_called_once_with(set([1, 2, 3]))
 
             mock_feed_contstruct.assert_called_once_with(
                 collection, mock_db
@@ -134,10 +142,11 @@ class TestCollectionBlueprint:
             )
 
 
-    def test_collection_update_success(self, test_app, mock_utils, mocker):
+    def test_collection_update_success(self, test_app, mock_utils, mock_response_cache, mocker):
         mock_db = mocker.MagicMock(session=mocker.MagicMock())
         mock_db_client = mocker.patch('api.blueprints.drbCollection.DBClient')
         mock_db_client.return_value = mock_db
+        mock_db.fetchCollectionWorkIDs.side_effect = [set([1, 2]), set([2, 3])]
 
         mock_db.fetchUser.return_value = mocker.MagicMock(
             user='testUser', password='testPswd', salt='testSalt'
@@ -170,6 +179,8 @@ class TestCollectionBlueprint:
             assert mock_db.createSession.call_count == 2
             mock_db.fetchSingleCollection.assert_called_once_with('testUUID')
             mock_db.session.commit.assert_called_once()
+            mock_response_cache.assert_called_once_with('testRedisClient')
+            mock_response_cache.return_value.invalidate_works.assert_called_once_with(set([1, 2, 3]))
 
             mock_feed_construct.assert_called_once_with(
                 collection, mock_db
@@ -216,10 +227,11 @@ class TestCollectionBlueprint:
                 }
             )
 
-    def test_static_collection_createsuccess(self, test_app, mock_utils, mocker):
+    def test_static_collection_createsuccess(self, test_app, mock_utils, mock_response_cache, mocker):
         mock_db = mocker.MagicMock(session=mocker.MagicMock())
         mock_db_client = mocker.patch('api.blueprints.drbCollection.DBClient')
         mock_db_client.return_value = mock_db
+        mock_db.fetchCollectionWorkIDs.return_value = set([1, 2])
 
         mock_db.fetchUser.return_value = mocker.MagicMock(
             user='testUser', password='testPswd', salt='testSalt'
@@ -267,6 +279,8 @@ class TestCollectionBlueprint:
                 editionIDs=['ed1', 'ed2', 'ed3']
             )
             mock_db.session.commit.assert_called_once()
+            mock_response_cache.assert_called_once_with('testRedisClient')
+            mock_response_cache.return_value.invalidate_works.assert_called_once_with(set([1, 2]))
 
             mock_feed_construct.assert_called_once_with(collection, mock_db)
 
@@ -276,10 +290,11 @@ class TestCollectionBlueprint:
                 201, 'testOPDS2Feed'
             )
 
-    def test_automatic_collection_create_success(self, test_app, mock_utils, mocker):
+    def test_automatic_collection_create_success(self, test_app, mock_utils, mock_response_cache, mocker):
         mock_db = mocker.MagicMock(session=mocker.MagicMock())
         mock_db_client = mocker.patch('api.blueprints.drbCollection.DBClient')
         mock_db_client.return_value = mock_db
+        mock_db.fetchCollectionWorkIDs.return_value = set()
 
         mock_db.fetchUser.return_value = mocker.MagicMock(
             user='testUser', password='testPswd', salt='testSalt'
@@ -328,6 +343,8 @@ class TestCollectionBlueprint:
                 subjectQuery=None,
             )
             mock_db.session.commit.assert_called_once()
+            mock_response_cache.assert_called_once_with('testRedisClient')
+            mock_response_cache.return_value.invalidate_works.assert_called_once_with(set())
 
             mock_feed_construct.assert_called_once_with(
                 mock_db.createAutomaticCollection.return_value, mock_db,
@@ -565,10 +582,11 @@ class TestCollectionBlueprint:
                 {'message': 'Collection id testUUID is invalid'}
             )
 
-    def test_collection_delete_success(self, test_app, mock_utils, mocker):
+    def test_collection_delete_success(self, test_app, mock_utils, mock_response_cache, mocker):
         mock_db = mocker.MagicMock(session=mocker.MagicMock())
         mock_db_client = mocker.patch('api.blueprints.drbCollection.DBClient')
         mock_db_client.return_value = mock_db
+        mock_db.fetchCollectionWorkIDs.return_value = set([1, 2])
 
         mock_db.fetchUser.return_value = mocker.MagicMock(
             user='testUser', password='testPswd', salt='testSalt'
@@ -596,6 +614,8 @@ class TestCollectionBlueprint:
                 'testUUID'
             )
             mock_db.session.commit.assert_called_once()
+            mock_response_cache.assert_called_once_with('testRedisClient')
+            mock_response_cache.return_value.invalidate_works.assert_called_once_with(set([1, 2]))
 
     def test_collection_delete_error(self, test_app, mock_utils, mocker):
         mock_db = mocker.MagicMock(session=mocker.MagicMock())
@@ -635,10 +655,11 @@ class TestCollectionBlueprint:
                 {'message': 'No collection with UUID testUUID exists'}
             )
 
-    def test_collection_delete_work_edition_success(self, test_app, mock_utils, mocker):
+    def test_collection_delete_work_edition_success(self, test_app, mock_utils, mock_response_cache, mocker):
         mock_db = mocker.MagicMock(session=mocker.MagicMock())
         mock_db_client = mocker.patch('api.blueprints.drbCollection.DBClient')
         mock_db_client.return_value = mock_db
+        mock_db.fetchCollectionWorkIDs.return_value = set([1, 2])
 
         mock_db.fetchUser.return_value = mocker.MagicMock(
             user='testUser', password='testPswd', salt='testSalt'
@@ -678,6 +699,8 @@ class TestCollectionBlueprint:
             assert mockRemoveEdition.call_count == 1
             mock_db.fetchSingleCollection.assert_called_once_with('testUUID')
             mock_db.session.commit.assert_called_once()
+            mock_response_cache.assert_called_once_with('testRedisClient')
+            mock_response_cache.return_value.invalidate_works.assert_called_once_with(set([1, 2]))
 
             mock_feed_construct.assert_called_once_with(collection, mock_db)
 
@@ -26,6 +26,7 @@ class TestDBClient:
         """)
 
     def test_createSession(self, testInstance, mocker):
+        mocker.patch.dict(DBClient.sessionFactories, clear=True)
         mockCreator = mocker.MagicMock()
         mockMaker = mocker.patch('api.db.sessionmaker')
         mockMaker.return_value = mockCreator
@@ -38,6 +39,11 @@ class TestDBClient:
         mockMaker.assert_called_once_with(bind=testInstance.engine)
         mockCreator.assert_called_once()
 
+        testInstance.createSession()
+
+        mockMaker.assert_called_once()
+        assert mockCreator.call_count == 2
+
     def test_closeSession(self, testInstance):
         testInstance.closeSession()
 
@@ -171,6 +177,12 @@ class TestDBClient:
         testInstance.session.query().filter().all.assert_called_once()
         testInstance.session.add.assert_called_once_with(mockCollInstance)
 
+    def test_fetchCollectionWorkIDs(self, testInstance):
+        testInstance.session.query().join().filter().all\
+            .return_value = [(1,), (2,), (1,)]
+
+        assert testInstance.fetchCollectionWorkIDs('uuid') == set([1, 2])
+
     def test_deleteCollection(self, testInstance):
         testInstance.session.query().filter().delete\
             .return_value = 'testDelete'
@@ -16,9 +16,11 @@ class TestEditionBlueprint:
         )
 
     @pytest.fixture
-    def test_app(self):
+    def test_app(self, mocker):
         flask_app = Flask('test')
         flask_app.config['DB_CLIENT'] = 'testDBClient'
+        flask_app.config['REDIS_CLIENT'] = mocker.MagicMock()
+        flask_app.config['REDIS_CLIENT'].get.return_value = None
         flask_app.config['READER_VERSION'] = 'test'
 
         return flask_app
@@ -2,7 +2,7 @@ import pytest
 
 from elasticsearch_dsl import Search, Q, A
 from tests.helper import TestHelpers
-from api.elastic import ElasticClient, ElasticClientError
+from api.elastic import ElasticClient, ElasticClientError, ElasticCursorError
 
 
 class TestElasticClient:
@@ -21,6 +21,9 @@ class TestElasticClient:
                 self.esIndex = 'test_es_index'
                 self.environment = 'test'
                 self.searchedFields = []
+                self.pitKeepAlive = '5m'
+                self.cursorPage = None
+                self.nextCursor = None
 
         return MockElasticClient()
 
@@ -444,6 +447,101 @@ class TestElasticClient:
             mocker.call(False), mocker.call(True)
         ])
 
+    def test_searchQuery_cursor(self, testInstance, mocker):
+        mockGenerate = mocker.patch.object(ElasticClient, 'generateSearchQuery')
+        mockExecute = mocker.patch.object(ElasticClient, 'executeCursorQuery')
+        mockExecute.return_value = 'testResponse'
+
+        assert testInstance.searchQuery('testParams', cursor='testCursor') == 'testResponse'
+
+        mockGenerate.assert_called_once_with('testParams')
+        mockExecute.assert_called_once_with('testParams', 'testCursor', 10)
+
+    def test_executeCursorQuery_start(self, testInstance, mockSearch, searchMocks, mocker):
+        searchMocks['generateQueryHash'].return_value = 'testHash'
+        mockOpen = mocker.patch.object(ElasticClient, 'openPointInTime')
+        mockOpen.return_value = 'testPIT'
+        mockClose = mocker.patch.object(ElasticClient, 'closePointInTime')
+
+        mockSearch.index.return_value = mockSearch
+        mockSearch.execute.return_value.pit_id = 'testUpdatedPIT'
+        mockSearch.execute.return_value.hits = mocker.MagicMock(total=mocker.MagicMock(value=5))
+        mockSearch.execute.return_value.hits.__len__.return_value = 1
+        mockSearch.execute.return_value.hits.__getitem__.return_value = mocker.MagicMock(
+            meta=mocker.MagicMock(sort=['testSort', 'uuid'])
+        )
+        testInstance.query = mockSearch
+
+        testResult = testInstance.executeCursorQuery({}, '*', 1)
+
+        assert testResult._extract_mock_name() == 'mockRes'
+        assert testInstance.cursorPage == 0
+        assert ElasticClient.decodeCursor(testInstance.nextCursor) == {
+            'query': 'testHash', 'page': 1, 'pit': 'testUpdatedPIT', 'searchAfter': ['testSort', 'uuid']
+        }
+
+        searchMocks['generateQueryHash'].assert_called_once_with({}, 0)
+        mockSearch.index.assert_called_once_with()
+        mockSearch.extra.assert_called_once_with(pit={'id': 'testPIT', 'keep_alive': '5m'})
+        mockSearch.__getitem__.assert_called_once_with(slice(0, 1))
+        mockClose.assert_not_called()
+
+    def test_executeCursorQuery_last_page(self, testInstance, mockSearch, searchMocks, mocker):
+        searchMocks['generateQueryHash'].return_value = 'testHash'
+        mockOpen = mocker.patch.object(ElasticClient, 'openPointInTime')
+        mockClose = mocker.patch.object(ElasticClient, 'closePointInTime')
+
+        mockSearch.index.return_value = mockSearch
+        mockSearch.execute.return_value.pit_id = None
+        mockSearch.execute.return_value.hits = mocker.MagicMock(total=mocker.MagicMock(value=25))
+        mockSearch.execute.return_value.hits.__len__.return_value = 5
+        testInstance.query = mockSearch
+
+        testCursor = ElasticClient.encodeCursor({
+            'query': 'testHash', 'page': 2, 'pit': 'testPIT', 'searchAfter': ['testSort']
+        })
+
+        testResult = testInstance.executeCursorQuery({}, testCursor, 10)
+
+        assert testResult._extract_mock_name() == 'mockRes'
+        assert testInstance.cursorPage == 2
+        assert testInstance.nextCursor is None
+
+        mockOpen.assert_not_called()
+        mockSearch.extra.assert_has_calls([
+            mocker.call(pit={'id': 'testPIT', 'keep_alive': '5m'}),
+            mocker.call(search_after=['testSort'])
+        ])
+        mockClose.assert_called_once_with('testPIT')
+
+    def test_executeCursorQuery_query_mismatch(self, testInstance, mockSearch, searchMocks):
+        searchMocks['generateQueryHash'].return_value = 'testHash'
+        testInstance.query = mockSearch
+
+        testCursor = ElasticClient.encodeCursor({
+            'query': 'otherHash', 'page': 1, 'pit': 'testPIT', 'searchAfter': ['testSort']
+        })
+
+        with pytest.raises(ElasticCursorError):
+            testInstance.executeCursorQuery({}, testCursor, 10)
+
+        mockSearch.execute.assert_not_called()
+
+    def test_decodeCursor_invalid(self):
+        with pytest.raises(ElasticCursorError):
+            ElasticClient.decodeCursor('notACursor')
+
+        with pytest.raises(ElasticCursorError):
+            ElasticClient.decodeCursor(ElasticClient.encodeCursor({'page': 1}))
+
+    def test_openPointInTime(self, testInstance, mocker):
+        mockConnection = mocker.patch('api.elastic.connections').get_connection.return_value
+        mockConnection.open_point_in_time.return_value = {'id': 'testPIT'}
+
+        assert testInstance.openPointInTime() == 'testPIT'
+
+        mockConnection.open_point_in_time.assert_called_once_with(index='test_es_index', keep_alive='5m')
+
     def test_setPageResultCache(self, testInstance, mocker):
         testInstance.redis = mocker.MagicMock()
 
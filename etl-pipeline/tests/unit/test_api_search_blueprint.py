@@ -3,7 +3,7 @@ import pytest
 
 from api.blueprints.drbSearch import query
 from api.utils import APIUtils
-from api.elastic import ElasticClientError
+from api.elastic import ElasticClientError, ElasticCursorError
 
 class TestSearchBlueprint:
     @pytest.fixture
@@ -119,7 +119,7 @@ class TestSearchBlueprint:
                     'sort': ['testSortTerms'],
                     'filter': [('format', 'html'), 'testShowAll']
                 },
-                page=0, perPage=5
+                page=0, perPage=5, cursor=None
             )
             test_result_ids = [
                 ('uuid1', ['ed1', 'ed2'], {'field': ['highlight_uuid1']}),
@@ -184,6 +184,93 @@ class TestSearchBlueprint:
                 { 'message': 'Unable to execute search' }
             )
 
+    def test_query_source_hydration(self, mock_utils, mock_hits, test_app, mocker):
+        test_app.config['SEARCH_SOURCE_HYDRATION'] = True
+
+        mock_es = mocker.MagicMock()
+        mocker.patch('api.blueprints.drbSearch.ElasticClient').return_value = mock_es
+
+        mock_db = mocker.MagicMock()
+        mocker.patch('api.blueprints.drbSearch.DBClient').return_value = mock_db
+        mock_db.fetchSearchedWorks.return_value = ['dbWork5']
+
+        mock_source_work = mocker.patch('api.blueprints.drbSearch.SourceWork')
+        mock_source_work.hasDisplay.side_effect = lambda hit: hit.uuid != 'uuid5'
+        mock_source_work.fromHit.side_effect = lambda hit: mocker.MagicMock(uuid=hit.uuid)
+
+        mock_utils['normalizeQueryParams'].return_value = {'query': ['q1'], 'size': [5]}
+        mock_utils['extractParamPairs'].side_effect = [['testQueryTerms'], [], [], []]
+        mock_utils['formatResponseObject'].return_value = 'mockAPIResponse'
+
+        mock_response = mocker.MagicMock()
+        mock_response.hits = mock_hits
+        mock_es.searchQuery.return_value = mock_response
+
+        with test_app.test_request_context('/?testing=true'):
+            test_api_response = query()
+
+            assert test_api_response == 'mockAPIResponse'
+
+            assert mock_source_work.fromHit.call_count == 4
+            mock_db.fetchSearchedWorks.assert_called_once_with([('uuid5', ['ed8'], {'field': ['highlight_uuid5']})])
+
+            test_works = mock_utils['formatWorkOutput'].call_args[0][0]
+            assert [getattr(w, 'uuid', w) for w in test_works] == ['uuid1', 'uuid2', 'uuid3', 'uuid4', 'dbWork5']
+
+    def test_query_cursor(self, mock_utils, mock_hits, test_app, mocker):
+        mock_es = mocker.MagicMock(cursorPage=2, nextCursor='testNextCursor')
+        mocker.patch('api.blueprints.drbSearch.ElasticClient').return_value = mock_es
+
+        mock_db = mocker.MagicMock()
+        mocker.patch('api.blueprints.drbSearch.DBClient').return_value = mock_db
+
+        query_params = {'query': ['q1'], 'size': [5], 'cursor': ['testCursor']}
+        mock_utils['normalizeQueryParams'].return_value = query_params
+
+        mock_utils['extractParamPairs'].side_effect = [['testQueryTerms'], [], [], []]
+        mock_utils['formatPagingOptions'].return_value = {'currentPage': 3}
+        mock_utils['formatResponseObject'].return_value = 'mockAPIResponse'
+
+        mock_response = mocker.MagicMock()
+        mock_response.hits = mock_hits
+        mock_es.searchQuery.return_value = mock_response
+
+        with test_app.test_request_context('/?testing=true'):
+            test_api_response = query()
+
+            assert test_api_response == 'mockAPIResponse'
+
+            mock_es.searchQuery.assert_called_once_with(
+                {'query': ['testQueryTerms'], 'sort': [], 'filter': [], 'showAll': []},
+                page=0, perPage=5, cursor='testCursor'
+            )
+            mock_utils['formatPagingOptions'].assert_called_once_with(3, 5, 5)
+
+            response_data = mock_utils['formatResponseObject'].call_args[0][2]
+            assert response_data['paging'] == {'currentPage': 3, 'nextCursor': 'testNextCursor'}
+
+    def test_query_cursor_error(self, mock_utils, test_app, mocker):
+        mock_es = mocker.MagicMock()
+        mocker.patch('api.blueprints.drbSearch.ElasticClient').return_value = mock_es
+        mocker.patch('api.blueprints.drbSearch.DBClient')
+
+        mock_utils['normalizeQueryParams'].return_value = {'query': ['q1'], 'cursor': ['badCursor']}
+        mock_utils['extractParamPairs'].side_effect = [['testQueryTerms'], [], [], []]
+        mock_utils['formatResponseObject'].return_value = 'mockAPIResponse'
+
+        mock_es.searchQuery.side_effect = ElasticCursorError('Search cursor is invalid')
+
+        with test_app.test_request_context('/?testing=true'):
+            test_api_response = query()
+
+            assert test_api_response == 'mockAPIResponse'
+
+            mock_utils['formatResponseObject'].assert_called_once_with(
+                400,
+                'searchResponse',
+                { 'message': 'Search cursor is invalid or has expired' }
+            )
+
     def test_query_db_error(self, mock_utils, mock_hits, test_app, mocker):
         mock_es = mocker.MagicMock()
         mock_es_client = mocker.patch('api.blueprints.drbSearch.ElasticClient')
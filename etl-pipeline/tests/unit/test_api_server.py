@@ -0,0 +1,50 @@
+import pytest
+
+from api.server import APIServer
+
+
+class TestAPIServer:
+    @pytest.fixture
+    def testApp(self, mocker):
+        return mocker.MagicMock()
+
+    def test_getServerOptions(self, mocker):
+        mocker.patch.dict('os.environ', {'API_WORKERS': '3', 'API_THREADS': '2'})
+
+        testOptions = APIServer.getServerOptions('0.0.0.0', 80)
+
+        assert testOptions['bind'] == '0.0.0.0:80'
+        assert testOptions['workers'] == 3
+        assert testOptions['threads'] == 2
+        assert testOptions['worker_class'] == 'gthread'
+        assert testOptions['preload_app'] is True
+        assert testOptions['max_requests'] == 1000
+
+    def test_getServerOptions_default_workers(self, mocker):
+        mocker.patch.dict('os.environ', {}, clear=True)
+        mocker.patch('api.server.os.sched_getaffinity', create=True).return_value = {0, 1}
+        mocker.patch('api.server.cpu_count').return_value = 6
+
+        assert APIServer.getServerOptions('0.0.0.0', 80)['workers'] == 2
+
+    def test_getAvailableCPUs_without_affinity(self, mocker):
+        mocker.patch('api.server.os', mocker.MagicMock(spec=[]))
+        mocker.patch('api.server.cpu_count').return_value = 6
+
+        assert APIServer.getAvailableCPUs() == 6
+
+    def test_load_config(self, testApp, mocker):
+        mockPostFork = mocker.MagicMock()
+
+        testServer = APIServer(testApp, postFork=mockPostFork, port=5050)
+
+        assert testServer.cfg.bind == ['0.0.0.0:5050']
+        assert testServer.cfg.worker_class_str == 'gthread'
+        assert testServer.cfg.preload_app is True
+
+        testServer.cfg.post_fork('testServer', 'testWorker')
+
+        mockPostFork.assert_called_once()
+
+    def test_load(self, testApp):
+        assert APIServer(testApp).load() == testApp
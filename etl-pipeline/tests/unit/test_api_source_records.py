@@ -0,0 +1,82 @@
+from datetime import datetime
+from elasticsearch_dsl.response import Hit
+import pytest
+
+from api.sourceRecords import SourceWork, SourceEdition, SourceItem
+
+
+class TestSourceRecords:
+    @pytest.fixture
+    def testEditionDisplay(self):
+        return {
+            'title': 'Test Edition',
+            'publication_date': '1900-01-01',
+            'id': 1,
+            'links': [{'id': 2, 'media_type': 'image/jpeg', 'url': 'test.jpg', 'flags': {'cover': True}}],
+            'items': [{
+                'source': 'test',
+                'modified': '2020-01-01T12:00:00',
+                'id': 3,
+                'physical_location': {'name': 'test'},
+                'links': [{'id': 4, 'media_type': 'application/pdf', 'url': 'test.pdf', 'flags': {'download': True}}],
+                'rights': [{'source': 'test', 'license': 'public_domain', 'rights_statement': 'Public Domain'}]
+            }]
+        }
+
+    @pytest.fixture
+    def testHit(self, testEditionDisplay):
+        return Hit({
+            '_index': 'test_index',
+            '_id': '1',
+            '_source': {
+                'uuid': 'testUUID',
+                'date_created': '2020-01-01T00:00:00',
+                'date_modified': '2021-01-01T00:00:00.000001',
+                'display': {'uuid': 'testUUID', 'title': 'Test Work', 'authors': [{'name': 'Author 1'}]},
+                'editions': [{'edition_id': 1, 'display': testEditionDisplay}]
+            }
+        })
+
+    def test_fromHit(self, testHit):
+        testWork = SourceWork.fromHit(testHit)
+
+        assert testWork.uuid == 'testUUID'
+        assert testWork.date_created == datetime(2020, 1, 1)
+        assert testWork.date_modified == datetime(2021, 1, 1, 0, 0, 0, 1)
+        assert dict(testWork) == {'uuid': 'testUUID', 'title': 'Test Work', 'authors': [{'name': 'Author 1'}]}
+
+        testEdition = testWork.editions[0]
+
+        assert testEdition.id == 1
+        assert testEdition.work == testWork
+        assert testEdition.publication_date.year == 1900
+        assert testEdition.links[0].media_type == 'image/jpeg'
+        assert dict(testEdition) == {'title': 'Test Edition', 'publication_date': '1900-01-01'}
+
+    def test_hasDisplay(self, testHit):
+        assert SourceWork.hasDisplay(testHit) is True
+
+    def test_hasDisplay_missing_edition_display(self):
+        testHit = Hit({
+            '_index': 'test_index',
+            '_id': '1',
+            '_source': {'uuid': 'testUUID', 'display': {}, 'editions': [{'edition_id': 1}]}
+        })
+
+        assert SourceWork.hasDisplay(testHit) is False
+
+    def test_SourceEdition_without_items(self):
+        testEdition = SourceEdition({'title': 'Test Edition', 'id': 1})
+
+        assert testEdition.links == []
+        assert testEdition.items == []
+        assert testEdition.publication_date is None
+
+    def test_SourceItem(self, testEditionDisplay):
+        testItem = SourceItem(testEditionDisplay['items'][0])
+
+        assert testItem.id == 3
+        assert testItem.physical_location == {'name': 'test'}
+        assert testItem.links[0].flags == {'download': True}
+        assert testItem.rights[0].rights_statement == 'Public Domain'
+        assert dict(testItem) == {'source': 'test', 'modified': datetime(2020, 1, 1, 12)}
@@ -312,9 +312,12 @@ class TestAPIUtils:
         mockFormat.side_effect = ['formattedWork1', 'formattedWork2']
 
         mockAddMeta = mocker.patch.object(APIUtils, 'addWorkMeta')
+        mockLoadCollections = mocker.patch.object(APIUtils, 'loadEditionCollections')
+        mockLoadCollections.return_value = mocker.sentinel.editionCollections
 
         testWorks = [
-            mocker.MagicMock(uuid='uuid1'), mocker.MagicMock(uuid='uuid2')
+            mocker.MagicMock(uuid='uuid1', editions=[mocker.MagicMock(id=1)]),
+            mocker.MagicMock(uuid='uuid2', editions=[mocker.MagicMock(id=2), mocker.MagicMock(id=3)])
         ]
 
         with testApp.test_request_context('/'):
@@ -330,9 +333,16 @@ class TestAPIUtils:
             )
 
         assert outWorks == ['formattedWork1', 'formattedWork2']
+        mockLoadCollections.assert_called_once_with([1, 2, 3], mocker.sentinel.dbClient)
         mockFormat.assert_has_calls([
-            mocker.call(testWorks[0], 1, True, mocker.sentinel.dbClient, formats=None, reader=None, request=request),
-            mocker.call(testWorks[1], 2, True, mocker.sentinel.dbClient, formats=None, reader=None, request=request),
+            mocker.call(
+                testWorks[0], 1, True, mocker.sentinel.dbClient, formats=None, reader=None, request=request,
+                editionCollections=mocker.sentinel.editionCollections
+            ),
+            mocker.call(
+                testWorks[1], 2, True, mocker.sentinel.dbClient, formats=None, reader=None, request=request,
+                editionCollections=mocker.sentinel.editionCollections
+            ),
         ])
 
         mockAddMeta.assert_has_calls([
@@ -421,6 +431,63 @@ class TestAPIUtils:
             assert testWorkDict['editions'][0]['edition_id'] == 'ed2'
             assert testWorkDict['editions'][1]['edition_id'] == 'ed1'
 
+    def test_formatWork_edition_collections(self, testWork, mocker, testApp):
+        testWork.editions = [mocker.MagicMock(id=1), mocker.MagicMock(id=2)]
+        testWork.id = 'testID'
+
+        mockLoadCollections = mocker.patch.object(APIUtils, 'loadEditionCollections')
+
+        mockFormatEdition = mocker.patch.object(APIUtils, 'formatEdition')
+        mockFormatEdition.side_effect = [
+            {'edition_id': 1, 'items': []},
+            {'edition_id': 2, 'items': []}
+        ]
+
+        editionCollections = {1: [{'uuid': 'col1'}], 2: [{'uuid': 'col1'}, {'uuid': 'col2'}]}
+
+        with testApp.test_request_context('/'):
+            testWorkDict = APIUtils.formatWork(
+                testWork, None, True, dbClient=mocker.sentinel.dbClient, request=request, editionCollections=editionCollections
+            )
+
+        assert testWorkDict['inCollections'] == [{'uuid': 'col1'}, {'uuid': 'col1'}, {'uuid': 'col2'}]
+        mockLoadCollections.assert_not_called()
+        mockFormatEdition.assert_has_calls([
+            mocker.call(testWork.editions[0], editionInCollection=[{'uuid': 'col1'}], formats=None, reader=None),
+            mocker.call(testWork.editions[1], editionInCollection=[{'uuid': 'col1'}, {'uuid': 'col2'}], formats=None, reader=None)
+        ])
+
+    def test_loadEditionCollections(self, mocker):
+        mockDB = mocker.MagicMock()
+        mockQuery = mockDB.session.query.return_value
+        mockQuery.join.return_value = mockQuery
+        mockQuery.filter.return_value = mockQuery
+        mockQuery.order_by.return_value = [
+            (1, 'uuid1', 'Collection 1', 'Creator 1', 'Description 1', 3),
+            (1, 'uuid2', 'Collection 2', 'Creator 2', 'Description 2', 1),
+            (2, 'uuid1', 'Collection 1', 'Creator 1', 'Description 1', 3)
+        ]
+
+        editionCollections = APIUtils.loadEditionCollections([1, 2, 2, 3], mockDB)
+
+        assert editionCollections == {
+            1: [
+                {'uuid': 'uuid1', 'title': 'Collection 1', 'creator': 'Creator 1', 'description': 'Description 1', 'numberOfItems': 3},
+                {'uuid': 'uuid2', 'title': 'Collection 2', 'creator': 'Creator 2', 'description': 'Description 2', 'numberOfItems': 1}
+            ],
+            2: [
+                {'uuid': 'uuid1', 'title': 'Collection 1', 'creator': 'Creator 1', 'description': 'Description 1', 'numberOfItems': 3}
+            ]
+        }
+        mockDB.session.query.assert_called_once()
+        assert mockQuery.join.call_count == 2
+
+    def test_loadEditionCollections_no_editions(self, mocker):
+        mockDB = mocker.MagicMock()
+
+        assert APIUtils.loadEditionCollections([], mockDB) == {}
+        mockDB.session.query.assert_not_called()
+
     def test_formatEditionOutput(self, mocker, testApp):
         mockFormatEdition = mocker.patch.object(APIUtils, 'formatEdition')
         mockFormatEdition.return_value = {"testEdition": "test"}
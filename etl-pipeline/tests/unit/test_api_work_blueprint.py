@@ -17,9 +17,11 @@ class TestWorkBlueprint:
         )
 
     @pytest.fixture
-    def test_app(self):
+    def test_app(self, mocker):
         flask_app = Flask('test')
         flask_app.config['DB_CLIENT'] = 'testDBClient'
+        flask_app.config['REDIS_CLIENT'] = mocker.MagicMock()
+        flask_app.config['REDIS_CLIENT'].get.return_value = None
         flask_app.config['READER_VERSION'] = 'test'
 
         return flask_app
@@ -31,7 +33,8 @@ class TestWorkBlueprint:
 
         mock_utils['normalizeQueryParams'].return_value = {'showAll': ['true']}
 
-        mock_db.fetchSingleWork.return_value = 'dbWorkRecord'
+        mock_work = mocker.MagicMock(id=1)
+        mock_db.fetchSingleWork.return_value = mock_work
 
         mock_utils['formatWorkOutput'].return_value = 'testWork'
         mock_utils['formatResponseObject'].return_value = 'singleWorkResponse'
@@ -44,7 +47,7 @@ class TestWorkBlueprint:
 
             mock_utils['normalizeQueryParams'].assert_called_once
             mock_utils['formatWorkOutput'].assert_called_once_with(
-                'dbWorkRecord', None, showAll=True, dbClient=mock_db, formats=[],
+                mock_work, None, showAll=True, dbClient=mock_db, formats=[],
                 reader='test', request=request
             )
             mock_utils['formatResponseObject'].assert_called_once_with(
@@ -63,7 +66,8 @@ class TestWorkBlueprint:
             [('format', 'requestable')]
         ]
 
-        mock_db.fetchSingleWork.return_value = 'dbWorkRecord'
+        mock_work = mocker.MagicMock(id=1)
+        mock_db.fetchSingleWork.return_value = mock_work
 
         mock_utils['formatWorkOutput'].return_value = 'testWork'
         mock_utils['formatResponseObject'].return_value = 'singleWorkResponse'
@@ -79,7 +83,7 @@ class TestWorkBlueprint:
                 mocker.call('filter', query_params)
             ])
             mock_utils['formatWorkOutput'].assert_called_once_with(
-                'dbWorkRecord', None, showAll=True, dbClient=mock_db, formats=['application/html+edd',
+                mock_work, None, showAll=True, dbClient=mock_db, formats=['application/html+edd',
                 'application/x.html+edd'], reader='test', request=request
             )
             mock_utils['formatResponseObject'].assert_called_once_with(
@@ -93,7 +97,8 @@ class TestWorkBlueprint:
 
         mock_utils['normalizeQueryParams'].return_value = {'showAll': ['false']}
 
-        mock_db.fetchSingleWork.return_value = 'dbWorkRecord'
+        mock_work = mocker.MagicMock(id=1)
+        mock_db.fetchSingleWork.return_value = mock_work
 
         mock_utils['formatWorkOutput'].return_value = 'testWork'
         mock_utils['formatResponseObject'].return_value = 'singleWorkResponse'
@@ -106,7 +111,7 @@ class TestWorkBlueprint:
 
             mock_utils['normalizeQueryParams'].assert_called_once
             mock_utils['formatWorkOutput'].assert_called_once_with(
-                'dbWorkRecord', None, showAll=False, dbClient=mock_db, formats=[], reader='test',
+                mock_work, None, showAll=False, dbClient=mock_db, formats=[], reader='test',
                 request=request
             )
             mock_utils['formatResponseObject'].assert_called_once_with(
@@ -161,6 +166,25 @@ class TestWorkBlueprint:
                 {'message': 'Unable to get work with id a8512b02-779b-45c6-95a3-56f90831be46'}
             )
 
+    def test_get_work_cached(self, mock_utils, test_app, mocker):
+        mock_db = mocker.MagicMock()
+        mock_db.__enter__.return_value = mock_db
+        mocker.patch('api.blueprints.drbWork.DBClient', return_value=mock_db)
+
+        mock_utils['normalizeQueryParams'].return_value = {}
+        mock_utils['formatResponseObject'].return_value = 'singleWorkResponse'
+
+        test_app.config['REDIS_CLIENT'].get.return_value = b'{"uuid": "testUUID"}'
+
+        with test_app.test_request_context('/a8512b02-779b-45c6-95a3-56f90831be46'):
+            test_api_response = get_work('a8512b02-779b-45c6-95a3-56f90831be46')
+
+            assert test_api_response == 'singleWorkResponse'
+
+            mock_db.fetchSingleWork.assert_not_called()
+            mock_utils['formatWorkOutput'].assert_not_called()
+            mock_utils['formatResponseObject'].assert_called_once_with(200, 'singleWork', {'uuid': 'testUUID'})
+
     def test_get_work_invalid_id(self, mock_utils, test_app):
         mock_utils['formatResponseObject'].return_value = '400Response'
 
@@ -0,0 +1,47 @@
+from managers import EditionGrouper
+
+
+class TestEditionGrouper:
+    @staticmethod
+    def create_instance(mocker, uuid, spatial=None, dates=None, publisher=None, has_version=None):
+        return mocker.MagicMock(
+            uuid=uuid, spatial=spatial, dates=dates, publisher=publisher, has_version=has_version
+        )
+
+    def test_initializer_env_max_size(self, mocker):
+        mocker.patch.dict('os.environ', {'EDITION_GROUPER_MAX_SIZE': '5'})
+
+        assert EditionGrouper([]).max_size == 5
+        assert EditionGrouper([], max_size=10).max_size == 10
+
+    def test_group_editions(self, mocker):
+        instances = [
+            self.create_instance(mocker, 'uuid1', 'New York', ['1900|publication_date'], ['Harper|viaf']),
+            self.create_instance(mocker, 'uuid2', 'New York.', ['1900|publication_date'], ['harper|lcnaf']),
+            self.create_instance(mocker, 'uuid3', 'London', ['1925-01-01|publication_date'], ['Macmillan|']),
+            self.create_instance(mocker, 'uuid4')
+        ]
+
+        assert EditionGrouper(instances).group_editions() == [
+            ('1900', ['uuid1', 'uuid2']),
+            ('1925', ['uuid3'])
+        ]
+
+    def test_group_editions_ambiguous(self, mocker):
+        instances = [
+            self.create_instance(mocker, 'uuid1', 'New York', ['1900|publication_date'], ['Harper|']),
+            self.create_instance(mocker, 'uuid2', 'New York', ['1900|publication_date'], ['Harper & Brothers|'])
+        ]
+
+        assert EditionGrouper(instances).group_editions() is None
+
+    def test_group_editions_too_large(self, mocker):
+        instances = [
+            self.create_instance(mocker, f'uuid{i}', 'New York', ['1900|publication_date'])
+            for i in range(3)
+        ]
+
+        assert EditionGrouper(instances, max_size=2).group_editions() is None
+
+    def test_group_editions_no_data(self, mocker):
+        assert EditionGrouper([self.create_instance(mocker, 'uuid1')]).group_editions() == []
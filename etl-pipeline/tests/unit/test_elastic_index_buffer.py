@@ -0,0 +1,162 @@
+import pytest
+
+from managers import ElasticsearchIndexBuffer, SFRElasticRecordManager
+
+
+class TestElasticsearchIndexBuffer:
+    @pytest.fixture
+    def test_instance(self, mocker):
+        mocker.patch.object(SFRElasticRecordManager, 'detectLanguages', return_value=True)
+
+        mock_manager = mocker.MagicMock()
+        mock_manager.bulk_work_operations.return_value = []
+        mock_manager.get_changed_works.side_effect = lambda works: works
+        mock_manager.drain_dead_letter_works.return_value = []
+
+        return ElasticsearchIndexBuffer(mock_manager, max_size=3, max_age=60)
+
+    def test_index_work_coalesces_updates(self, test_instance, mocker):
+        first_work = mocker.MagicMock(uuid='uuid1')
+        second_work = mocker.MagicMock(uuid='uuid1')
+
+        test_instance.index_work(first_work)
+        test_instance.index_work(second_work)
+
+        assert test_instance.works_to_index == {'uuid1': second_work}
+        assert test_instance.coalesced_count == 1
+        test_instance.elastic_search_manager.bulk_work_operations.assert_not_called()
+
+    def test_delete_works_replaces_pending_index(self, test_instance, mocker):
+        test_instance.index_work(mocker.MagicMock(uuid='uuid1'))
+        test_instance.delete_works({'uuid1', 'uuid2'})
+
+        assert test_instance.works_to_index == {}
+        assert test_instance.works_to_delete == {'uuid1', 'uuid2'}
+
+    def test_index_work_replaces_pending_delete(self, test_instance, mocker):
+        test_work = mocker.MagicMock(uuid='uuid1')
+
+        test_instance.delete_works(['uuid1'])
+        test_instance.index_work(test_work)
+
+        assert test_instance.works_to_index == {'uuid1': test_work}
+        assert test_instance.works_to_delete == set()
+
+    def test_flush_on_size(self, test_instance, mocker):
+        test_works = [mocker.MagicMock(uuid='uuid{}'.format(i)) for i in range(2)]
+
+        test_instance.delete_works(['uuid3'])
+        for work in test_works:
+            test_instance.index_work(work)
+
+        test_instance.elastic_search_manager.bulk_work_operations.assert_called_once_with(
+            test_works, ['uuid3'], pipeline=None
+        )
+        assert test_instance.get_metrics() == {
+            'pending': 0,
+            'flushes': 1,
+            'indexed': 2,
+            'deleted': 1,
+            'failed': 0,
+            'coalesced': 0,
+            'unchanged': 0,
+            'last_flush_latency': mocker.ANY
+        }
+
+    def test_flush_falls_back_to_ingest_pipeline(self, test_instance, mocker):
+        SFRElasticRecordManager.detectLanguages.return_value = False
+        test_work = mocker.MagicMock(uuid='uuid1')
+
+        test_instance.index_work(test_work)
+        test_instance.flush()
+
+        test_instance.elastic_search_manager.bulk_work_operations.assert_called_once_with(
+            [test_work], [], pipeline='language_detector'
+        )
+
+    def test_flush_skips_unchanged_works(self, test_instance, mocker):
+        changed_work = mocker.MagicMock(uuid='uuid1')
+        unchanged_work = mocker.MagicMock(uuid='uuid2')
+        test_instance.elastic_search_manager.get_changed_works.side_effect = None
+        test_instance.elastic_search_manager.get_changed_works.return_value = [changed_work]
+
+        test_instance.index_work(changed_work)
+        test_instance.index_work(unchanged_work)
+        test_instance.flush()
+
+        test_instance.elastic_search_manager.get_changed_works.assert_called_once_with([changed_work, unchanged_work])
+        test_instance.elastic_search_manager.bulk_work_operations.assert_called_once_with(
+            [changed_work], [], pipeline=None
+        )
+        assert test_instance.indexed_count == 1
+        assert test_instance.unchanged_count == 1
+
+    def test_flush_empty_buffer(self, test_instance):
+        test_instance.flush()
+
+        test_instance.elastic_search_manager.bulk_work_operations.assert_not_called()
+        assert test_instance.flush_count == 0
+
+    def test_flush_records_failures(self, test_instance, mocker):
+        test_instance.elastic_search_manager.bulk_work_operations.return_value = [
+            {'index': {'_id': 'uuid1', 'status': 400, 'error': {'type': 'mapper_parsing_exception'}}}
+        ]
+
+        test_instance.index_work(mocker.MagicMock(uuid='uuid1'))
+        test_instance.index_work(mocker.MagicMock(uuid='uuid2'))
+        test_instance.delete_works(['uuid3'])
+
+        assert test_instance.indexed_count == 1
+        assert test_instance.deleted_count == 1
+        assert test_instance.failed_count == 1
+
+    def test_flush_records_request_failure(self, test_instance, mocker):
+        test_instance.elastic_search_manager.bulk_work_operations.side_effect = Exception('timeout')
+
+        test_instance.index_work(mocker.MagicMock(uuid='uuid1'))
+        test_instance.delete_works(['uuid2'])
+        test_instance.flush()
+
+        assert test_instance.failed_count == 2
+        assert test_instance.indexed_count == 0
+        assert test_instance.get_metrics()['pending'] == 0
+
+    def test_flush_requeues_dead_letter_works(self, test_instance, mocker):
+        test_instance.requeue_works = mocker.MagicMock()
+        test_instance.elastic_search_manager.drain_dead_letter_works.return_value = ['uuid1']
+
+        test_instance.index_work(mocker.MagicMock(uuid='uuid1'))
+        test_instance.flush()
+
+        test_instance.requeue_works.assert_called_once_with(['uuid1'])
+
+    def test_flush_requeues_works_on_request_failure(self, test_instance, mocker):
+        test_instance.requeue_works = mocker.MagicMock(side_effect=Exception('database unavailable'))
+        test_instance.elastic_search_manager.bulk_work_operations.side_effect = Exception('timeout')
+
+        test_instance.index_work(mocker.MagicMock(uuid='uuid1'))
+        test_instance.flush()
+
+        test_instance.requeue_works.assert_called_once_with(['uuid1'])
+        test_instance.elastic_search_manager.drain_dead_letter_works.assert_not_called()
+
+    def test_flush_without_dead_letter_works(self, test_instance, mocker):
+        test_instance.requeue_works = mocker.MagicMock()
+
+        test_instance.index_work(mocker.MagicMock(uuid='uuid1'))
+        test_instance.flush()
+
+        test_instance.requeue_works.assert_not_called()
+
+    def test_close_flushes_expired_operations(self, test_instance, mocker):
+        test_instance.max_age = 0.01
+        test_work = mocker.MagicMock(uuid='uuid1')
+
+        test_instance.start()
+        test_instance.index_work(test_work)
+        test_instance.close()
+
+        test_instance.elastic_search_manager.bulk_work_operations.assert_called_once_with(
+            [test_work], [], pipeline=None
+        )
+        assert test_instance.flush_thread is None
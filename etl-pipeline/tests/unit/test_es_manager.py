@@ -1,4 +1,3 @@
-from elastic_transport import ConnectionTimeout
 import pytest
 
 from managers import ElasticsearchManager
@@ -119,18 +118,147 @@ class TestElasticsearchManager:
         test_index.exists.assert_called_once()
         mock_init.assert_not_called()
 
+    def test_get_changed_works(self, test_instance, mocker):
+        test_instance.es = mocker.MagicMock()
+        test_instance.es.mget.return_value = {
+            "docs": [
+                {"_id": "uuid1", "found": True, "_source": {"content_hash": "hash1"}},
+                {"_id": "uuid2", "found": True, "_source": {"content_hash": "oldHash"}},
+                {"_id": "uuid3", "found": False},
+            ]
+        }
+        test_works = [
+            mocker.MagicMock(uuid="uuid1", content_hash="hash1"),
+            mocker.MagicMock(uuid="uuid2", content_hash="hash2"),
+            mocker.MagicMock(uuid="uuid3", content_hash="hash3"),
+        ]
+
+        assert test_instance.get_changed_works(test_works) == test_works[1:]
+
+        test_instance.es.mget.assert_called_once_with(
+            index="testES",
+            body={"ids": ["uuid1", "uuid2", "uuid3"]},
+            _source_includes=["content_hash"],
+        )
+
+    def test_get_changed_works_empty(self, test_instance, mocker):
+        test_instance.es = mocker.MagicMock()
+
+        assert test_instance.get_changed_works([]) == []
+
+        test_instance.es.mget.assert_not_called()
+
+    def test_get_changed_works_error(self, test_instance, mocker):
+        test_instance.es = mocker.MagicMock()
+        test_instance.es.mget.side_effect = Exception("test error")
+        test_works = [mocker.MagicMock(uuid="uuid1", content_hash="hash1")]
+
+        assert test_instance.get_changed_works(test_works) == test_works
+
+    def test_bulk_work_operations(self, test_instance, mocker):
+        mock_work = mocker.MagicMock(uuid="uuid1")
+        mock_work.to_dict.return_value = "mock_work"
+        mock_send = mocker.patch.object(ElasticsearchManager, "_send_bulk_actions")
+        mock_send.return_value = ["error"]
+
+        assert test_instance.bulk_work_operations([mock_work], ["uuid2"], pipeline=None) == ["error"]
+
+        mock_send.assert_called_once_with(
+            [
+                {"_op_type": "delete", "_index": "testES", "_id": "uuid2"},
+                {"_op_type": "index", "_index": "testES", "_id": "uuid1", "_source": "mock_work"},
+            ]
+        )
+
+    def test_create_versioned_index(self, test_instance, mocker):
+        mock_init = mocker.patch.object(ESWork, "init")
+        test_instance.client = mocker.MagicMock()
+
+        test_instance.create_versioned_index("testES-1")
+
+        mock_init.assert_called_once_with(index="testES-1")
+        test_instance.client.indices.put_settings.assert_called_once_with(
+            index="testES-1",
+            body={"index": {"number_of_replicas": 0, "refresh_interval": "-1"}},
+        )
+
+    def test_finalize_versioned_index(self, test_instance, mocker):
+        test_instance.client = mocker.MagicMock()
+
+        test_instance.finalize_versioned_index("testES-1", 2)
+
+        test_instance.client.indices.put_settings.assert_called_once_with(
+            index="testES-1",
+            body={"index": {"number_of_replicas": 2, "refresh_interval": None}},
+        )
+        test_instance.client.indices.refresh.assert_called_once_with(index="testES-1")
+
+    def test_get_number_of_replicas(self, test_instance, mocker):
+        test_instance.client = mocker.MagicMock()
+        test_instance.client.indices.get_settings.return_value = {
+            "testES-0": {"settings": {"index": {"number_of_replicas": "2"}}}
+        }
+
+        assert test_instance.get_number_of_replicas() == 2
+
+    def test_get_number_of_replicas_missing_index(self, test_instance, mocker):
+        test_instance.client = mocker.MagicMock()
+        test_instance.client.indices.exists.return_value = False
+
+        assert test_instance.get_number_of_replicas() is None
+
+    def test_swap_alias(self, test_instance, mocker):
+        test_instance.client = mocker.MagicMock()
+        test_instance.client.indices.exists_alias.return_value = True
+        test_instance.client.indices.get_alias.return_value = {"testES-0": {}}
+
+        assert test_instance.swap_alias("testES-1") == ["testES-0"]
+
+        test_instance.client.indices.update_aliases.assert_called_once_with(
+            body={
+                "actions": [
+                    {"remove": {"index": "testES-0", "alias": "testES"}},
+                    {"add": {"index": "testES-1", "alias": "testES"}},
+                ]
+            }
+        )
+
+    def test_swap_alias_replaces_concrete_index(self, test_instance, mocker):
+        test_instance.client = mocker.MagicMock()
+        test_instance.client.indices.exists_alias.return_value = False
+        test_instance.client.indices.exists.return_value = True
+
+        assert test_instance.swap_alias("testES-1") == []
+
+        test_instance.client.indices.update_aliases.assert_called_once_with(
+            body={
+                "actions": [
+                    {"remove_index": {"index": "testES"}},
+                    {"add": {"index": "testES-1", "alias": "testES"}},
+                ]
+            }
+        )
+
+    def test_scan_work_uuids(self, test_instance, mocker):
+        mock_scan = mocker.patch("managers.elasticsearch.scan")
+        mock_scan.return_value = iter([{"_id": "uuid1"}, {"_id": "uuid2"}])
+        test_instance.es = mocker.MagicMock()
+
+        assert list(test_instance.scan_work_uuids()) == ["uuid1", "uuid2"]
+
+        mock_scan.assert_called_once_with(
+            test_instance.es, index="testES", query={"_source": False}
+        )
+
     def test_delete_work_records(self, test_instance, mocker):
-        test_instance.es = "mock_client"
-        mock_bulk = mocker.patch("managers.elasticsearch.bulk")
+        mock_send = mocker.patch.object(ElasticsearchManager, "_send_bulk_actions")
         mock_gen = mocker.patch.object(ElasticsearchManager, "_delete_generator")
-        mock_gen.return_value = "generator"
+        mock_gen.return_value = iter(["action1"])
 
         test_instance.delete_work_records(["uuid1", "uuid2", "uuid3"])
 
         mock_gen.assert_called_once_with(["uuid1", "uuid2", "uuid3"])
-        mock_bulk.assert_called_once_with(
-            "mock_client", "generator", raise_on_error=False
-        )
+        mock_send.assert_called_once_with(["action1"])
 
     def test_delete_generator(self, test_instance):
         delete_stmts = [out for out in test_instance._delete_generator([1, 2, 3])]
@@ -142,110 +270,120 @@ class TestElasticsearchManager:
         ]
 
     def test_save_work_records_success(self, test_instance, mocker):
-        test_instance.es = "mock_client"
-        mock_bulk = mocker.patch("managers.elasticsearch.bulk")
+        mock_send = mocker.patch.object(ElasticsearchManager, "_send_bulk_actions")
+        mock_send.return_value = [{"index": {"_id": "uuid2", "status": 400}}]
         mock_gen = mocker.patch.object(ElasticsearchManager, "_upsert_generator")
-        mock_gen.return_value = "generator"
+        mock_gen.return_value = iter(["action1", "action2"])
 
-        mock_bulk.return_value = (
-            2,
-            [{"index": {"error": {"type": "testing", "reason": "testing"}}}],
+        assert test_instance.save_work_records(["work1", "work2"]) == ["uuid2"]
+
+        mock_gen.assert_called_once_with(["work1", "work2"], "language_detector")
+        mock_send.assert_called_once_with(["action1", "action2"])
+
+    def test_send_bulk_actions_success(self, test_instance, mocker):
+        test_instance.es = "mock_client"
+        mock_bulk = mocker.patch("managers.elasticsearch.parallel_bulk")
+        mock_bulk.return_value = iter(
+            [
+                (True, {"index": {"_id": "uuid1", "status": 201}}),
+                (False, {"delete": {"_id": "uuid2", "status": 404}}),
+            ]
         )
+        mock_sleep = mocker.patch("managers.elasticsearch.time.sleep")
+
+        actions = [
+            {"_op_type": "index", "_id": "uuid1"},
+            {"_op_type": "delete", "_id": "uuid2"},
+        ]
 
-        test_instance.save_work_records(["work1", "work2", "work3"])
+        assert test_instance._send_bulk_actions(actions) == []
 
-        mock_gen.assert_called_once_with(["work1", "work2", "work3"])
         mock_bulk.assert_called_once_with(
-            "mock_client", "generator", raise_on_error=False
+            "mock_client",
+            mocker.ANY,
+            thread_count=4,
+            chunk_size=500,
+            max_chunk_bytes=10 * 1024 * 1024,
+            raise_on_error=False,
+            raise_on_exception=False,
         )
+        mock_sleep.assert_not_called()
+        assert test_instance.dead_letter_works == []
 
-    def test_save_work_records_retry_failure(self, test_instance, mocker):
+    def test_send_bulk_actions_retries_failed_actions(self, test_instance, mocker):
         test_instance.es = "mock_client"
-        mock_bulk = mocker.patch("managers.elasticsearch.bulk")
-        mock_gen = mocker.patch.object(ElasticsearchManager, "_upsert_generator")
-        mock_gen.return_value = "generator"
-
-        mock_bulk.side_effect = ConnectionTimeout("testing")
+        sent_actions = []
 
-        work_array = [f"work{i}" for i in range(6)]
+        def mock_parallel_bulk(client, actions, **kwargs):
+            actions = list(actions)
+            sent_actions.append(actions)
 
-        test_instance.save_work_records(work_array)
+            for action in actions:
+                if action["_id"] == "uuid2" and len(sent_actions) == 1:
+                    yield False, {"index": {"_id": "uuid2", "status": "TIMEOUT"}}
+                else:
+                    yield True, {"index": {"_id": action["_id"], "status": 201}}
 
-        mock_gen.assert_has_calls(
-            [
-                mocker.call(work_array),
-                mocker.call(work_array[:3]),
-                mocker.call(work_array[:1]),
-                mocker.call(work_array[1:3]),
-                mocker.call(work_array[3:]),
-                mocker.call(work_array[3:4]),
-                mocker.call(work_array[4:]),
-            ]
-        )
-        mock_bulk.assert_has_calls(
-            [mocker.call("mock_client", "generator", raise_on_error=False)] * 7
-        )
-
-    def test_save_work_records_retry_success(self, test_instance, mocker):
-        test_instance.es = "mock_client"
-        mock_bulk = mocker.patch("managers.elasticsearch.bulk")
-        mock_gen = mocker.patch.object(ElasticsearchManager, "_upsert_generator")
-        mock_gen.return_value = "generator"
+        mocker.patch("managers.elasticsearch.parallel_bulk", mock_parallel_bulk)
+        mock_sleep = mocker.patch("managers.elasticsearch.time.sleep")
 
-        mock_bulk.side_effect = [
-            ConnectionTimeout("testing"),
-            ("testing", False),
-            ("testing", False),
+        actions = [
+            {"_op_type": "index", "_id": "uuid1"},
+            {"_op_type": "index", "_id": "uuid2"},
         ]
 
-        work_array = [f"work{i}" for i in range(5)]
+        assert test_instance._send_bulk_actions(actions) == []
 
-        test_instance.save_work_records(work_array)
+        assert sent_actions == [actions, [actions[1]]]
+        mock_sleep.assert_called_once_with(1)
+        assert test_instance.dead_letter_works == []
 
-        mock_gen.assert_has_calls(
+    def test_send_bulk_actions_dead_letters_failed_works(self, test_instance, mocker):
+        test_instance.es = "mock_client"
+        mock_bulk = mocker.patch("managers.elasticsearch.parallel_bulk")
+        mock_bulk.side_effect = lambda client, actions, **kwargs: iter(
             [
-                mocker.call(work_array),
-                mocker.call(work_array[:2]),
-                mocker.call(work_array[2:]),
+                (False, {"index": {"_id": action["_id"], "status": 429}})
+                if action["_id"] == "uuid1"
+                else (False, {"index": {"_id": action["_id"], "status": 400}})
+                for action in actions
             ]
         )
+        mock_sleep = mocker.patch("managers.elasticsearch.time.sleep")
 
-        mock_bulk.assert_has_calls(
-            [mocker.call("mock_client", "generator", raise_on_error=False)] * 3
-        )
-
-    def test_save_work_records_retry_partial_failure(self, test_instance, mocker):
-        test_instance.es = "mock_client"
-        mock_bulk = mocker.patch("managers.elasticsearch.bulk")
-        mock_gen = mocker.patch.object(ElasticsearchManager, "_upsert_generator")
-        mock_gen.return_value = "generator"
-
-        mock_bulk.side_effect = [
-            ConnectionTimeout("testing"),  # 0, 1, 2, 3, 4
-            ("testing", False),  # 0, 1
-            ConnectionTimeout("testing"),  # 2, 3, 4
-            ConnectionTimeout("testing"),  # 2
-            ("testing", False),  # 3, 4
+        actions = [
+            {"_op_type": "index", "_id": "uuid1"},
+            {"_op_type": "index", "_id": "uuid2"},
         ]
 
-        work_array = [f"work{i}" for i in range(5)]
+        errors = test_instance._send_bulk_actions(actions)
 
-        test_instance.save_work_records(work_array)
+        assert errors == [{"index": {"_id": "uuid1", "status": 429}}]
+        assert mock_bulk.call_count == 4
+        mock_sleep.assert_has_calls([mocker.call(1), mocker.call(2), mocker.call(4)])
+        assert test_instance.dead_letter_works == ["uuid1"]
 
-        mock_gen.assert_has_calls(
-            [
-                mocker.call(work_array),
-                mocker.call(work_array[:2]),
-                mocker.call(work_array[2:]),
-                mocker.call(work_array[2:3]),
-                mocker.call(work_array[3:]),
-            ]
+    def test_send_bulk_actions_caps_dead_letter_works(self, test_instance, mocker):
+        test_instance.es = "mock_client"
+        test_instance.bulk_max_retries = 0
+        test_instance.dead_letter_max_size = 1
+        mock_bulk = mocker.patch("managers.elasticsearch.parallel_bulk")
+        mock_bulk.side_effect = lambda client, actions, **kwargs: iter(
+            [(False, {"index": {"_id": action["_id"], "status": 400}}) for action in actions]
         )
 
-        mock_bulk.assert_has_calls(
-            [mocker.call("mock_client", "generator", raise_on_error=False)] * 5
+        test_instance._send_bulk_actions(
+            [{"_op_type": "index", "_id": "uuid1"}, {"_op_type": "index", "_id": "uuid2"}]
         )
 
+        assert test_instance.dead_letter_works == ["uuid1"]
+
+    def test_drain_dead_letter_works(self, test_instance):
+        test_instance.dead_letter_works = ["uuid1", "uuid2"]
+
+        assert test_instance.drain_dead_letter_works() == ["uuid1", "uuid2"]
+        assert test_instance.dead_letter_works == []
+
     def test_upsert_generator(self, test_instance, mocker):
         mock_work = mocker.MagicMock(uuid=1)
         mock_work.to_dict.return_value = "mock_work"
@@ -261,6 +399,20 @@ class TestElasticsearchManager:
             }
         ]
 
+    def test_upsert_generator_without_pipeline(self, test_instance, mocker):
+        mock_work = mocker.MagicMock(uuid=1)
+        mock_work.to_dict.return_value = "mock_work"
+        upsert_stmts = [out for out in test_instance._upsert_generator([mock_work], None)]
+
+        assert upsert_stmts == [
+            {
+                "_op_type": "index",
+                "_index": "testES",
+                "_id": 1,
+                "_source": "mock_work",
+            }
+        ]
+
     def test_create_elastic_search_ingest_pipeline(self, test_instance, mocker):
         mock_ingest = mocker.MagicMock()
         mock_client = mocker.patch("managers.elasticsearch.IngestClient")
@@ -474,19 +626,3 @@ class TestElasticsearchManager:
         mock_client.put_pipeline.assert_called_once_with(
             id="test_pipeline", body=test_body
         )
-
-    def test_split_work_batch_even(self):
-        first_half, second_half = ElasticsearchManager._split_work_batch(
-            [i for i in range(10)]
-        )
-
-        assert first_half == [i for i in range(5)]
-        assert second_half == [i for i in range(5, 10)]
-
-    def test_split_work_batch_odd(self):
-        first_half, second_half = ElasticsearchManager._split_work_batch(
-            [i for i in range(13)]
-        )
-
-        assert first_half == [i for i in range(6)]
-        assert second_half == [i for i in range(6, 13)]
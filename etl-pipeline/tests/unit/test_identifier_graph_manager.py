@@ -0,0 +1,54 @@
+import pytest
+
+from managers import IdentifierGraphManager
+
+
+class TestIdentifierGraphManager:
+    @pytest.fixture
+    def test_instance(self, mocker):
+        return IdentifierGraphManager(mocker.MagicMock(), 4)
+
+    def set_hops(self, test_instance, *hops):
+        test_instance.session.execute.return_value.all.side_effect = list(hops)
+
+    def get_query_params(self, test_instance):
+        return [call.args[1] for call in test_instance.session.execute.call_args_list]
+
+    def test_get_matched_record_ids(self, test_instance):
+        self.set_hops(test_instance, [(1, 1), (1, 2)], [(1, 1), (1, 2), (1, 3)], [(1, 2), (1, 3)])
+
+        assert sorted(test_instance.get_matched_record_ids(1)) == [1, 2, 3]
+
+        assert self.get_query_params(test_instance) == [
+            { 'seed_ids': [1], 'frontier_seed_ids': [1], 'frontier_record_ids': [1], 'match_titles': False },
+            { 'seed_ids': [1], 'frontier_seed_ids': [1], 'frontier_record_ids': [2], 'match_titles': True },
+            { 'seed_ids': [1], 'frontier_seed_ids': [1], 'frontier_record_ids': [3], 'match_titles': True }
+        ]
+
+    def test_get_matched_record_ids_stops_at_max_distance(self, test_instance):
+        self.set_hops(test_instance, [(1, 1), (1, 2)], [(1, 3)], [(1, 4)], [(1, 5)], [(1, 6)])
+
+        assert sorted(test_instance.get_matched_record_ids(1)) == [1, 2, 3, 4, 5]
+        assert test_instance.session.execute.call_count == 4
+
+    def test_get_matched_record_ids_limit(self, test_instance):
+        self.set_hops(test_instance, [(1, 1), (1, 2), (1, 3), (1, 4)])
+
+        assert len(test_instance.get_matched_record_ids(1, limit=3)) == 3
+        assert test_instance.session.execute.call_count == 1
+
+    def test_get_matched_record_ids_by_seed(self, test_instance):
+        self.set_hops(test_instance, [(1, 1), (1, 3), (2, 2), (2, 5)], [(1, 1), (2, 3)], [])
+
+        assert test_instance.get_matched_record_ids_by_seed([1, 2, 4]) == {
+            1: set([1, 3]), 2: set([2, 3, 5]), 4: set()
+        }
+
+        assert self.get_query_params(test_instance)[1] == {
+            'seed_ids': [1, 2, 4], 'frontier_seed_ids': [1, 2], 'frontier_record_ids': [3, 5], 'match_titles': True
+        }
+
+    def test_get_matched_record_ids_by_seed_empty(self, test_instance):
+        assert test_instance.get_matched_record_ids_by_seed([]) == {}
+
+        test_instance.session.execute.assert_not_called()
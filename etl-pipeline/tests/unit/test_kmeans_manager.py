@@ -127,8 +127,6 @@ class TestKMeansModel(object):
         mockPipeline.side_effect = ['placePipe', 'pubPipe', 'edPipe', 'datePipe', 'mainPipe']
         mockFeatureUnion = mocker.patch('managers.kMeans.FeatureUnion')
         mockFeatureUnion.return_value = 'testUnion'
-        mockKMeans = mocker.patch('managers.kMeans.KMeans')
-        mockKMeans.return_value = 'testKMeans'
 
         testPipeline = testModel.createPipeline(['place', 'publisher'])
 
@@ -137,8 +135,15 @@ class TestKMeansModel(object):
             transformer_list=[('place', 'placePipe'), ('publisher', 'pubPipe')],
             transformer_weights={'place': 1.0, 'publisher': 1.0}
         )
-        mockKMeans.assert_called_once_with(n_clusters=1, max_iter=100, n_init=3)
-        assert mockPipeline.call_args == mocker.call([('union', 'testUnion'), ('kmeans', 'testKMeans')])
+        assert mockPipeline.call_args == mocker.call([('union', 'testUnion')])
+
+    def test_createKMeans(self, testModel, mocker):
+        mockKMeans = mocker.patch('managers.kMeans.KMeans')
+        mockKMeans.return_value = 'testKMeans'
+        testModel.randomState = 42
+
+        assert testModel.createKMeans(3) == 'testKMeans'
+        mockKMeans.assert_called_once_with(n_clusters=3, max_iter=100, n_init=3, random_state=42)
     
     def test_pubProcessor_str(self):
         cleanStr = KMeansManager.pubProcessor('Testing & Testing,')
@@ -308,10 +313,13 @@ class TestKMeansModel(object):
 
     def test_cluster_score(self, mocker, testModel):
         mockPipeline = mocker.MagicMock()
-        mockPipeline.fit_transform.return_value = 'testLabels'
+        mockPipeline.fit_transform.return_value.shape = (3, 10)
+        mockKMeans = mocker.MagicMock()
+        mockKMeans.fit_predict.return_value = 'testLabels'
 
         mockCreate = mocker.patch.object(KMeansManager, 'createPipeline')
         mockCreate.return_value = mockPipeline
+        mocker.patch.object(KMeansManager, 'createKMeans').return_value = mockKMeans
         mockGetColumns = mocker.patch.object(KMeansManager, 'getDataColumns')
         mockSilhouette = mocker.patch('managers.kMeans.silhouette_score')
         mockSilhouette.return_value = 1
@@ -319,20 +327,95 @@ class TestKMeansModel(object):
         out = testModel.cluster(1, score=True)
         assert out == 1
         mockGetColumns.assert_called_once()
-        mockPipeline.set_params.assert_called_once_with(kmeans=None)
         mockPipeline.fit_transform.assert_called_once()
-        mockSilhouette.assert_called_once()
-    
+        mockSilhouette.assert_called_once_with(
+            mockPipeline.fit_transform.return_value, 'testLabels', sample_size=None, random_state=None
+        )
+
+    def test_cluster_score_sampled(self, mocker, testModel):
+        mockPipeline = mocker.MagicMock()
+        mockPipeline.fit_transform.return_value.shape = (5000, 10)
+        mocker.patch.object(KMeansManager, 'createPipeline').return_value = mockPipeline
+        mocker.patch.object(KMeansManager, 'createKMeans')
+        mocker.patch.object(KMeansManager, 'getDataColumns')
+        mockSilhouette = mocker.patch('managers.kMeans.silhouette_score')
+
+        testModel.cluster(2, score=True)
+
+        assert mockSilhouette.call_args.kwargs['sample_size'] == KMeansManager.SILHOUETTE_SAMPLE_SIZE
+
+    def test_cluster_reuses_feature_matrix(self, mocker, testModel):
+        mockPipeline = mocker.MagicMock()
+        mockPipeline.fit_transform.return_value.shape = (3, 10)
+        mockCreate = mocker.patch.object(KMeansManager, 'createPipeline')
+        mockCreate.return_value = mockPipeline
+        mockCreateKMeans = mocker.patch.object(KMeansManager, 'createKMeans')
+        mocker.patch.object(KMeansManager, 'getDataColumns')
+        mocker.patch('managers.kMeans.silhouette_score').return_value = 0.5
+
+        testModel.cluster(2, score=True)
+        testModel.cluster(3, score=True)
+        testModel.cluster(2, score=True)
+        testModel.cluster(2)
+
+        mockCreate.assert_called_once()
+        mockPipeline.fit_transform.assert_called_once()
+        assert mockCreateKMeans.call_args_list == [mocker.call(2), mocker.call(3)]
+
     def test_cluster_predict(self, mocker, testModel):
         mockPipeline = mocker.MagicMock()
         mockCreate = mocker.patch.object(KMeansManager, 'createPipeline')
         mockGetColumns = mocker.patch.object(KMeansManager, 'getDataColumns')
         mockCreate.return_value = mockPipeline
+        mockKMeans = mocker.patch.object(KMeansManager, 'createKMeans')
 
         testModel.cluster(1)
         mockCreate.assert_called_once()
         mockGetColumns.assert_called_once()
-        mockPipeline.fit_predict.assert_called_once()
+        mockKMeans.return_value.fit_predict.assert_called_once_with(mockPipeline.fit_transform.return_value)
+
+    def test_getK_tiny_cluster(self, mocker, testModel):
+        mockCluster = mocker.patch.object(KMeansManager, 'cluster')
+        testModel.df = pd.DataFrame(['row1', 'row2'])
+
+        testModel.getK(2, 2)
+
+        assert testModel.k == 1
+        mockCluster.assert_not_called()
+
+    def test_generateClusters_matches_full_pipeline(self, mocker):
+        from sklearn.pipeline import Pipeline
+
+        instances = [
+            TestKMeansModel.createInstance(
+                mocker,
+                spatial=place,
+                dates=['{}|publication_date'.format(year)],
+                publisher=['{}|test'.format(publisher)],
+                edition=[],
+                uuid=i
+            )
+            for i, (place, year, publisher) in enumerate([
+                ('New York', '1900', 'Harper'), ('New York', '1900', 'Harper & Brothers'),
+                ('London', '1925', 'Macmillan'), ('London', '1926', 'Macmillan'),
+                ('Paris', '1950', 'Gallimard'), ('Paris', '1950', 'Gallimard'),
+                ('Boston', '1980', 'Little, Brown'), ('New York', '1901', 'Harper')
+            ])
+        ]
+
+        kMeansManager = KMeansManager(instances, randomState=1)
+        kMeansManager.createDF()
+        kMeansManager.generateClusters()
+
+        referenceManager = KMeansManager(instances, randomState=1)
+        referenceManager.createDF()
+        referencePipeline = Pipeline([
+            ('union', referenceManager.createPipeline(referenceManager.getDataColumns()).steps[0][1]),
+            ('kmeans', referenceManager.createKMeans(kMeansManager.k))
+        ])
+
+        assert list(kMeansManager.cluster(kMeansManager.k)) == list(referencePipeline.fit_predict(referenceManager.df))
+        assert sum(len(uuids) for _, uuids in kMeansManager.parseEditions()) == 8
 
     def test_parseEditions(self, testModel, mocker):
         mockConvert = mocker.patch.object(YearObject, 'convertYearDictToStr')
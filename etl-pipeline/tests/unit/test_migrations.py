@@ -0,0 +1,34 @@
+from glob import glob
+import importlib.util
+import os
+import pytest
+from sqlalchemy import text
+
+
+MIGRATION_PATHS = sorted(glob(os.path.join(os.path.dirname(__file__), '../../migrations/versions/*.py')))
+
+
+class TestMigrations:
+    @staticmethod
+    def load_migration(migration_path, mock_op):
+        spec = importlib.util.spec_from_file_location(os.path.basename(migration_path)[:-3], migration_path)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        migration.op = mock_op
+
+        return migration
+
+    @pytest.mark.parametrize('migration_path', MIGRATION_PATHS, ids=os.path.basename)
+    def test_migration_sql_has_no_bind_parameters(self, migration_path, mocker):
+        mock_op = mocker.MagicMock()
+        migration = self.load_migration(migration_path, mock_op)
+
+        migration.upgrade()
+        migration.downgrade()
+
+        # Alembic runs plain strings through text(), which reads :name as a bind parameter
+        for execute_call in mock_op.execute.call_args_list:
+            statement = execute_call.args[0]
+
+            if isinstance(statement, str):
+                assert text(statement)._bindparams == {}, statement
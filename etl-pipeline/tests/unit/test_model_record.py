@@ -65,4 +65,25 @@ class TestModelRecord:
     def test_has_version_russian(self, testRecord):
         testRecord.languages = ['Russian|ru|rus']
         testRecord.has_version = 'второй edition'
-        assert testRecord.has_version == 'второй edition|2'
\ No newline at end of file
+        assert testRecord.has_version == 'второй edition|2'
+
+    def test_generate_content_hash(self, testRecord):
+        content_hash = testRecord.generate_content_hash()
+
+        assert len(content_hash) == 64
+        assert content_hash == testRecord.generate_content_hash()
+
+        testRecord.uuid = 'Other UUID'
+        testRecord.frbr_status = 'complete'
+        assert testRecord.generate_content_hash() == content_hash
+
+        testRecord.title = 'Other Title'
+        assert testRecord.generate_content_hash() != content_hash
+
+    # Timestamps must be evaluated per statement rather than once at import
+    def test_timestamps_evaluated_per_statement(self):
+        date_modified = Record.__table__.c.date_modified
+
+        assert date_modified.default.is_callable
+        assert date_modified.onupdate.is_callable
+        assert Record.__table__.c.date_created.default.is_callable
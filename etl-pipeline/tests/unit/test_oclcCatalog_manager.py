@@ -12,7 +12,7 @@ class TestOCLCCatalogManager:
 
     def test_query_catalog_success(self, testInstance, mocker):
         mockResponse = mocker.MagicMock()
-        mockRequest = mocker.patch('managers.oclc_catalog.requests')
+        mockRequest = mocker.patch.object(testInstance, 'session')
         mockRequest.get.return_value = mockResponse
 
         mock_auth = mocker.patch('managers.oclc_auth.OCLCAuthManager.get_metadata_token')
@@ -32,7 +32,7 @@ class TestOCLCCatalogManager:
 
     def test_query_catalog_error(self, testInstance, mocker):
         mockResponse = mocker.MagicMock()
-        mockRequest = mocker.patch('managers.oclc_catalog.requests')
+        mockRequest = mocker.patch.object(testInstance, 'session')
         mockRequest.get.return_value = mockResponse
 
         mock_auth = mocker.patch('managers.oclc_auth.OCLCAuthManager.get_metadata_token')
@@ -52,7 +52,7 @@ class TestOCLCCatalogManager:
 
     def test_query_catalog_single_retry_then_success(self, testInstance, mocker):
         mockResponse = mocker.MagicMock()
-        mockRequest = mocker.patch('managers.oclc_catalog.requests')
+        mockRequest = mocker.patch.object(testInstance, 'session')
         mockRequest.get.side_effect = [ConnectionError, mockResponse]
 
         mock_auth = mocker.patch('managers.oclc_auth.OCLCAuthManager.get_metadata_token')
@@ -70,7 +70,7 @@ class TestOCLCCatalogManager:
 
     def test_query_catalog_exhaust_retries(self, testInstance, mocker):
         mockResponse = mocker.MagicMock()
-        mockRequest = mocker.patch('managers.oclc_catalog.requests')
+        mockRequest = mocker.patch.object(testInstance, 'session')
         mockRequest.get.side_effect = [ConnectionError, ConnectionError, Timeout]
 
         mock_auth = mocker.patch('managers.oclc_auth.OCLCAuthManager.get_metadata_token')
@@ -86,6 +86,76 @@ class TestOCLCCatalogManager:
             [mocker.call('https://metadata.api.oclc.org/worldcat/manage/bibs/1', timeout=5, headers={'Authorization': 'Bearer foo'})] * 3
         )
 
+    def test_query_catalogs(self, testInstance, mocker):
+        mock_query_catalog = mocker.patch.object(OCLCCatalogManager, 'query_catalog')
+        mock_query_catalog.side_effect = lambda oclc_number: f'catalogRecord{oclc_number}' if oclc_number != 2 else None
+
+        assert testInstance.query_catalogs([1, 2, 3]) == {
+            1: 'catalogRecord1', 2: None, 3: 'catalogRecord3'
+        }
+
+    def test_query_bibs_single_page(self, testInstance, mocker):
+        mock_search = mocker.patch.object(OCLCCatalogManager, '_search_bibs')
+        mock_search.return_value = { 'numberOfRecords': 2, 'bibRecords': ['bib1', 'bib2'] }
+
+        assert testInstance.query_bibs('testQuery') == ['bib1', 'bib2']
+        mock_search.assert_called_once_with(query='testQuery', offset=0)
+
+    def test_query_bibs_fetches_pages_in_parallel(self, testInstance, mocker):
+        mock_search = mocker.patch.object(OCLCCatalogManager, '_search_bibs')
+        pages = {
+            0: { 'numberOfRecords': 150, 'bibRecords': ['bib1'] },
+            50: None,
+            100: { 'numberOfRecords': 150, 'bibRecords': ['bib100'] },
+        }
+        mock_search.side_effect = lambda query, offset: pages[offset]
+
+        assert testInstance.query_bibs('testQuery') == ['bib100']
+        assert sorted(call.kwargs['offset'] for call in mock_search.call_args_list) == [0, 50, 100]
+
+    def test_get_related_oclc_numbers_fetches_pages_in_parallel(self, testInstance, mocker):
+        mock_other_editions = mocker.patch.object(OCLCCatalogManager, '_get_other_editions')
+        pages = {
+            0: { 'numberOfRecords': 120, 'briefRecords': [{ 'oclcNumber': '2' }] },
+            50: { 'numberOfRecords': 120, 'briefRecords': [{ 'oclcNumber': '1' }, { 'oclcNumber': '3' }] },
+            100: { 'numberOfRecords': 120, 'briefRecords': [{ 'oclcNumber': '4' }] },
+        }
+        mock_other_editions.side_effect = lambda oclc_number, offset: pages[offset]
+
+        assert testInstance.get_related_oclc_numbers(1) == [3, 4]
+
+    def test_get_page_offsets(self, testInstance):
+        assert testInstance._get_page_offsets(75) == [50]
+        assert testInstance._get_page_offsets(100) == [50, 100]
+        assert testInstance._get_page_offsets(1000) == [50, 100]
+
+    def test_get_backs_off_when_rate_limited(self, testInstance, mocker):
+        mocker.patch.object(OCLCCatalogManager, '_backoff_until', 0)
+        mock_sleep = mocker.patch('managers.oclc_catalog.time.sleep')
+        mock_monotonic = mocker.patch('managers.oclc_catalog.time.monotonic')
+        mock_monotonic.side_effect = [100, 100, 101]
+        rate_limited_response = mocker.MagicMock(status_code=429, headers={ 'Retry-After': '3' })
+        success_response = mocker.MagicMock(status_code=200)
+        testInstance.session = mocker.MagicMock()
+        testInstance.session.get.side_effect = [rate_limited_response, success_response]
+
+        assert testInstance._get('testUrl', params={}) == success_response
+
+        assert testInstance.rate_limited is True
+        assert OCLCCatalogManager._backoff_until == 103
+        mock_sleep.assert_called_once_with(2)
+        testInstance.session.get.assert_has_calls([mocker.call('testUrl', params={})] * 2)
+
+    def test_get_gives_up_after_retries(self, testInstance, mocker):
+        mocker.patch.object(OCLCCatalogManager, '_backoff_until', 0)
+        mocker.patch('managers.oclc_catalog.time.sleep')
+        rate_limited_response = mocker.MagicMock(status_code=429, headers={})
+        testInstance.session = mocker.MagicMock()
+        testInstance.session.get.return_value = rate_limited_response
+
+        assert testInstance._get('testUrl') == rate_limited_response
+        assert testInstance.session.get.call_count == OCLCCatalogManager.RATE_LIMIT_RETRIES
+
     def test_generate_search_query_w_identifier(self, testInstance):
         assert testInstance.generate_search_query(identifier_type="issn", identifier=1) == "in: 1"
 
@@ -79,6 +79,27 @@ class TestRabbitMQManager:
         test_instance.channel.queue_declare.assert_called_once_with(queue='testQueue', durable=True)
         test_instance.channel.queue_bind.assert_called_once_with(exchange='exchng', queue='testQueue', routing_key='testKey')
 
+    def test_set_prefetch_count(self, test_instance, mocker):
+        test_instance.channel = mocker.MagicMock()
+
+        test_instance.set_prefetch_count(10)
+
+        test_instance.channel.basic_qos.assert_called_once_with(prefetch_count=10)
+
+    def test_consume_messages(self, test_instance, mocker):
+        test_instance.channel = mocker.MagicMock()
+        test_instance.channel.consume.return_value = 'testConsumer'
+
+        assert test_instance.consume_messages('testQueue', inactivity_timeout=1) == 'testConsumer'
+        test_instance.channel.consume.assert_called_once_with('testQueue', inactivity_timeout=1)
+
+    def test_add_threadsafe_callback(self, test_instance, mocker):
+        test_instance.connection = mocker.MagicMock()
+
+        test_instance.add_threadsafe_callback('testCallback')
+
+        test_instance.connection.add_callback_threadsafe.assert_called_once_with('testCallback')
+
     def test_send_message_to_queue_string(self, test_instance, mocker):
         test_instance.channel = mocker.MagicMock()
 
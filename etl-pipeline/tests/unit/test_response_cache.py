@@ -0,0 +1,109 @@
+import json
+import pytest
+
+from managers import ResponseCache
+
+
+class TestResponseCache:
+    @pytest.fixture
+    def test_instance(self, mocker):
+        mocker.patch.dict('os.environ', {'ENVIRONMENT': 'testEnv', 'API_RESPONSE_CACHE_TTL': '60'})
+
+        return ResponseCache(mocker.MagicMock())
+
+    def test_get_or_build_cache_hit(self, test_instance, mocker):
+        test_instance.client.get.return_value = b'{"title": "Test Work"}'
+        mock_build = mocker.MagicMock()
+        mock_record = mocker.patch.object(ResponseCache, 'record_request')
+
+        cached_response = test_instance.get_or_build('works', 'testUUID', {'showAll': True}, mock_build)
+
+        assert cached_response == {'title': 'Test Work'}
+        mock_build.assert_not_called()
+        mock_record.assert_called_once_with('works', hit=True, latency=mocker.ANY)
+
+    def test_get_or_build_cache_miss(self, test_instance, mocker):
+        test_instance.client.get.return_value = None
+        mock_pipe = test_instance.client.pipeline.return_value
+        mock_record = mocker.patch.object(ResponseCache, 'record_request')
+
+        response = test_instance.get_or_build(
+            'works', 'testUUID', {'showAll': True}, lambda: ({'title': 'Test Work'}, [1, 2])
+        )
+
+        response_key = test_instance._get_response_key('works', 'testUUID', {'showAll': True})
+
+        assert response == {'title': 'Test Work'}
+        assert response_key.startswith('testEnv/response-cache/works/testUUID/')
+        mock_pipe.set.assert_called_once_with(response_key, json.dumps({'title': 'Test Work'}), ex=60)
+        mock_pipe.sadd.assert_has_calls([
+            mocker.call('testEnv/response-cache/works-index/1', response_key),
+            mocker.call('testEnv/response-cache/works-index/2', response_key)
+        ], any_order=True)
+        mock_pipe.execute.assert_called_once()
+        mock_record.assert_called_once_with('works', hit=False, latency=mocker.ANY)
+
+    def test_get_or_build_missing_response(self, test_instance, mocker):
+        test_instance.client.get.return_value = None
+        mocker.patch.object(ResponseCache, 'record_request')
+
+        assert test_instance.get_or_build('works', 'testUUID', {}, lambda: (None, [])) is None
+        test_instance.client.pipeline.assert_not_called()
+
+    def test_get_disabled(self, test_instance):
+        test_instance.enabled = False
+
+        assert test_instance.get('works', 'testUUID', {}) is None
+        test_instance.client.get.assert_not_called()
+
+    def test_get_redis_error(self, test_instance):
+        test_instance.client.get.side_effect = Exception('connection refused')
+
+        assert test_instance.get('works', 'testUUID', {}) is None
+
+    def test_response_key_depends_on_params(self, test_instance):
+        assert test_instance._get_response_key('works', 'testUUID', {'showAll': True, 'formats': []}) \
+            == test_instance._get_response_key('works', 'testUUID', {'formats': [], 'showAll': True})
+        assert test_instance._get_response_key('works', 'testUUID', {'showAll': True}) \
+            != test_instance._get_response_key('works', 'testUUID', {'showAll': False})
+
+    def test_invalidate_works(self, test_instance):
+        mock_pipe = test_instance.client.pipeline.return_value
+        mock_pipe.execute.return_value = [{b'responseKey1', b'responseKey2'}, {b'responseKey2'}]
+
+        test_instance.invalidate_works([1, 2, None])
+
+        assert mock_pipe.smembers.call_count == 2
+        deleted_keys = test_instance.client.delete.call_args.args
+        assert sorted(deleted_keys, key=str) == sorted([
+            b'responseKey1', b'responseKey2',
+            'testEnv/response-cache/works-index/1', 'testEnv/response-cache/works-index/2'
+        ], key=str)
+
+    def test_invalidate_works_no_works(self, test_instance):
+        test_instance.invalidate_works(set())
+
+        test_instance.client.pipeline.assert_not_called()
+
+    def test_get_metrics(self, test_instance):
+        test_instance.client.hgetall.side_effect = [
+            {b'hit_count': b'3', b'hit_latency_ms': b'6.0', b'miss_count': b'1', b'miss_latency_ms': b'40.5'},
+            {}
+        ]
+
+        assert test_instance.get_metrics(['works', 'editions']) == {
+            'works': {
+                'hits': 3,
+                'misses': 1,
+                'hitRatio': 0.75,
+                'averageHitLatencyMs': 2.0,
+                'averageMissLatencyMs': 40.5
+            },
+            'editions': {
+                'hits': 0,
+                'misses': 0,
+                'hitRatio': None,
+                'averageHitLatencyMs': None,
+                'averageMissLatencyMs': None
+            }
+        }
@@ -1,5 +1,8 @@
-from botocore.exceptions import ClientError
+from botocore.exceptions import ClientError, EndpointConnectionError
+from io import BytesIO
+import json
 import pytest
+from zipfile import ZipFile
 
 from managers.s3 import S3Manager, S3Error
 
@@ -10,6 +13,7 @@ class TestS3Manager:
         class TestS3Manager(S3Manager):
             
             def __init__(self):
+                self.epub_upload_workers = 2
                 self.client = mocker.MagicMock()
         
         return TestS3Manager()
@@ -92,25 +96,250 @@ class TestS3Manager:
         with pytest.raises(S3Error):
             test_instance.put_object('testObj', 'testKey', 'testBucket')
 
-    def test_store_epub(self, test_instance: S3Manager, mocker):
-        mock_epub_zip_component = mocker.MagicMock()
-        mock_epub_zip_component.read.side_effect = ['compBytes1', 'compBytes2']
+    @pytest.fixture
+    def mock_epub_zip(self, mocker):
+        components = {'comp1': b'compBytes1', 'comp2': b'compBytes2'}
 
         mock_epub_zip = mocker.MagicMock()
-        mock_epub_zip.namelist.return_value = ['comp1', 'comp2']
-        mock_epub_zip.open.return_value = mock_epub_zip_component
+        mock_epub_zip.namelist.return_value = list(components.keys())
+        mock_epub_zip.open.side_effect = lambda component: mocker.MagicMock(read=mocker.MagicMock(return_value=components[component]))
 
         mock_zip_package = mocker.patch('managers.s3.ZipFile')
         mock_zip_package.return_value.__enter__.return_value = mock_epub_zip
 
-        mock_put = mocker.patch.object(S3Manager, 'put_object')
+        mock_generate_manifest = mocker.patch.object(S3Manager, 'generate_epub_manifest')
+        mock_generate_manifest.return_value = 'testWebpub'
+
+        return mock_epub_zip
+
+    def test_store_epub(self, test_instance: S3Manager, mock_epub_zip, mocker):
+        mocker.patch.object(S3Manager, 'get_object', side_effect=S3Error('missing'))
+
+        test_instance.store_epub(b'testObj', '10.10/testKey.epub', 'testBucket')
+
+        comp1_md5 = S3Manager.get_md5_hash(b'compBytes1')
+        comp2_md5 = S3Manager.get_md5_hash(b'compBytes2')
+
+        test_instance.client.put_object.assert_has_calls([
+            mocker.call(
+                ACL='public-read', Body=b'compBytes1', Bucket='testBucket', Key='10.10/testKey/comp1',
+                ContentMD5=comp1_md5, ContentType='binary/octet-stream', Metadata={'md5Checksum': comp1_md5}
+            ),
+            mocker.call(
+                ACL='public-read', Body=b'compBytes2', Bucket='testBucket', Key='10.10/testKey/comp2',
+                ContentMD5=comp2_md5, ContentType='binary/octet-stream', Metadata={'md5Checksum': comp2_md5}
+            ),
+            mocker.call(
+                Body=json.dumps({'comp1': comp1_md5, 'comp2': comp2_md5}).encode('utf-8'),
+                Bucket='testBucket', Key='10.10/testKey.components.json', ContentType='application/json'
+            ),
+            mocker.call(
+                ACL='public-read', Body=b'testWebpub', Bucket='testBucket', Key='10.10/testKey/manifest.json',
+                ContentMD5=S3Manager.get_md5_hash(b'testWebpub'), ContentType='application/json',
+                Metadata={'md5Checksum': S3Manager.get_md5_hash(b'testWebpub')}
+            )
+        ], any_order=True)
+        assert test_instance.client.put_object.call_count == 4
+        S3Manager.generate_epub_manifest.assert_called_once_with(mock_epub_zip, '10.10/testKey.epub', 'testBucket')
+
+    def test_store_epub_skips_unchanged_components(self, test_instance: S3Manager, mock_epub_zip, mocker):
+        comp1_md5 = S3Manager.get_md5_hash(b'compBytes1')
+        comp2_md5 = S3Manager.get_md5_hash(b'compBytes2')
+
+        mock_get = mocker.patch.object(S3Manager, 'get_object')
+        mock_get.return_value = {'Body': BytesIO(json.dumps({'comp1': comp1_md5, 'comp2': 'outdatedMd5'}).encode('utf-8'))}
+
+        test_instance.store_epub(b'testObj', '10.10/testKey.epub', 'testBucket')
+
+        mock_get.assert_called_once_with('10.10/testKey.components.json', 'testBucket')
+        test_instance.client.put_object.assert_has_calls([
+            mocker.call(
+                ACL='public-read', Body=b'compBytes2', Bucket='testBucket', Key='10.10/testKey/comp2',
+                ContentMD5=comp2_md5, ContentType='binary/octet-stream', Metadata={'md5Checksum': comp2_md5}
+            ),
+            mocker.call(
+                Body=json.dumps({'comp1': comp1_md5, 'comp2': comp2_md5}).encode('utf-8'),
+                Bucket='testBucket', Key='10.10/testKey.components.json', ContentType='application/json'
+            )
+        ])
+        assert test_instance.client.put_object.call_count == 3
+
+    def test_store_epub_component_error(self, test_instance: S3Manager, mock_epub_zip, mocker):
+        mocker.patch.object(S3Manager, 'get_object', side_effect=S3Error('missing'))
+
+        def put_epub_component(component_contents, component_md5, key, bucket):
+            if key.endswith('comp2'):
+                raise ClientError({}, 'Testing')
+
+        mocker.patch.object(S3Manager, '_put_epub_component', side_effect=put_epub_component)
+
+        with pytest.raises(S3Error):
+            test_instance.store_epub(b'testObj', '10.10/testKey.epub', 'testBucket')
+
+        test_instance.client.put_object.assert_any_call(
+            Body=json.dumps({'comp1': S3Manager.get_md5_hash(b'compBytes1')}).encode('utf-8'),
+            Bucket='testBucket', Key='10.10/testKey.components.json', ContentType='application/json'
+        )
+
+    def test_store_epub_component_connection_error(self, test_instance: S3Manager, mock_epub_zip, mocker):
+        mocker.patch.object(S3Manager, 'get_object', side_effect=S3Error('missing'))
+
+        def put_epub_component(component_contents, component_md5, key, bucket):
+            if key.endswith('comp1'):
+                raise EndpointConnectionError(endpoint_url='https://s3.amazonaws.com')
+
+        mocker.patch.object(S3Manager, '_put_epub_component', side_effect=put_epub_component)
+
+        with pytest.raises(S3Error):
+            test_instance.store_epub(b'testObj', '10.10/testKey.epub', 'testBucket')
+
+        test_instance.client.put_object.assert_any_call(
+            Body=json.dumps({'comp2': S3Manager.get_md5_hash(b'compBytes2')}).encode('utf-8'),
+            Bucket='testBucket', Key='10.10/testKey.components.json', ContentType='application/json'
+        )
+
+    def test_store_epub_upload_windows(self, test_instance: S3Manager, mock_epub_zip, mocker):
+        mocker.patch.object(S3Manager, 'get_object', side_effect=S3Error('missing'))
+        test_instance.epub_upload_workers = 1
+
+        window_sizes = []
+        collect_uploads = S3Manager._collect_component_uploads
+
+        def collect_component_uploads(self, component_uploads, *args):
+            window_sizes.append(len(component_uploads))
+            return collect_uploads(self, component_uploads, *args)
+
+        mocker.patch.object(S3Manager, '_collect_component_uploads', collect_component_uploads)
+
+        test_instance.store_epub(b'testObj', '10.10/testKey.epub', 'testBucket')
+
+        assert window_sizes == [1, 1, 0]
+
+    def test_store_epub_manifest_error(self, test_instance: S3Manager, mock_epub_zip, mocker):
+        mocker.patch.object(S3Manager, 'get_object', side_effect=S3Error('missing'))
+        S3Manager.generate_epub_manifest.side_effect = Exception('invalid package')
 
         test_instance.store_epub(b'testObj', '10.10/testKey.epub', 'testBucket')
 
-        mock_put.assert_has_calls([
-            mocker.call(object='compBytes1', key='10.10/testKey/comp1', bucket='testBucket'),
-            mocker.call(object='compBytes2', key='10.10/testKey/comp2', bucket='testBucket')
+        stored_keys = [call.kwargs['Key'] for call in test_instance.client.put_object.call_args_list]
+        assert '10.10/testKey/manifest.json' not in stored_keys
+        assert '10.10/testKey.components.json' in stored_keys
+
+    def test_put_object_epub_manifest_error(self, test_instance: S3Manager, mocker):
+        mocker.patch.object(S3Manager, 'get_object', side_effect=S3Error('missing'))
+        mocker.patch('managers.s3.WebpubManifest.fromEpub', side_effect=Exception('invalid package'))
+
+        epub_file = BytesIO()
+
+        with ZipFile(epub_file, 'w') as epub_zip:
+            epub_zip.writestr('mimetype', 'application/epub+zip')
+
+        test_instance.put_object(epub_file.getvalue(), 'testKey.epub', 'testBucket')
+
+        stored_keys = [call.kwargs['Key'] for call in test_instance.client.put_object.call_args_list]
+        assert 'testKey.epub' in stored_keys
+        assert 'testKey/manifest.json' not in stored_keys
+
+    def test_generate_epub_manifest(self, test_instance: S3Manager, mocker):
+        mock_from_epub = mocker.patch('managers.s3.WebpubManifest.fromEpub')
+        mock_from_epub.return_value.toJson.return_value = 'testWebpub'
+
+        assert test_instance.generate_epub_manifest('testZip', 'epubs/test/1.epub', 'testBucket') == 'testWebpub'
+
+        mock_from_epub.assert_called_once_with(
+            'testZip',
+            epubURL='https://testBucket.s3.amazonaws.com/epubs/test/1.epub',
+            rootURL='https://testBucket.s3.amazonaws.com/epubs/test/1',
+            manifestURL='https://testBucket.s3.amazonaws.com/epubs/test/1/manifest.json'
+        )
+
+    def test_put_object_stream_small_object(self, test_instance: S3Manager):
+        checksum = test_instance.put_object_stream(iter([b'test', b'File']), 'testKey.pdf', 'testBucket')
+
+        assert checksum == S3Manager.get_md5_hash(b'testFile')
+        test_instance.client.create_multipart_upload.assert_not_called()
+        test_instance.client.put_object.assert_called_once_with(
+            ACL='public-read', Body=b'testFile', Bucket='testBucket',
+            Key='testKey.pdf', ContentType='application/pdf',
+            ContentMD5=checksum, Metadata={'md5Checksum': checksum}
+        )
+
+    def test_put_object_stream_multipart(self, test_instance: S3Manager, mocker):
+        mocker.patch.object(S3Manager, 'MULTIPART_CHUNK_SIZE', 4)
+        test_instance.client.create_multipart_upload.return_value = {'UploadId': 'testUploadId'}
+        test_instance.client.upload_part.side_effect = [{'ETag': 'etag1'}, {'ETag': 'etag2'}, {'ETag': 'etag3'}]
+
+        checksum = test_instance.put_object_stream(iter([b'te', b'st', b'Fil', b'e', b'!']), 'testKey.pdf', 'testBucket')
+
+        assert checksum == S3Manager.get_md5_hash(b'testFile!')
+        test_instance.client.put_object.assert_not_called()
+        test_instance.client.create_multipart_upload.assert_called_once_with(
+            ACL='public-read', Bucket='testBucket', Key='testKey.pdf', ContentType='application/pdf', Metadata={}
+        )
+        test_instance.client.upload_part.assert_has_calls([
+            mocker.call(
+                Body=b'test', Bucket='testBucket', Key='testKey.pdf', PartNumber=1,
+                UploadId='testUploadId', ContentMD5=S3Manager.get_md5_hash(b'test')
+            ),
+            mocker.call(
+                Body=b'File', Bucket='testBucket', Key='testKey.pdf', PartNumber=2,
+                UploadId='testUploadId', ContentMD5=S3Manager.get_md5_hash(b'File')
+            ),
+            mocker.call(
+                Body=b'!', Bucket='testBucket', Key='testKey.pdf', PartNumber=3,
+                UploadId='testUploadId', ContentMD5=S3Manager.get_md5_hash(b'!')
+            )
         ])
+        test_instance.client.complete_multipart_upload.assert_called_once_with(
+            Bucket='testBucket',
+            Key='testKey.pdf',
+            UploadId='testUploadId',
+            MultipartUpload={'Parts': [
+                {'ETag': 'etag1', 'PartNumber': 1},
+                {'ETag': 'etag2', 'PartNumber': 2},
+                {'ETag': 'etag3', 'PartNumber': 3}
+            ]}
+        )
+
+    def test_put_object_stream_multipart_error(self, test_instance: S3Manager, mocker):
+        mocker.patch.object(S3Manager, 'MULTIPART_CHUNK_SIZE', 4)
+        test_instance.client.create_multipart_upload.return_value = {'UploadId': 'testUploadId'}
+        test_instance.client.upload_part.side_effect = ClientError({}, 'Testing')
+
+        with pytest.raises(S3Error):
+            test_instance.put_object_stream(iter([b'testFile']), 'testKey.pdf', 'testBucket')
+
+        test_instance.client.abort_multipart_upload.assert_called_once_with(
+            Bucket='testBucket', Key='testKey.pdf', UploadId='testUploadId'
+        )
+        test_instance.client.complete_multipart_upload.assert_not_called()
+
+    def test_put_object_stream_epub(self, test_instance: S3Manager, mocker):
+        mocker.patch.object(S3Manager, 'get_object', side_effect=S3Error('missing'))
+        stored_components = []
+        mock_store_epub = mocker.patch.object(S3Manager, 'store_epub')
+        mock_store_epub.side_effect = lambda epub_file, key, bucket: stored_components.append(epub_file.read())
+
+        checksum = test_instance.put_object_stream(iter([b'test', b'Epub']), 'testKey.epub', 'testBucket')
+
+        assert checksum == S3Manager.get_md5_hash(b'testEpub')
+        assert stored_components == [b'testEpub']
+        test_instance.client.put_object.assert_called_once_with(
+            ACL='public-read', Body=b'testEpub', Bucket='testBucket',
+            Key='testKey.epub', ContentType='application/epub+zip',
+            ContentMD5=checksum, Metadata={'md5Checksum': checksum}
+        )
+
+    def test_put_object_stream_epub_unmodified(self, test_instance: S3Manager, mocker):
+        mock_get = mocker.patch.object(S3Manager, 'get_object')
+        mock_get.return_value = {'ResponseMetadata': {'HTTPStatusCode': 304}}
+        mock_store_epub = mocker.patch.object(S3Manager, 'store_epub')
+
+        assert test_instance.put_object_stream(iter([b'testEpub']), 'testKey.epub', 'testBucket') is None
+
+        mock_get.assert_called_once_with('testKey.epub', 'testBucket', md5_hash=S3Manager.get_md5_hash(b'testEpub'))
+        mock_store_epub.assert_not_called()
+        test_instance.client.put_object.assert_not_called()
 
     def test_get_object_success(self, test_instance: S3Manager):
         test_instance.client.get_object.return_value = 'testObject'
@@ -2,6 +2,7 @@ from elasticsearch.exceptions import ConnectionTimeout
 import pytest
 
 from managers import SFRElasticRecordManager
+from model import PerLanguageField
 
 
 class TestSFRElasticRecordManager:
@@ -56,14 +57,44 @@ class TestSFRElasticRecordManager:
 
     def test_getCreateWork(self, testInstance, mocker):
         mockEnhance = mocker.patch.object(SFRElasticRecordManager, 'enhanceWork')
+        mockHash = mocker.patch.object(SFRElasticRecordManager, 'generateContentHash')
+        mockHash.return_value = 'testHash'
         mockESWork = mocker.patch('managers.sfrElasticRecord.ESWork')
-        mockESWork.return_value = 'testESWork'
+        mockWork = mocker.MagicMock()
+        mockESWork.return_value = mockWork
 
         testInstance.getCreateWork()
 
-        assert testInstance.work == 'testESWork'
+        assert testInstance.work == mockWork
+        assert testInstance.work.content_hash == 'testHash'
         mockESWork.assert_called_once()
         mockEnhance.assert_called_once()
+        mockHash.assert_called_once_with(mockWork)
+
+    def test_generateContentHash(self, mocker):
+        testWork = mocker.MagicMock()
+        testWork.to_dict.return_value = {
+            'uuid': 'testUUID',
+            'content_hash': 'oldHash',
+            'editions': [{'edition_id': 1, 'formats': ['a', 'b']}, {'edition_id': 2}]
+        }
+        reorderedWork = mocker.MagicMock()
+        reorderedWork.to_dict.return_value = {
+            'editions': [{'edition_id': 2}, {'formats': ['b', 'a'], 'edition_id': 1}],
+            'uuid': 'testUUID',
+            'date_modified': '2024-01-01T00:00:00'
+        }
+        changedWork = mocker.MagicMock()
+        changedWork.to_dict.return_value = {
+            'uuid': 'testUUID',
+            'editions': [{'edition_id': 1, 'formats': ['a', 'b']}, {'edition_id': 3}]
+        }
+
+        testHash = SFRElasticRecordManager.generateContentHash(testWork)
+
+        assert len(testHash) == 64
+        assert SFRElasticRecordManager.generateContentHash(reorderedWork) == testHash
+        assert SFRElasticRecordManager.generateContentHash(changedWork) != testHash
 
     def test_saveWork(self, testInstance, mocker):
         testInstance.work = mocker.MagicMock()
@@ -121,6 +152,7 @@ class TestSFRElasticRecordManager:
         assert testInstance.work.languages[0].language == 'Language 1'
         assert testInstance.work.is_government_document is False
         assert testInstance.work.editions == ['Edition 1', 'Edition 2', 'Edition 3']
+        assert testInstance.work.display == {}
 
     def test_addAgent_with_roles(self):
         testAgent = SFRElasticRecordManager.addAgent({'name': 'Test Agent', 'roles': ['Role 1', 'Role 2']})
@@ -163,11 +195,13 @@ class TestSFRElasticRecordManager:
             SFRElasticRecordManager,
             addAgent=mocker.DEFAULT,
             addAvailableFormats=mocker.DEFAULT,
+            createEditionDisplay=mocker.DEFAULT,
         )
         managerMocks['addAgent'].side_effect = [
             {'agent': 'Agent 1'}, {'agent': 'Agent 2'}, {'agent': 'Agent 3'}
         ]
         managerMocks['addAvailableFormats'].return_value = ['test/format1', 'test/format2']
+        managerMocks['createEditionDisplay'].return_value = {'title': 'Test Title'}
 
         mockIdentifier = mocker.patch('managers.sfrElasticRecord.ESIdentifier')
         mockIdentifier.side_effect = [i[1][1] for i in testDBEdition.identifiers]
@@ -188,6 +222,104 @@ class TestSFRElasticRecordManager:
         assert testEdition.rights == ['Rights 1', 'Rights 2']
         assert testEdition.languages == ['Lang 1', 'Lang 2']
         assert set(testEdition.formats) == set(['test/format1', 'test/format2'])
+        assert testEdition.display.title == 'Test Title'
+        managerMocks['createEditionDisplay'].assert_called_once_with(testDBEdition)
+
+    @pytest.fixture
+    def fakeRecord(self):
+        class FakeRecord:
+            def __init__(self, fields, **attributes):
+                self.fields = fields
+                self.__dict__.update(attributes)
+
+            def __iter__(self):
+                return iter(self.fields.items())
+
+        return FakeRecord
+
+    def test_createWorkDisplay(self, fakeRecord):
+        testWork = fakeRecord({'title': 'Test Title', 'authors': [{'name': 'Author 1'}]})
+
+        testDisplay = SFRElasticRecordManager.createWorkDisplay(testWork)
+
+        assert testDisplay == {'title': 'Test Title', 'authors': [{'name': 'Author 1'}]}
+
+        SFRElasticRecordManager.addAgent(testDisplay['authors'][0])
+
+        assert testDisplay['authors'][0]['roles'] == ['author']
+
+    def test_createEditionDisplay(self, fakeRecord, mocker):
+        testLink = mocker.MagicMock(id=3, media_type='application/pdf', url='test.pdf', flags={'download': True})
+        testRights = mocker.MagicMock(source='test', license='public_domain', rights_statement='Public Domain')
+        testItem = fakeRecord(
+            {'source': 'test'}, id=2, physical_location={'name': 'test'}, links=[testLink], rights=[testRights]
+        )
+        testUnlinkedItem = fakeRecord({'source': 'test'}, links=[])
+
+        testEdition = fakeRecord({'title': 'Test Title'}, id=1, links=[], items=[testItem, testUnlinkedItem])
+
+        assert SFRElasticRecordManager.createEditionDisplay(testEdition) == {
+            'title': 'Test Title',
+            'id': 1,
+            'links': [],
+            'items': [{
+                'source': 'test',
+                'id': 2,
+                'physical_location': {'name': 'test'},
+                'links': [{'id': 3, 'media_type': 'application/pdf', 'url': 'test.pdf', 'flags': {'download': True}}],
+                'rights': [{'source': 'test', 'license': 'public_domain', 'rights_statement': 'Public Domain'}]
+            }]
+        }
+
+    def test_detectLanguages(self, mocker):
+        mockModel = mocker.MagicMock()
+        mockModel.predict.return_value = (
+            [['__label__es'], ['__label__en'], ['__label__xx']],
+            [[0.9], [0.5], [0.99]]
+        )
+        mocker.patch.object(SFRElasticRecordManager, 'loadLanguageModel').return_value = mockModel
+
+        testTitle = PerLanguageField(default='La historia\ndel mundo')
+        testAltTitle = PerLanguageField(default='A History')
+        testHeading = PerLanguageField(default='Heading')
+        testWork = mocker.MagicMock(
+            title=testTitle,
+            alt_titles=[testAltTitle],
+            editions=[mocker.MagicMock(title=PerLanguageField(default=None), sub_title=None)],
+            subjects=[mocker.MagicMock(heading=testHeading)]
+        )
+
+        assert SFRElasticRecordManager.detectLanguages([testWork]) is True
+
+        mockModel.predict.assert_called_once_with(['La historia del mundo', 'A History', 'Heading'], k=1)
+        assert testTitle.language == 'es'
+        assert testTitle.sp == 'La historia\ndel mundo'
+        assert testAltTitle.language == 'en'
+        assert testAltTitle.en is None
+        assert testHeading.language == 'xx'
+
+    def test_detectLanguages_disabled(self, mocker):
+        mocker.patch.dict('os.environ', {'LOCAL_LANGUAGE_DETECTION': 'false'})
+        mockLoad = mocker.patch.object(SFRElasticRecordManager, 'loadLanguageModel')
+
+        assert SFRElasticRecordManager.detectLanguages([mocker.MagicMock()]) is False
+
+        mockLoad.assert_not_called()
+
+    def test_detectLanguages_model_unavailable(self, mocker):
+        mocker.patch.object(SFRElasticRecordManager, 'loadLanguageModel').side_effect = ValueError('Missing model')
+
+        assert SFRElasticRecordManager.detectLanguages([mocker.MagicMock()]) is False
+
+    def test_loadLanguageModel(self, mocker):
+        mocker.patch.object(SFRElasticRecordManager, 'languageModel', None)
+        mockFasttext = mocker.patch('managers.sfrElasticRecord.fasttext')
+        mockFasttext.load_model.return_value = 'testModel'
+
+        assert SFRElasticRecordManager.loadLanguageModel() == 'testModel'
+        assert SFRElasticRecordManager.loadLanguageModel() == 'testModel'
+
+        mockFasttext.load_model.assert_called_once_with('lid.176.ftz')
 
     def test_addAvailableFormats(self, mocker):
         mockItem1 = mocker.MagicMock()
@@ -1,8 +1,10 @@
 import pytest
 
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
+from uuid import uuid4
 
-from managers import SFRRecordManager
+from managers import ElasticsearchIndexBuffer, ElasticsearchManager, SFRElasticRecordManager, SFRRecordManager
+from model import Edition, Item, Link, Work
 
 
 class TestSFRRecordManager:
@@ -47,6 +49,19 @@ class TestSFRRecordManager:
         assert isinstance(testInstance.work, mocker.MagicMock)
         assert isinstance(testInstance.session, mocker.MagicMock)
 
+    def test_requeueWorks(self, mocker):
+        mockSession = mocker.MagicMock()
+        mockSession.query.return_value.filter.return_value.update.return_value = 3
+
+        assert SFRRecordManager.requeueWorks(mockSession, ['uuid1']) == 3
+
+        mockSession.query.return_value.filter.return_value.update.assert_called_once_with(
+            {'cluster_status': False}, synchronize_session=False
+        )
+        requeueFilter = str(mockSession.query.return_value.filter.call_args[0][0])
+        assert 'unnest(editions.dcdw_uuids)' in requeueFilter
+        assert 'works.uuid IN' in requeueFilter
+
     def test_mergeRecords(self, testInstance, mocker):
         recordMocks = mocker.patch.multiple(
             SFRRecordManager,
@@ -56,7 +71,7 @@ class TestSFRRecordManager:
         )
         recordMocks['dedupeIdentifiers'].return_value = ['id1', 'id2', 'id3']
         recordMocks['dedupeLinks'].side_effect = [
-            ['url1'], ['url2'], ['url3'], ['url4']
+            ['edUrl1'], ['url1'], ['url2'], ['edUrl2'], ['url3'], ['url4']
         ]
 
         firstEdItems = [
@@ -82,16 +97,128 @@ class TestSFRRecordManager:
         testInstance.session.query().join().filter().filter().all.return_value\
             = matchingWorks
         testInstance.session.merge.return_value = testInstance.work
+        mockAssignEditionIDs = mocker.patch.object(SFRRecordManager, 'assignExistingEditionIDs')
 
         testUUIDsToDelete = testInstance.mergeRecords()
 
-        assert testUUIDsToDelete == [4, 3, 2]
+        assert testUUIDsToDelete == [3, 2]
+        assert testInstance.work.id == 4
         assert testInstance.work.uuid == 4
         assert testInstance.work.date_created == '2018-01-01'
+        assert testInstance.work.date_modified > datetime(2024, 1, 1)
+        assert [edition.links for edition in testInstance.work.editions] == [['edUrl1'], ['edUrl2']]
+        mockAssignEditionIDs.assert_called_once_with(4)
 
         testInstance.session.query().join().filter().filter().all.assert_called_once()
         testInstance.session.merge.assert_called_once_with(testInstance.work)
 
+    def test_assignExistingEditionIDs(self, testInstance, mocker):
+        existingLink = mocker.MagicMock(url='example.com/book.epub')
+        existingItems = [
+            mocker.MagicMock(id=11, record_id=5, links=[existingLink]),
+            mocker.MagicMock(id=10, record_id=4, links=[existingLink])
+        ]
+        existingEditions = [
+            mocker.MagicMock(id=1, dcdw_uuids=['00000000-0000-0000-0000-000000000001'], items=existingItems),
+            mocker.MagicMock(id=2, dcdw_uuids=['00000000-0000-0000-0000-000000000002'], items=[])
+        ]
+        testInstance.session.query().filter().order_by().all.return_value = existingEditions
+
+        newLink = mocker.MagicMock(url='example.com/book.epub')
+        matchedItem = mocker.MagicMock(id=None, record_id=5, links=[newLink])
+        newItem = mocker.MagicMock(id=None, record_id=6, links=[newLink])
+        matchedEdition = mocker.MagicMock(
+            id=None, dcdw_uuids=['00000000000000000000000000000001'], items=[matchedItem, newItem]
+        )
+        newEdition = mocker.MagicMock(id=None, dcdw_uuids=['00000000000000000000000000000003'], items=[])
+        testInstance.work.editions = [matchedEdition, newEdition]
+
+        testInstance.assignExistingEditionIDs(4)
+
+        assert matchedEdition.id == 1
+        assert matchedItem.id == 11
+        assert newItem.id is None
+        assert newEdition.id is None
+
+    def test_mergeRecords_recluster_unchanged_records(self, mocker):
+        recordUUID = uuid4()
+        workUUID = uuid4()
+
+        def buildWork(workID=None, editionID=None, itemID=None, linkIDs=(None, None), dcdwUUID=None):
+            coverLinkID, itemLinkID = linkIDs
+            coverLink = Link(
+                id=coverLinkID, url='https://example.com/cover.jpg', media_type='image/jpeg', flags={'cover': True}
+            )
+            link = Link(id=itemLinkID, url='https://example.com/book.epub', media_type='application/epub+zip', flags={})
+            item = Item(
+                id=itemID, source='test', record_id=5, content_type='ebook',
+                contributors=[], measurements=[], links=[link], identifiers=[], rights=[]
+            )
+            edition = Edition(
+                id=editionID, title='Test Title', publication_date=date(1900, 1, 1), alt_titles=[],
+                publishers=[], contributors=[], languages=[], measurements=[], dates=[],
+                identifiers=[], rights=[], links=[coverLink], items=[item], dcdw_uuids=[dcdwUUID]
+            )
+
+            return Work(
+                id=workID, title='Test Title', alt_titles=[], authors=[{'name': 'Author, Test'}],
+                contributors=[], subjects=[], languages=[], measurements=[], identifiers=[], editions=[edition]
+            )
+
+        existingWork = buildWork(workID=1, editionID=10, itemID=100, linkIDs=(1001, 1000), dcdwUUID=str(recordUUID))
+        existingWork.uuid = workUUID
+        existingWork.date_created = datetime(2020, 1, 1)
+        existingWork.date_modified = datetime(2020, 1, 1)
+
+        mockSession = mocker.MagicMock()
+        mockSession.query().join().filter().filter().all.return_value = [existingWork]
+        mockSession.query().filter().order_by().all.return_value = existingWork.editions
+        # Links are matched by url, the edition cover link before the item link
+        mockSession.query().filter().first.side_effect = [mocker.MagicMock(id=1001), mocker.MagicMock(id=1000)]
+        mockSession.merge.side_effect = lambda work: work
+
+        recordManager = SFRRecordManager(mockSession, {'2b': {}})
+        recordManager.work = buildWork(dcdwUUID=recordUUID.hex)
+        recordManager.work.uuid = uuid4()
+
+        assert recordManager.mergeRecords() == []
+
+        reclusteredWork = recordManager.work
+        assert reclusteredWork.id == 1
+        assert reclusteredWork.uuid == workUUID
+        assert reclusteredWork.editions[0].id == 10
+        assert reclusteredWork.editions[0].items[0].id == 100
+        assert reclusteredWork.editions[0].links[0].id == 1001
+        assert reclusteredWork.editions[0].items[0].links[0].id == 1000
+        assert reclusteredWork.date_modified > existingWork.date_modified
+
+        documents = []
+
+        for work in (existingWork, reclusteredWork):
+            elasticManager = SFRElasticRecordManager(work)
+            elasticManager.getCreateWork()
+            documents.append(elasticManager.work)
+
+        existingDocument, reclusteredDocument = documents
+        assert reclusteredDocument.content_hash == existingDocument.content_hash
+
+        mocker.patch.object(SFRElasticRecordManager, 'detectLanguages', return_value=True)
+        mockBulk = mocker.patch('managers.elasticsearch.parallel_bulk')
+
+        elasticSearchManager = ElasticsearchManager(index='testIndex')
+        elasticSearchManager.es = mocker.MagicMock()
+        elasticSearchManager.es.mget.return_value = {'docs': [
+            {'_id': str(workUUID), 'found': True, '_source': {'content_hash': existingDocument.content_hash}}
+        ]}
+
+        indexBuffer = ElasticsearchIndexBuffer(elasticSearchManager)
+        indexBuffer.index_work(reclusteredDocument)
+        indexBuffer.flush()
+
+        mockBulk.assert_not_called()
+        assert indexBuffer.get_metrics()['unchanged'] == 1
+        assert indexBuffer.get_metrics()['indexed'] == 0
+
     def test_dedupeIdentifiers(self, testInstance, mocker):
         mockIdentifiers = [
             mocker.MagicMock(identifier=1, authority='test', id=None),
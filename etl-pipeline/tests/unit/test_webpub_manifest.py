@@ -1,5 +1,7 @@
+from io import BytesIO
 import json
 import pytest
+from zipfile import ZipFile
 
 from tests.helper import TestHelpers
 from managers import WebpubManifest
@@ -150,3 +152,148 @@ class TestPDFManifest:
         jsonManifest = testManifest.toJson()
         assert isinstance(jsonManifest, str)
         assert json.loads(jsonManifest)['context'] == 'https://test_aws_bucket-s3.amazonaws.com/manifests/context.jsonld'
+
+
+class TestEpubManifest:
+    CONTAINER = """<?xml version="1.0"?>
+        <container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+            <rootfiles>
+                <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+            </rootfiles>
+        </container>"""
+
+    @classmethod
+    def setup_class(cls):
+        TestHelpers.setEnvVars()
+
+    @classmethod
+    def teardown_class(cls):
+        TestHelpers.clearEnvVars()
+
+    @classmethod
+    def createEpub(cls, package: str, components: dict) -> ZipFile:
+        epubBytes = BytesIO()
+
+        with ZipFile(epubBytes, 'w') as epubZip:
+            epubZip.writestr('mimetype', 'application/epub+zip')
+            epubZip.writestr('META-INF/container.xml', cls.CONTAINER)
+            epubZip.writestr('OEBPS/content.opf', package)
+
+            for path, content in components.items():
+                epubZip.writestr(path, content)
+
+        return ZipFile(epubBytes)
+
+    @staticmethod
+    def createPackage(manifestItems: str, spineAttrs: str='') -> str:
+        return f"""<?xml version="1.0"?>
+            <package xmlns="http://www.idpf.org/2007/opf" version="3.0">
+                <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+                    <dc:title> Test Title </dc:title>
+                    <dc:creator>Test Author</dc:creator>
+                    <dc:identifier>urn:isbn:9781234567890</dc:identifier>
+                    <dc:language>en</dc:language>
+                </metadata>
+                <manifest>{manifestItems}</manifest>
+                <spine {spineAttrs}>
+                    <itemref idref="ch1"/>
+                    <itemref idref="ch2"/>
+                </spine>
+            </package>"""
+
+    def test_fromEpub_nav_document(self):
+        package = self.createPackage("""
+            <item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>
+            <item id="ch1" href="text/ch1.xhtml" media-type="application/xhtml+xml"/>
+            <item id="ch2" href="text/ch2.xhtml" media-type="application/xhtml+xml"/>
+            <item id="css" href="styles/main.css" media-type="text/css"/>
+        """)
+        nav = """<?xml version="1.0"?>
+            <html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">
+                <body>
+                    <nav epub:type="landmarks"><ol><li><a href="text/ch2.xhtml">Landmark</a></li></ol></nav>
+                    <nav epub:type="toc">
+                        <ol>
+                            <li>
+                                <a href="text/ch1.xhtml">Chapter
+                                    1</a>
+                                <ol><li><a href="text/ch1.xhtml#s1">Section 1</a></li></ol>
+                            </li>
+                            <li><span>Part 2</span></li>
+                        </ol>
+                    </nav>
+                </body>
+            </html>"""
+
+        testEpub = self.createEpub(package, {'OEBPS/nav.xhtml': nav})
+
+        testManifest = WebpubManifest.fromEpub(testEpub, 'epubURL', 'https://root', manifestURL='manifestURL')
+
+        assert testManifest.metadata == {
+            '@type': 'https://schema.org/Book',
+            'title': 'Test Title',
+            'author': 'Test Author',
+            'identifier': 'urn:isbn:9781234567890',
+            'language': 'en'
+        }
+        assert testManifest.links == [
+            {'href': 'epubURL', 'type': 'application/epub+zip', 'rel': 'alternate'},
+            {'rel': 'self', 'href': 'manifestURL', 'type': 'application/webpub+json'}
+        ]
+        assert testManifest.readingOrder == [
+            {'href': 'https://root/OEBPS/text/ch1.xhtml', 'type': 'application/xhtml+xml'},
+            {'href': 'https://root/OEBPS/text/ch2.xhtml', 'type': 'application/xhtml+xml'}
+        ]
+        assert sorted(testManifest.toDict()['resources'], key=lambda resource: resource['href']) == [
+            {'href': 'https://root/OEBPS/nav.xhtml', 'type': 'application/xhtml+xml'},
+            {'href': 'https://root/OEBPS/styles/main.css', 'type': 'text/css'}
+        ]
+        assert testManifest.tableOfContents == [
+            {
+                'href': 'https://root/OEBPS/text/ch1.xhtml',
+                'title': 'Chapter 1',
+                'children': [{'href': 'https://root/OEBPS/text/ch1.xhtml#s1', 'title': 'Section 1'}]
+            },
+            {'title': 'Part 2'}
+        ]
+
+    def test_fromEpub_ncx(self):
+        package = self.createPackage("""
+            <item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>
+            <item id="ch1" href="ch1.xhtml" media-type="application/xhtml+xml"/>
+            <item id="ch2" href="ch2.xhtml" media-type="application/xhtml+xml"/>
+        """, spineAttrs='toc="ncx"')
+        ncx = """<?xml version="1.0"?>
+            <ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">
+                <navMap>
+                    <navPoint id="p1">
+                        <navLabel><text>Chapter 1</text></navLabel>
+                        <content src="ch1.xhtml"/>
+                        <navPoint id="p2">
+                            <navLabel><text>Section 1</text></navLabel>
+                            <content src="ch1.xhtml#s1"/>
+                        </navPoint>
+                    </navPoint>
+                    <navPoint id="p3">
+                        <navLabel><text>Chapter 2</text></navLabel>
+                        <content src="ch2.xhtml"/>
+                    </navPoint>
+                </navMap>
+            </ncx>"""
+
+        testEpub = self.createEpub(package, {'OEBPS/toc.ncx': ncx})
+
+        testManifest = WebpubManifest.fromEpub(testEpub, 'epubURL', 'https://root')
+
+        assert len(testManifest.links) == 1
+        assert testManifest.tableOfContents == [
+            {
+                'href': 'https://root/OEBPS/ch1.xhtml',
+                'title': 'Chapter 1',
+                'children': [{'href': 'https://root/OEBPS/ch1.xhtml#s1', 'title': 'Section 1'}]
+            },
+            {'href': 'https://root/OEBPS/ch2.xhtml', 'title': 'Chapter 2'}
+        ]
+        assert testManifest.toDict()['resources'] == [
+            {'href': 'https://root/OEBPS/toc.ncx', 'type': 'application/x-dtbncx+xml'}
+        ]